@@ -0,0 +1,101 @@
+"""
+Benchmark of the connection profiles defined in persistence.db.
+
+Measures, for each profile, on a fresh database file:
+- single inserts, one transaction each (what the expense form does)
+- a bulk insert in one transaction (recurring generation)
+- month range queries (expense list and analysis)
+
+Run from the project root:
+    python -m benchmarks.connection_profiles [--rows 20000]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from domain.models import Expense
+from persistence.db import (
+    CONNECTION_PROFILES,
+    ConnectionManager,
+    get_connection,
+    init_db,
+)
+from persistence.expense_repository import ExpenseRepository
+from utils.dates import month_date_range
+
+FIRST_DAY = date(2015, 1, 1)
+
+
+def make_expense(index: int) -> Expense:
+    return Expense(
+        id=None,
+        date=FIRST_DAY + timedelta(days=index % 3650),
+        amount=1 + index % 200,
+        category_id=1 + index % 10,
+        description=f"Expense {index}",
+        is_recurring=False,
+        recurring_expense_id=None,
+        attachment_path=None,
+        attachment_type=None,
+        analysis_data=None,
+        analysis_summary=None,
+        created_at=datetime.now(),
+    )
+
+
+def run_profile(name: str, rows: int, single_inserts: int, directory: Path) -> dict:
+    connection = get_connection(
+        str(directory / f"{name}.db"), profile=CONNECTION_PROFILES[name]
+    )
+    # No categories in the benchmark database
+    connection.execute("PRAGMA foreign_keys = OFF;")
+    init_db(connection)
+    repository = ExpenseRepository(ConnectionManager.for_connection(connection))
+
+    started = time.perf_counter()
+    for index in range(single_inserts):
+        repository.add(make_expense(index))
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    repository.add_many([make_expense(index) for index in range(rows)])
+    bulk_seconds = time.perf_counter() - started
+
+    months = [(FIRST_DAY.year + m // 12, m % 12 + 1) for m in range(120)]
+    started = time.perf_counter()
+    for year, month in months:
+        repository.get_by_period(*month_date_range(year, month))
+    query_seconds = time.perf_counter() - started
+
+    connection.close()
+
+    return {
+        "single inserts/s": single_inserts / single_seconds,
+        "bulk rows/s": rows / bulk_seconds,
+        "month queries/s": len(months) / query_seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--single-inserts", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            name: run_profile(name, args.rows, args.single_inserts, Path(directory))
+            for name in CONNECTION_PROFILES
+        }
+
+    metrics = list(next(iter(results.values())))
+    print(f"{'profile':<10}" + "".join(f"{metric:>20}" for metric in metrics))
+    for name, values in results.items():
+        print(f"{name:<10}" + "".join(f"{values[m]:>20.0f}" for m in metrics))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark of the slotted domain models defined in domain.models.
+
+Builds the same rows, as the repository mappers do, once with the slotted
+Expense and once with an equivalent plain dataclass (per-instance __dict__),
+and reports for each:
+- construction time
+- memory allocated for the instances (tracemalloc)
+
+It also times ExpenseRepository.get_all() on an in-memory database with
+the same number of rows.
+
+Run from the project root:
+    python -m benchmarks.model_memory [--rows 100000]
+"""
+
+import argparse
+import gc
+import sqlite3
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import date, datetime, timedelta
+
+from domain.models import Expense, Money
+from persistence.db import Connection, ConnectionManager, init_db
+from persistence.expense_repository import ExpenseRepository
+
+FIRST_DAY = date(2015, 1, 1)
+CREATED_AT = datetime(2024, 1, 1)
+
+# Same fields and conversion as Expense, without slots
+DictExpense = make_dataclass(
+    "DictExpense",
+    [(f.name, f.type) for f in fields(Expense)],
+    namespace={"__post_init__": Expense.__post_init__},
+)
+
+
+def make_row(index: int) -> tuple:
+    return (
+        index,
+        FIRST_DAY + timedelta(days=index % 3650),
+        Money.from_cents(100 + index % 20000),
+        1 + index % 10,
+        f"Expense {index}",
+    )
+
+
+def build(model: type, rows: list[tuple]) -> list:
+    return [
+        model(
+            id=row[0],
+            date=row[1],
+            amount=row[2],
+            category_id=row[3],
+            description=row[4],
+            is_recurring=False,
+            recurring_expense_id=None,
+            attachment_path=None,
+            attachment_type=None,
+            analysis_data=None,
+            analysis_summary=None,
+            created_at=CREATED_AT,
+        )
+        for row in rows
+    ]
+
+
+def measure(model: type, rows: list[tuple]) -> dict:
+    gc.collect()
+
+    started = time.perf_counter()
+    build(model, rows)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    instances = build(model, rows)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The field values are shared between the two runs: what is left is
+    # the instances themselves plus the list holding them
+    return {
+        "model": model.__name__,
+        "build_ms": elapsed * 1000,
+        "bytes_per_row": allocated / len(instances),
+    }
+
+
+def measure_get_all(rows: int) -> float:
+    connection = sqlite3.connect(":memory:", factory=Connection)
+    connection.execute("PRAGMA foreign_keys = OFF;")
+    init_db(connection)
+    repository = ExpenseRepository(ConnectionManager.for_connection(connection))
+    repository.add_many(build(Expense, [make_row(index) for index in range(rows)]))
+
+    started = time.perf_counter()
+    repository.get_all()
+    elapsed = time.perf_counter() - started
+
+    connection.close()
+    return elapsed * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = [make_row(index) for index in range(args.rows)]
+
+    print(f"{'model':<12} {'build (ms)':>12} {'bytes/row':>12}")
+    for model in (DictExpense, Expense):
+        result = measure(model, rows)
+        print(
+            f"{result['model']:<12} {result['build_ms']:>12.1f} "
+            f"{result['bytes_per_row']:>12.0f}"
+        )
+
+    print(f"\nExpenseRepository.get_all() on {args.rows} rows: "
+          f"{measure_get_all(args.rows):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
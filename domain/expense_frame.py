@@ -0,0 +1,201 @@
+"""
+domain/expense_frame.py
+
+Column-oriented view of the expenses, for vectorized analysis with NumPy.
+
+An ExpenseFrame holds only what the analysis needs, one array per column:
+days as proleptic Gregorian ordinals (date.toordinal()), amounts as int64
+cents and category ids. It is built straight from cursor rows, without
+creating Expense objects, and every aggregate is a NumPy reduction.
+"""
+
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+# One row of the frame, as selected by ExpenseRepository.get_frame()
+FRAME_ROW_DTYPE = np.dtype(
+    [("day", np.int32), ("amount_cents", np.int64), ("category_id", np.int32)]
+)
+
+# date.toordinal() of numpy's datetime64 epoch
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class ExpenseFrame:
+    """
+    Expenses as parallel NumPy arrays, sorted by day.
+    """
+
+    __slots__ = ("days", "amount_cents", "category_ids")
+
+    def __init__(
+        self, days: np.ndarray, amount_cents: np.ndarray, category_ids: np.ndarray
+    ) -> None:
+        if not len(days) == len(amount_cents) == len(category_ids):
+            raise ValueError("ExpenseFrame columns must have the same length")
+
+        if len(days) > 1 and np.any(days[1:] < days[:-1]):
+            order = np.argsort(days, kind="stable")
+            days, amount_cents, category_ids = (
+                days[order],
+                amount_cents[order],
+                category_ids[order],
+            )
+
+        self.days = days
+        self.amount_cents = amount_cents
+        self.category_ids = category_ids
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, int, int]]) -> "ExpenseFrame":
+        """
+        Builds a frame from (day ordinal, amount cents, category id) rows,
+        e.g. directly from a cursor.
+        """
+        table = np.fromiter(rows, dtype=FRAME_ROW_DTYPE)
+
+        return cls(table["day"], table["amount_cents"], table["category_id"])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def amounts(self) -> np.ndarray:
+        """The amounts in euros as float64, e.g. for charts."""
+        return self.amount_cents / 100
+
+    def slice(self, start_date: date, end_date: date) -> "ExpenseFrame":
+        """
+        Returns the expenses within a date range (inclusive).
+        The arrays of the result are views, no data is copied.
+        """
+        start = np.searchsorted(self.days, start_date.toordinal(), side="left")
+        end = np.searchsorted(self.days, end_date.toordinal(), side="right")
+
+        return ExpenseFrame(
+            self.days[start:end],
+            self.amount_cents[start:end],
+            self.category_ids[start:end],
+        )
+
+    def for_category(self, category_id: int) -> "ExpenseFrame":
+        """
+        Returns the expenses of a single category.
+        """
+        mask = self.category_ids == category_id
+
+        return ExpenseFrame(
+            self.days[mask], self.amount_cents[mask], self.category_ids[mask]
+        )
+
+    def total_cents(self) -> int:
+        """Sum of all amounts, in cents."""
+        return int(self.amount_cents.sum())
+
+    def max_cents(self) -> int | None:
+        """Largest single amount in cents, or None if the frame is empty."""
+        if not len(self):
+            return None
+
+        return int(self.amount_cents.max())
+
+    def totals_by_category(self) -> dict[int, int]:
+        """
+        Sum of amounts in cents per category.
+        Categories without expenses are not included.
+        """
+        category_ids, positions = np.unique(self.category_ids, return_inverse=True)
+        totals = np.zeros(len(category_ids), dtype=np.int64)
+        np.add.at(totals, positions, self.amount_cents)
+
+        return dict(zip(category_ids.tolist(), totals.tolist()))
+
+    def totals_by_day(self) -> dict[date, int]:
+        """
+        Sum of amounts in cents per day.
+        Days without expenses are not included.
+        """
+        if not len(self):
+            return {}
+
+        # Days are sorted: every run of equal days is one group
+        starts = np.flatnonzero(np.diff(self.days, prepend=self.days[0] - 1))
+        totals = np.add.reduceat(self.amount_cents, starts)
+
+        return {
+            date.fromordinal(day): total
+            for day, total in zip(self.days[starts].tolist(), totals.tolist())
+        }
+
+    def totals_by_month_and_category(
+        self,
+    ) -> list[tuple[int, int, int, int, int, int]]:
+        """
+        (year, month, category id, sum in cents, count, largest amount in
+        cents) per month and category, ordered by month and category.
+        Months and categories without expenses are not included.
+        """
+        if not len(self):
+            return []
+
+        # Months since January 1970, as numpy counts them
+        months = (
+            (self.days - _EPOCH_ORDINAL)
+            .astype("datetime64[D]")
+            .astype("datetime64[M]")
+            .astype(np.int64)
+        )
+        order = np.lexsort((self.category_ids, months))
+        months, category_ids = months[order], self.category_ids[order]
+        amount_cents = self.amount_cents[order]
+
+        keys = months * 2**32 + category_ids
+        starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+        totals = np.add.reduceat(amount_cents, starts)
+        maxima = np.maximum.reduceat(amount_cents, starts)
+        counts = np.diff(np.append(starts, len(keys)))
+
+        return [
+            (month // 12 + 1970, month % 12 + 1, category_id, total, count, largest)
+            for month, category_id, total, count, largest in zip(
+                months[starts].tolist(),
+                category_ids[starts].tolist(),
+                totals.tolist(),
+                counts.tolist(),
+                maxima.tolist(),
+            )
+        ]
+
+    def daily_totals_array(self, start_date: date, end_date: date) -> np.ndarray:
+        """
+        Sum of amounts in cents for every day of a date range (inclusive),
+        zero for days without expenses. Index i is start_date + i days.
+        """
+        first = start_date.toordinal()
+        frame = self.slice(start_date, end_date)
+
+        daily = np.zeros(end_date.toordinal() - first + 1, dtype=np.int64)
+        np.add.at(daily, frame.days - first, frame.amount_cents)
+
+        return daily
+
+    def window_sums(
+        self, start_date: date, end_date: date, window_days: int
+    ) -> np.ndarray:
+        """
+        Trailing sums in cents over window_days days, for every day of a date
+        range (inclusive). Index i is the total of the window_days days ending
+        on start_date + i days; the expenses before start_date are included,
+        so the first windows are complete too.
+        """
+        if window_days < 1:
+            raise ValueError("window_days must be at least 1")
+
+        first = date.fromordinal(start_date.toordinal() - window_days + 1)
+        daily = self.daily_totals_array(first, end_date)
+
+        cumulative = np.concatenate(([0], np.cumsum(daily)))
+
+        return cumulative[window_days:] - cumulative[:-window_days]
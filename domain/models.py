@@ -1,13 +1,99 @@
 """Domain models for the expense tracker application."""
 
+import math
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from typing import Optional
 from enum import Enum
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 
+CENT = Decimal("0.01")
 
-@dataclass
+
+class Money(Decimal):
+    """
+    An amount in euros with exactly two decimal places.
+
+    Amounts are stored as integer cents; Money is the Python side of that
+    fixed-point representation. It is a Decimal, so totals, comparisons and
+    formatting keep working unchanged, and floats coming from the old API
+    (forms, tests, legacy rows) are rounded to the nearest cent.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value: "Money | Decimal | float | int | str" = 0) -> "Money":
+        if isinstance(value, float):
+            # repr is the shortest string round-tripping to the same float,
+            # e.g. 7.99 instead of 7.9900000000000002131628...
+            value = repr(value)
+
+        return super().__new__(cls, Decimal(value).quantize(CENT, ROUND_HALF_UP))
+
+    @classmethod
+    def from_cents(cls, cents: int) -> "Money":
+        """Builds an amount from an integer number of cents."""
+        return cls(Decimal(cents).scaleb(-2))
+
+    @property
+    def cents(self) -> int:
+        """The amount as an integer number of cents."""
+        return int(self.scaleb(2))
+
+    # Decimal refuses to mix with floats: accept them, rounded to cents,
+    # so code written against float amounts keeps working. Sums and
+    # differences of amounts are amounts again.
+    def __add__(self, other):
+        if isinstance(other, (Money, int, float)):
+            return Money(super().__add__(Money(other)))
+        return super().__add__(other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, (Money, int, float)):
+            return Money(super().__sub__(Money(other)))
+        return super().__sub__(other)
+
+    def __rsub__(self, other):
+        if isinstance(other, (Money, int, float)):
+            return Money(super().__rsub__(Money(other)))
+        return super().__rsub__(other)
+
+    # Floats are compared once rounded to cents too: Money("0.1") == 0.1,
+    # whereas Decimal compares with the exact binary value of the float.
+    # (As for Decimal, equal Money and float may still hash differently.)
+    def __eq__(self, other):
+        return super().__eq__(_comparable(other))
+
+    def __ne__(self, other):
+        return super().__ne__(_comparable(other))
+
+    def __lt__(self, other):
+        return super().__lt__(_comparable(other))
+
+    def __le__(self, other):
+        return super().__le__(_comparable(other))
+
+    def __gt__(self, other):
+        return super().__gt__(_comparable(other))
+
+    def __ge__(self, other):
+        return super().__ge__(_comparable(other))
+
+    __hash__ = Decimal.__hash__
+
+
+def _comparable(other):
+    """
+    Rounds a finite float to cents for comparisons with Money.
+    """
+    if isinstance(other, float) and math.isfinite(other):
+        return Money(other)
+    return other
+
+
+@dataclass(slots=True)
 class Category:
     """Represents an expense category."""
 
@@ -16,7 +102,7 @@ class Category:
     is_custom: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Expense:
     """
     Rappresenta una singola spesa registrata nel sistema.
@@ -24,7 +110,7 @@ class Expense:
 
     id: Optional[int]
     date: date
-    amount: float
+    amount: Money  # float, Decimal and int are converted
     category_id: int
     description: Optional[str]
 
@@ -39,6 +125,10 @@ class Expense:
 
     created_at: datetime
 
+    def __post_init__(self) -> None:
+        if not isinstance(self.amount, Money):
+            self.amount = Money(self.amount)
+
 
 class RecurrenceFrequency(Enum):
     """
@@ -53,7 +143,7 @@ class RecurrenceFrequency(Enum):
     YEARLY = "yearly"
 
 
-@dataclass
+@dataclass(slots=True)
 class RecurringExpense:
     """
     Represents a recurring expense template.
@@ -64,7 +154,7 @@ class RecurringExpense:
     id: Optional[int]
 
     name: str
-    amount: float
+    amount: Money  # float, Decimal and int are converted
     category_id: int
 
     frequency: RecurrenceFrequency
@@ -81,8 +171,59 @@ class RecurringExpense:
 
     created_at: datetime = field(default_factory=datetime.now)
 
+    def __post_init__(self) -> None:
+        if not isinstance(self.amount, Money):
+            self.amount = Money(self.amount)
+
+
+@dataclass(frozen=True, slots=True)
+class ExpenseChangeSet:
+    """
+    Expenses written through ExpenseService, as sent to its change listeners.
 
-@dataclass(frozen=True)
+    An update is the old expense removed and the new one added.
+    reload is set when expenses were written elsewhere (e.g. recurring
+    generation) and listeners must reload their data.
+    version is the data version right after the change was committed, when
+    known: data read at that version or later already includes it.
+    """
+
+    added: tuple[Expense, ...] = ()
+    removed: tuple[Expense, ...] = ()
+    reload: bool = False
+    version: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExpenseListRow:
+    """
+    An expense as displayed in the expense list, with the category name
+    and the recurrence frequency already resolved.
+    """
+
+    id: int
+    date: date
+    amount: Money
+    category_id: int
+    category_name: Optional[str]
+    description: Optional[str]
+    recurring_expense_id: Optional[int]
+    frequency: Optional[RecurrenceFrequency]
+
+
+@dataclass(frozen=True, slots=True)
+class ExpenseListHead:
+    """
+    What the expense list shows first for a period: the number of expenses,
+    their total and the first rows of the sorted list.
+    """
+
+    count: int
+    total: Money
+    rows: tuple[ExpenseListRow, ...]
+
+
+@dataclass(frozen=True, slots=True)
 class CategorySummary:
     """
     Docstring for CategorySummary
@@ -90,32 +231,57 @@ class CategorySummary:
 
     category_id: int
     category_name: str | None
-    total_amount: Decimal
-    previous_total_amount: Decimal | None  # None se non esiste periodo precedente
+    total_amount: Money
+    previous_total_amount: Money | None  # None se non esiste periodo precedente
     delta_percent: Decimal | None  # percentuale di incremento/decremento
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OverallSummary:
     """
     Represents the overall summary of expenses.
     """
 
-    total_amount: Decimal
-    previous_total_amount: Decimal | None
+    total_amount: Money
+    previous_total_amount: Money | None
     delta_percent: Decimal | None
     daily_average: Decimal | None
     previous_daily_average: Decimal | None
-    max_single_expense: Decimal | None
+    max_single_expense: Money | None
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodTotals:
+    """
+    Amounts aggregated over a single period in one pass.
+    """
+
+    total_amount: Money
+    max_single_expense: Money | None
+    by_category: dict[int, Money]
+
+
+@dataclass(frozen=True, slots=True)
+class MonthlyCategoryTotal:
+    """
+    Expenses of a category in a month, from the monthly rollup.
+    """
+
+    year: int
+    month: int
+    category_id: int
+    total_amount: Money
+    count: int
+    max_amount: Money
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DateRange:
     start_date: date
     end_date: date
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExpenseAnalysisResult:
     """
     Represents the result of an expense analysis.
@@ -126,7 +292,7 @@ class ExpenseAnalysisResult:
     by_category: tuple[CategorySummary]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PeriodComparison:
     """
     Docstring for PeriodComparison
@@ -138,8 +304,8 @@ class PeriodComparison:
     delta_percentage: Decimal | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CategoryAmount:
     category_name: str
-    total_amount: Decimal
+    total_amount: Money
     category_id: str
@@ -6,24 +6,283 @@ This module provides functions to connect to the SQLite database
 and initialize the required tables for the expense tracker application.
 """
 
+import logging
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
+
+from domain.models import Money
 
 PRODUCTION_DB_STRING_PATH = "data/expenses.db"
 
+# Generated expenses found twice for the same template and date when the
+# unique index was introduced, moved aside instead of being deleted
+RECURRING_DUPLICATES_TABLE = "expenses_recurring_duplicates"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """
+    PRAGMA settings applied to every new connection.
+    A None value keeps the SQLite default.
+    """
+
+    journal_mode: str | None = None  # DELETE, WAL, ...
+    synchronous: str | None = None  # FULL, NORMAL, OFF
+    mmap_size: int | None = None  # bytes of memory-mapped I/O
+    cache_size: int | None = None  # pages, or KiB if negative
+    temp_store: str | None = None  # DEFAULT, FILE, MEMORY
+
+
+# Plain rollback journal, as sqlite3.connect() does
+DEFAULT_PROFILE = ConnectionProfile()
+
+# WAL lets readers (e.g. the analysis) run while the form writes, and with
+# WAL synchronous=NORMAL stays durable across application crashes.
+TUNED_PROFILE = ConnectionProfile(
+    journal_mode="WAL",
+    synchronous="NORMAL",
+    mmap_size=64 * 1024 * 1024,
+    cache_size=-16 * 1024,
+    temp_store="MEMORY",
+)
+
+CONNECTION_PROFILES = {
+    "default": DEFAULT_PROFILE,
+    "tuned": TUNED_PROFILE,
+}
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+class Connection(sqlite3.Connection):
+    """
+    sqlite3 connection whose ``with`` blocks can be nested.
+
+    Repositories wrap each write in a ``with`` block on the writer connection
+    (and sometimes call ``commit()`` explicitly). When a service opens an
+    outer block, the inner blocks and commits are deferred, so all the writes
+    are committed (or rolled back) together when the outer block exits.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._transaction_depth = 0
+
+    def __enter__(self):
+        self._transaction_depth += 1
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._transaction_depth -= 1
+
+        if self._transaction_depth > 0:
+            # Inner block: the outermost one commits or rolls back
+            return False
+
+        return super().__exit__(exc_type, exc_value, traceback)
 
-def get_connection(db_path: str = PRODUCTION_DB_STRING_PATH) -> sqlite3.Connection:
+    def commit(self) -> None:
+        if self._transaction_depth > 1:
+            return
+
+        super().commit()
+
+
+def get_connection(
+    db_path: str = PRODUCTION_DB_STRING_PATH,
+    profile: ConnectionProfile = TUNED_PROFILE,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
     """Establishes and returns a connection to the SQLite database."""
     path = Path(db_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    connection = sqlite3.connect(path)
+    connection = sqlite3.connect(
+        path, factory=Connection, check_same_thread=check_same_thread
+    )
     # Senza questa riga:
     # potresti inserire una spesa con category_id inesistente
     # nessun errore verrebbe lanciato
     connection.execute("PRAGMA foreign_keys = ON;")
+    apply_profile(connection, profile)
     return connection
 
 
+def apply_profile(connection: sqlite3.Connection, profile: ConnectionProfile) -> None:
+    """
+    Applies the PRAGMA settings of a profile to a connection.
+
+    Raises:
+        ValueError: if a textual setting is not a valid choice.
+    """
+    for name, choices in _PRAGMA_CHOICES.items():
+        value = getattr(profile, name)
+        if value is None:
+            continue
+        if value.upper() not in choices:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value}")
+        connection.execute(f"PRAGMA {name} = {value.upper()};")
+
+    if profile.mmap_size is not None:
+        connection.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)};")
+
+    if profile.cache_size is not None:
+        connection.execute(f"PRAGMA cache_size = {int(profile.cache_size)};")
+
+
+class ConnectionManager:
+    """
+    Hands out SQLite connections to the repositories, from any thread.
+
+    - writer(): the single writer connection, serialized by a lock.
+      Nested writer() blocks join the outermost transaction.
+    - reader(): a connection from a pool of at most max_readers,
+      used for queries. With WAL, readers do not wait for the writer.
+
+    data_version is bumped every time an outermost writer() block commits,
+    so caches of query results can tell whether the data changed.
+    last_commit_version is the data_version of the last commit made by the
+    calling thread, and snapshot() reads the data at a known data_version.
+    """
+
+    def __init__(
+        self,
+        db_path: str = PRODUCTION_DB_STRING_PATH,
+        profile: ConnectionProfile = TUNED_PROFILE,
+        max_readers: int = 4,
+    ):
+        self._db_path = db_path
+        self._profile = profile
+
+        self._writer_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self._idle_readers: queue.LifoQueue = queue.LifoQueue()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._shared_connection: sqlite3.Connection | None = None
+        self._data_version = 0
+        self._local = threading.local()
+
+    @classmethod
+    def for_connection(cls, connection: sqlite3.Connection) -> "ConnectionManager":
+        """
+        Returns a manager serving every reader and writer request with
+        the given connection, e.g. an in-memory database in tests.
+        """
+        manager = cls.__new__(cls)
+        manager._writer_lock = threading.RLock()
+        manager._writer = connection
+        manager._shared_connection = connection
+        manager._data_version = 0
+        manager._local = threading.local()
+        return manager
+
+    @property
+    def data_version(self) -> int:
+        """
+        Number of writer transactions committed through this manager.
+        """
+        return self._data_version
+
+    @property
+    def last_commit_version(self) -> int | None:
+        """
+        data_version right after the last writer transaction committed by
+        the calling thread, None if it has not committed any.
+        """
+        return getattr(self._local, "commit_version", None)
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_connection(
+            self._db_path, profile=self._profile, check_same_thread=False
+        )
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yields the writer connection inside a transaction, committed when
+        the outermost writer() block exits and rolled back on errors.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+
+            with self._writer as connection:
+                yield connection
+
+            # Not reached on errors: the transaction was rolled back
+            if connection._transaction_depth == 0:
+                self._data_version += 1
+                self._local.commit_version = self._data_version
+
+    @contextmanager
+    def snapshot(self) -> Iterator[tuple[sqlite3.Connection, int]]:
+        """
+        Yields the writer connection, for read-only queries, and the
+        data_version of what they read: writers wait meanwhile.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+
+            yield self._writer, self._data_version
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yields a connection for read-only queries.
+        Blocks while max_readers connections are already in use.
+        """
+        if self._shared_connection is not None:
+            with self._writer_lock:
+                yield self._shared_connection
+            return
+
+        with self._reader_slots:
+            try:
+                connection = self._idle_readers.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+                with self._readers_lock:
+                    self._readers.append(connection)
+
+            try:
+                yield connection
+            finally:
+                self._idle_readers.put(connection)
+
+    def close(self) -> None:
+        """
+        Closes every connection opened by the manager.
+        """
+        if self._shared_connection is not None:
+            return
+
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+            self._idle_readers = queue.LifoQueue()
+
+
 def init_db(connection: sqlite3.Connection) -> None:
     """Initializes the database with the required tables."""
     with connection as conn:
@@ -99,6 +358,11 @@ def init_db(connection: sqlite3.Connection) -> None:
         """
         )
 
+        # Amounts are stored as integer cents; the REAL amount column is kept
+        # in sync for older versions of the app.
+        _add_amount_cents_column(cursor, "recurring_expenses")
+        _add_amount_cents_column(cursor, "expenses")
+
         cursor.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_expenses_recurring_id
@@ -106,4 +370,275 @@ ON expenses(recurring_expense_id);
             """
         )
 
+        # One generated expense per recurring template and date.
+        # Databases created before this index may contain duplicates:
+        # the oldest row of each group is kept, the others are moved aside.
+        cursor.execute(
+            """
+            SELECT 1 FROM sqlite_master
+            WHERE type = 'index' AND name = 'idx_expenses_recurring_date'
+            """
+        )
+        if cursor.fetchone() is None:
+            _move_recurring_duplicates_aside(cursor)
+
+        cursor.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_recurring_date
+ON expenses(recurring_expense_id, date)
+WHERE recurring_expense_id IS NOT NULL;
+            """
+        )
+
+        # Covering indexes for the period queries: the date range alone
+        # (list, totals, daily totals, max amount) and a single category
+        # within a date range (per-category daily totals).
+        # The first versions covered the REAL amount column.
+        cursor.execute("DROP INDEX IF EXISTS idx_expenses_date_category_amount;")
+        cursor.execute("DROP INDEX IF EXISTS idx_expenses_category_date_amount;")
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_expenses_date_category_cents
+ON expenses(date, category_id, amount_cents);
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_expenses_category_date_cents
+ON expenses(category_id, date, amount_cents);
+            """
+        )
+
+        # (date, rowid) order: streaming and keyset pagination in date order
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_expenses_date
+ON expenses(date);
+            """
+        )
+
+        # (amount_cents, date, rowid) order: the expense list sorted by amount
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_expenses_amount_cents
+ON expenses(amount_cents, date);
+            """
+        )
+
+        _create_monthly_category_totals(cursor)
+
         conn.commit()
+
+
+# Year and month of an expenses row in a trigger, from its ISO date
+_ROW_YEAR = "CAST(substr({row}.date, 1, 4) AS INTEGER)"
+_ROW_MONTH = "CAST(substr({row}.date, 6, 2) AS INTEGER)"
+
+# Adds a row to its month/category rollup
+_ROLLUP_ADD = f"""
+    INSERT INTO monthly_category_totals
+        (year, month, category_id, total, count, max_amount)
+    VALUES (
+        {_ROW_YEAR.format(row="NEW")},
+        {_ROW_MONTH.format(row="NEW")},
+        NEW.category_id,
+        NEW.amount_cents,
+        1,
+        NEW.amount_cents
+    )
+    ON CONFLICT (year, month, category_id) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1,
+        max_amount = MAX(max_amount, excluded.max_amount);
+"""
+
+# Removes a row from its month/category rollup. The maximum is looked up
+# again only when the removed row may have been the largest one.
+_ROLLUP_REMOVE = f"""
+    UPDATE monthly_category_totals SET
+        total = total - OLD.amount_cents,
+        count = count - 1,
+        max_amount = CASE
+            WHEN OLD.amount_cents < max_amount THEN max_amount
+            ELSE COALESCE((
+                SELECT MAX(amount_cents) FROM expenses
+                WHERE category_id = OLD.category_id
+                AND date BETWEEN substr(OLD.date, 1, 7) || '-01'
+                             AND substr(OLD.date, 1, 7) || '-31'
+            ), 0)
+        END
+    WHERE year = {_ROW_YEAR.format(row="OLD")}
+    AND month = {_ROW_MONTH.format(row="OLD")}
+    AND category_id = OLD.category_id;
+
+    DELETE FROM monthly_category_totals
+    WHERE year = {_ROW_YEAR.format(row="OLD")}
+    AND month = {_ROW_MONTH.format(row="OLD")}
+    AND category_id = OLD.category_id
+    AND count = 0;
+"""
+
+# The rollup computed from scratch
+MONTHLY_CATEGORY_TOTALS_QUERY = """
+    SELECT
+        CAST(substr(date, 1, 4) AS INTEGER),
+        CAST(substr(date, 6, 2) AS INTEGER),
+        category_id,
+        SUM(amount_cents),
+        COUNT(*),
+        MAX(amount_cents)
+    FROM expenses
+    GROUP BY 1, 2, 3
+"""
+
+REBUILD_MONTHLY_CATEGORY_TOTALS_QUERY = (
+    """
+    INSERT INTO monthly_category_totals
+        (year, month, category_id, total, count, max_amount)
+    """
+    + MONTHLY_CATEGORY_TOTALS_QUERY
+)
+
+
+def _create_monthly_category_totals(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the monthly_category_totals rollup and the triggers keeping it
+    exact on every write to expenses. The rollup is filled from the
+    existing expenses the first time.
+    """
+    cursor.execute(
+        """
+        SELECT 1 FROM sqlite_master
+        WHERE type = 'table' AND name = 'monthly_category_totals'
+        """
+    )
+    exists = cursor.fetchone() is not None
+
+    # Amounts in cents, one row per month and category with expenses
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_category_totals (
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            max_amount INTEGER NOT NULL,
+
+            PRIMARY KEY (year, month, category_id)
+        ) WITHOUT ROWID
+        """
+    )
+
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            {_ROLLUP_ADD}
+        END;
+        """
+    )
+
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            {_ROLLUP_REMOVE}
+        END;
+        """
+    )
+
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_rollup_update
+        AFTER UPDATE OF date, category_id, amount_cents ON expenses
+        WHEN OLD.date IS NOT NEW.date
+        OR OLD.category_id IS NOT NEW.category_id
+        OR OLD.amount_cents IS NOT NEW.amount_cents
+        BEGIN
+            {_ROLLUP_REMOVE}
+            {_ROLLUP_ADD}
+        END;
+        """
+    )
+
+    if not exists:
+        cursor.execute(REBUILD_MONTHLY_CATEGORY_TOTALS_QUERY)
+
+
+def rebuild_monthly_category_totals(connection: sqlite3.Connection) -> None:
+    """
+    Recomputes the monthly_category_totals rollup from the expenses table.
+    """
+    with connection:
+        connection.execute("DELETE FROM monthly_category_totals")
+        connection.execute(REBUILD_MONTHLY_CATEGORY_TOTALS_QUERY)
+
+
+def _move_recurring_duplicates_aside(cursor: sqlite3.Cursor) -> None:
+    """
+    Moves the generated expenses stored more than once for the same
+    recurring expense and date to RECURRING_DUPLICATES_TABLE, keeping the
+    oldest of each group, so that the unique index can be created.
+    Nothing is lost: the rows can be inspected and restored from there.
+    """
+    duplicates = """
+        SELECT * FROM expenses
+        WHERE recurring_expense_id IS NOT NULL
+        AND id NOT IN (
+            SELECT MIN(id) FROM expenses
+            WHERE recurring_expense_id IS NOT NULL
+            GROUP BY recurring_expense_id, date
+        )
+    """
+
+    cursor.execute(f"SELECT COUNT(*) FROM ({duplicates})")
+    (count,) = cursor.fetchone()
+    if not count:
+        return
+
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {RECURRING_DUPLICATES_TABLE} "
+        "AS SELECT * FROM expenses WHERE 0"
+    )
+    cursor.execute(f"INSERT INTO {RECURRING_DUPLICATES_TABLE} {duplicates}")
+    cursor.execute(
+        f"DELETE FROM expenses WHERE id IN "
+        f"(SELECT id FROM {RECURRING_DUPLICATES_TABLE})"
+    )
+
+    logger.warning(
+        "Moved %d duplicated recurring expenses to table %s",
+        count,
+        RECURRING_DUPLICATES_TABLE,
+    )
+
+
+def _add_amount_cents_column(cursor: sqlite3.Cursor, table: str) -> None:
+    """
+    Adds the integer amount_cents column to a table, if missing,
+    and fills it once from the REAL amount column.
+
+    The cents are computed by Money, not by SQLite's ROUND() on the binary
+    float, so that they match what the app writes: e.g. 0.285 is 29 cents.
+    """
+    cursor.execute(f"PRAGMA table_info({table});")
+    columns = {row[1] for row in cursor.fetchall()}
+
+    if "amount_cents" in columns:
+        return
+
+    cursor.execute(
+        f"ALTER TABLE {table} ADD COLUMN amount_cents INTEGER NOT NULL DEFAULT 0;"
+    )
+
+    rows = cursor.execute(f"SELECT rowid, amount FROM {table};").fetchall()
+    cursor.executemany(
+        f"UPDATE {table} SET amount_cents = ? WHERE rowid = ?;",
+        [(Money(amount).cents, rowid) for rowid, amount in rows],
+    )
@@ -5,10 +5,129 @@ Repository responsible for persisting and retrieving Expense entities
 from the SQLite database.
 """
 
+import calendar
 import sqlite3
+import string
 from datetime import date, datetime
+from typing import TYPE_CHECKING, ContextManager, Iterator
 
-from domain.models import Expense
+from domain.models import (
+    Expense,
+    ExpenseListRow,
+    Money,
+    MonthlyCategoryTotal,
+    RecurrenceFrequency,
+)
+from persistence.db import ConnectionManager
+from utils.frequency_constants import FREQUENCY_MONTH_STEPS
+
+if TYPE_CHECKING:
+    from domain.expense_frame import ExpenseFrame
+
+# Columns read into an Expense, in the order used by _map_row_to_expense
+EXPENSE_COLUMNS = """
+    id,
+    date,
+    amount_cents,
+    category_id,
+    description,
+    is_recurring,
+    attachment_path,
+    attachment_type,
+    analysis_data,
+    analysis_summary,
+    created_at,
+    recurring_expense_id
+"""
+
+INSERT_EXPENSE_COLUMNS = """
+    INTO expenses (
+        date,
+        amount,
+        amount_cents,
+        category_id,
+        description,
+        is_recurring,
+        attachment_path,
+        attachment_type,
+        analysis_data,
+        analysis_summary,
+        created_at,
+        recurring_expense_id
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_EXPENSE_QUERY = "INSERT" + INSERT_EXPENSE_COLUMNS
+
+# Skips rows violating idx_expenses_recurring_date (already generated)
+INSERT_OR_IGNORE_EXPENSE_QUERY = "INSERT OR IGNORE" + INSERT_EXPENSE_COLUMNS
+
+# Expense columns with the alias used by the queries joining other tables
+ALIASED_EXPENSE_COLUMNS = ", ".join(
+    f"e.{column.strip()}" for column in EXPENSE_COLUMNS.split(",")
+)
+
+# Frequencies from the most to the least frequent, single expenses first
+FREQUENCY_RANK = (
+    "CASE r.frequency "
+    + " ".join(
+        f"WHEN '{frequency.value}' THEN {months}"
+        for frequency, months in FREQUENCY_MONTH_STEPS.items()
+    )
+    + " ELSE 0 END"
+)
+
+# Sort keys accepted by the sorted queries (see ExpenseSortField)
+SORT_EXPRESSIONS = {
+    "date": "e.date",
+    "amount": "e.amount_cents",
+    "category": "COALESCE(c.name, '') COLLATE NOCASE",
+    "frequency": FREQUENCY_RANK,
+}
+
+# COLLATE NOCASE only folds the ASCII letters
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Rows fetched at a time by the iter_* methods
+DEFAULT_BATCH_SIZE = 500
+
+# Position of an expense in (date, id) order, used as keyset for paging
+PageKey = tuple[date, int]
+
+# Columns of an ExpenseFrame: julianday() - 1721424.5 is date.toordinal()
+FRAME_QUERY = """
+    SELECT
+        CAST(julianday(date) - 1721424.5 AS INTEGER),
+        amount_cents,
+        category_id
+    FROM expenses
+"""
+
+# Expenses joined with the tables holding the category names and
+# frequencies, which can be sorted on
+SORTABLE_EXPENSES_QUERY = f"""
+    SELECT {ALIASED_EXPENSE_COLUMNS}
+    FROM expenses e
+    LEFT JOIN categories c ON c.id = e.category_id
+    LEFT JOIN recurring_expenses r ON r.id = e.recurring_expense_id
+"""
+
+# Expense rows joined with the names/frequencies shown in the expense list
+LIST_ROWS_QUERY = """
+    SELECT
+        e.id,
+        e.date,
+        e.amount_cents,
+        e.category_id,
+        c.name,
+        e.description,
+        e.recurring_expense_id,
+        r.frequency
+    FROM expenses e
+    LEFT JOIN categories c ON c.id = e.category_id
+    LEFT JOIN recurring_expenses r ON r.id = e.recurring_expense_id
+"""
 
 
 class ExpenseRepository:
@@ -16,8 +135,8 @@ class ExpenseRepository:
     Repository for Expense entities.
     """
 
-    def __init__(self, connection: sqlite3.Connection):
-        self.conn = connection
+    def __init__(self, database: ConnectionManager):
+        self._db = database
 
     def add(self, expense: Expense) -> Expense:
         """
@@ -29,56 +148,91 @@ class ExpenseRepository:
         Returns:
             Expense: The persisted expense with the generated ID
         """
-        with self.conn as connection:
+        with self._db.writer() as connection:
             cursor = connection.cursor()
 
-            cursor.execute(
-                """
-                INSERT INTO expenses (
-                    date,
-                    amount,
-                    category_id,
-                    description,
-                    is_recurring,        
-                    attachment_path,
-                    attachment_type,
-                    analysis_data,
-                    analysis_summary,
-                    created_at,
-                    recurring_expense_id
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    expense.date.isoformat(),
-                    expense.amount,
-                    expense.category_id,
-                    expense.description,
-                    int(expense.is_recurring),
-                    expense.attachment_path,
-                    expense.attachment_type,
-                    expense.analysis_data,
-                    expense.analysis_summary,
-                    expense.created_at.isoformat(),
-                    expense.recurring_expense_id,
-                ),
-            )
+            cursor.execute(INSERT_EXPENSE_QUERY, self._map_expense_to_row(expense))
 
             expense.id = cursor.lastrowid
 
         return expense
 
+    def add_many(
+        self, expenses: list[Expense], *, ignore_duplicates: bool = False
+    ) -> int:
+        """
+        Persists several new Expenses in one transaction.
+
+        Like add(), the generated IDs are assigned to the expenses;
+        the ones skipped as duplicates keep id None.
+
+        Args:
+            expenses (list[Expense]): The expenses to persist
+            ignore_duplicates (bool): Silently skip recurring occurrences
+                already stored for the same recurring expense and date
+
+        Returns:
+            int: The number of rows actually inserted
+        """
+        if not expenses:
+            return 0
+
+        query = (
+            INSERT_OR_IGNORE_EXPENSE_QUERY
+            if ignore_duplicates
+            else INSERT_EXPENSE_QUERY
+        )
+        inserted = 0
+
+        # One statement per row: executemany() can tell neither which rows
+        # were ignored nor their IDs, and total_changes also counts the
+        # rows written by the rollup triggers
+        with self._db.writer() as connection:
+            cursor = connection.cursor()
+            for expense in expenses:
+                cursor.execute(query, self._map_expense_to_row(expense))
+                if cursor.rowcount == 1:
+                    expense.id = cursor.lastrowid
+                    inserted += 1
+
+        return inserted
+
+    @property
+    def data_version(self) -> int:
+        """
+        Changes every time a write to the database is committed,
+        see ConnectionManager.data_version.
+        """
+        return self._db.data_version
+
+    @property
+    def last_commit_version(self) -> int | None:
+        """
+        Data version of the last write committed by the calling thread,
+        see ConnectionManager.last_commit_version.
+        """
+        return self._db.last_commit_version
+
+    def transaction(self) -> ContextManager[sqlite3.Connection]:
+        """
+        Returns a context manager grouping several repository writes in a
+        single transaction. Repositories sharing the same ConnectionManager
+        take part in it, see ConnectionManager.writer().
+        """
+        return self._db.writer()
+
     def update(self, expense: Expense) -> None:
         """
         Update an existing expense.
         """
-        with self.conn as connection:
+        with self._db.writer() as connection:
             connection.execute(
                 """
                 UPDATE expenses
                 SET
                     date = ?,
                     amount = ?,
+                    amount_cents = ?,
                     category_id = ?,
                     description = ?,
                     attachment_path = ?,
@@ -87,7 +241,8 @@ class ExpenseRepository:
                 """,
                 (
                     expense.date.isoformat(),
-                    expense.amount,
+                    float(expense.amount),
+                    expense.amount.cents,
                     expense.category_id,
                     expense.description,
                     expense.attachment_path,
@@ -104,10 +259,10 @@ class ExpenseRepository:
         Returns:
             list[Expense]: List of expenses
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM expenses")
+            cursor.execute(f"SELECT {EXPENSE_COLUMNS} FROM expenses")
             rows = cursor.fetchall()
 
         return [self._map_row_to_expense(row) for row in rows]
@@ -123,12 +278,12 @@ class ExpenseRepository:
         Returns:
             list[Expense]: Filtered expenses
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
 
             cursor.execute(
-                """
-                SELECT * FROM expenses
+                f"""
+                SELECT {EXPENSE_COLUMNS} FROM expenses
                 WHERE date BETWEEN ? AND ?
                 """,
                 (
@@ -141,6 +296,511 @@ class ExpenseRepository:
 
         return [self._map_row_to_expense(row) for row in rows]
 
+    def get_all_sorted(
+        self, sort_by: str = "date", descending: bool = False
+    ) -> list[Expense]:
+        """
+        Retrieves all expenses sorted by the database.
+
+        Args:
+            sort_by (str): One of SORT_EXPRESSIONS
+            descending (bool): Sort direction
+
+        Returns:
+            list[Expense]: Sorted expenses
+        """
+        order_by = _order_by(sort_by, descending)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute(SORTABLE_EXPENSES_QUERY + order_by)
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_expense(row) for row in rows]
+
+    def get_by_period_sorted(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: str = "date",
+        descending: bool = False,
+    ) -> list[Expense]:
+        """
+        Retrieves the expenses within a given date range sorted by the database.
+
+        Args:
+            start_date (date): Start date (inclusive)
+            end_date (date): End date (inclusive)
+            sort_by (str): One of SORT_EXPRESSIONS
+            descending (bool): Sort direction
+
+        Returns:
+            list[Expense]: Sorted expenses
+        """
+        order_by = _order_by(sort_by, descending)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute(
+                SORTABLE_EXPENSES_QUERY + "WHERE e.date BETWEEN ? AND ?" + order_by,
+                (
+                    start_date.isoformat(),
+                    end_date.isoformat(),
+                ),
+            )
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_expense(row) for row in rows]
+
+    def get_list_rows_for_period(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: str = "date",
+        descending: bool = False,
+    ) -> list[ExpenseListRow]:
+        """
+        Retrieves the expense list rows within a given date range,
+        resolving category names and recurrence frequencies in the same query.
+
+        Args:
+            start_date (date): Start date (inclusive)
+            end_date (date): End date (inclusive)
+            sort_by (str): One of SORT_EXPRESSIONS
+            descending (bool): Sort direction
+
+        Returns:
+            list[ExpenseListRow]: Rows ready to be displayed
+        """
+        order_by = _order_by(sort_by, descending)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute(
+                LIST_ROWS_QUERY + "WHERE e.date BETWEEN ? AND ?" + order_by,
+                (
+                    start_date.isoformat(),
+                    end_date.isoformat(),
+                ),
+            )
+
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_list_row(row) for row in rows]
+
+    def get_all_list_rows(
+        self, sort_by: str = "date", descending: bool = False
+    ) -> list[ExpenseListRow]:
+        """
+        Retrieves the expense list rows for all expenses.
+
+        Args:
+            sort_by (str): One of SORT_EXPRESSIONS
+            descending (bool): Sort direction
+
+        Returns:
+            list[ExpenseListRow]: Rows ready to be displayed
+        """
+        order_by = _order_by(sort_by, descending)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+
+            cursor.execute(LIST_ROWS_QUERY + order_by)
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_list_row(row) for row in rows]
+
+    def get_frame(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> "ExpenseFrame":
+        """
+        Loads the expenses as an ExpenseFrame, streaming the cursor rows into
+        NumPy arrays without creating Expense objects.
+
+        Args:
+            start_date (date | None): Start date (inclusive), None for no limit
+            end_date (date | None): End date (inclusive), None for no limit
+
+        Returns:
+            ExpenseFrame: The expenses sorted by date
+        """
+        # NumPy is only needed by the vectorized analysis
+        from domain.expense_frame import ExpenseFrame
+
+        query = FRAME_QUERY
+        parameters: tuple = ()
+        if start_date is not None or end_date is not None:
+            query += "WHERE date BETWEEN ? AND ?"
+            parameters = (
+                (start_date or date.min).isoformat(),
+                (end_date or date.max).isoformat(),
+            )
+
+        with self._db.reader() as connection:
+            cursor = connection.execute(query + " ORDER BY date", parameters)
+
+            return ExpenseFrame.from_rows(cursor)
+
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Expense]:
+        """
+        Streams all expenses, ordered by date, fetching batch_size rows
+        at a time instead of loading the whole table.
+
+        A reader connection is held until the iterator is exhausted or
+        closed: consume it without waiting on other database work.
+        """
+        yield from self._iter_expenses(
+            f"SELECT {EXPENSE_COLUMNS} FROM expenses ORDER BY date, id",
+            (),
+            batch_size,
+        )
+
+    def iter_by_period(
+        self, start_date: date, end_date: date, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[Expense]:
+        """
+        Streams the expenses within a date range (inclusive), ordered by
+        date, fetching batch_size rows at a time. See iter_all().
+        """
+        yield from self._iter_expenses(
+            f"""
+            SELECT {EXPENSE_COLUMNS} FROM expenses
+            WHERE date BETWEEN ? AND ?
+            ORDER BY date, id
+            """,
+            (start_date.isoformat(), end_date.isoformat()),
+            batch_size,
+        )
+
+    def _iter_expenses(
+        self, query: str, parameters: tuple, batch_size: int
+    ) -> Iterator[Expense]:
+        with self._db.reader() as connection:
+            cursor = connection.execute(query, parameters)
+
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield self._map_row_to_expense(row)
+
+    def get_page(
+        self,
+        after: PageKey | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[Expense]:
+        """
+        Returns up to limit expenses following the key after, in (date, id)
+        order, optionally within a date range (inclusive).
+
+        The next page starts after (date, id) of the last expense returned;
+        an empty or short page means there are no more expenses. Each page
+        is an index seek, however far it is from the first one.
+        """
+        where, parameters = _page_filter(after, start_date, end_date, prefix="")
+
+        with self._db.reader() as connection:
+            cursor = connection.execute(
+                f"""
+                SELECT {EXPENSE_COLUMNS} FROM expenses
+                {where}
+                ORDER BY date, id
+                LIMIT ?
+                """,
+                (*parameters, limit),
+            )
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_expense(row) for row in rows]
+
+    def get_list_rows_page(
+        self,
+        after: PageKey | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[ExpenseListRow]:
+        """
+        Same as get_page(), returning expense list rows.
+        """
+        where, parameters = _page_filter(after, start_date, end_date, prefix="e.")
+
+        with self._db.reader() as connection:
+            cursor = connection.execute(
+                LIST_ROWS_QUERY
+                + f"""
+                {where}
+                ORDER BY e.date, e.id
+                LIMIT ?
+                """,
+                (*parameters, limit),
+            )
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_list_row(row) for row in rows]
+
+    def get_list_rows_window(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        limit: int,
+        sort_by: str = "date",
+        descending: bool = False,
+        after: ExpenseListRow | None = None,
+        offset: int = 0,
+    ) -> list[ExpenseListRow]:
+        """
+        Returns up to limit expense list rows of the sorted list, optionally
+        within a date range (inclusive), for lists showing one window of
+        rows at a time.
+
+        The rows start right after the row after, when given: a keyset
+        seek on the sort keys, whose cost does not depend on the position.
+        Otherwise they start at offset, which SQLite has to step over.
+        """
+        where, parameters = _page_filter(None, start_date, end_date, prefix="e.")
+
+        if after is not None:
+            keys = ", ".join(_sort_keys(sort_by))
+            values = _sort_key_values(after, sort_by)
+            placeholders = ", ".join("?" for _ in values)
+            operator = "<" if descending else ">"
+
+            where += " AND " if where else "WHERE "
+            where += f"({keys}) {operator} ({placeholders})"
+            parameters += values
+            offset = 0
+
+        with self._db.reader() as connection:
+            cursor = connection.execute(
+                LIST_ROWS_QUERY
+                + where
+                + _order_by(sort_by, descending)
+                + " LIMIT ? OFFSET ?",
+                (*parameters, limit, offset),
+            )
+            rows = cursor.fetchall()
+
+        return [self._map_row_to_list_row(row) for row in rows]
+
+    def get_count_and_total(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> tuple[int, Money]:
+        """
+        Returns the number of expenses and the sum of their amounts,
+        optionally within a date range (inclusive). Whole months and the
+        whole table are read from the monthly rollup.
+        """
+        if start_date is None and end_date is None:
+            months = (1, 1, 9999, 12)
+        elif start_date is not None and end_date is not None:
+            months = _whole_months(start_date, end_date)
+        else:
+            months = None
+
+        with self._db.reader() as connection:
+            if months is not None:
+                cursor = connection.execute(
+                    """
+                    SELECT COALESCE(SUM(count), 0), COALESCE(SUM(total), 0)
+                    FROM monthly_category_totals
+                    WHERE (year, month) BETWEEN (?, ?) AND (?, ?)
+                    """,
+                    months,
+                )
+            else:
+                where, parameters = _page_filter(None, start_date, end_date, prefix="")
+                cursor = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(amount_cents), 0) FROM expenses "
+                    + where,
+                    parameters,
+                )
+            count, total = cursor.fetchone()
+
+        return count, Money.from_cents(total)
+
+    def get_total_for_period(self, start_date: date, end_date: date) -> Money:
+        """
+        Returns the sum of all amounts within a date range (inclusive).
+        """
+        months = _whole_months(start_date, end_date)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            if months is not None:
+                cursor.execute(
+                    """
+                    SELECT COALESCE(SUM(total), 0) FROM monthly_category_totals
+                    WHERE (year, month) BETWEEN (?, ?) AND (?, ?)
+                    """,
+                    months,
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT COALESCE(SUM(amount_cents), 0) FROM expenses
+                    WHERE date BETWEEN ? AND ?
+                    """,
+                    (start_date.isoformat(), end_date.isoformat()),
+                )
+            row = cursor.fetchone()
+
+        return Money.from_cents(row[0])
+
+    def get_totals_by_category(
+        self, start_date: date, end_date: date
+    ) -> dict[int, Money]:
+        """
+        Returns the sum of amounts per category within a date range (inclusive).
+        Categories without expenses in the period are not included.
+        """
+        months = _whole_months(start_date, end_date)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            if months is not None:
+                cursor.execute(
+                    """
+                    SELECT category_id, SUM(total) FROM monthly_category_totals
+                    WHERE (year, month) BETWEEN (?, ?) AND (?, ?)
+                    GROUP BY category_id
+                    """,
+                    months,
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT category_id, SUM(amount_cents) FROM expenses
+                    WHERE date BETWEEN ? AND ?
+                    GROUP BY category_id
+                    """,
+                    (start_date.isoformat(), end_date.isoformat()),
+                )
+            rows = cursor.fetchall()
+
+        return {category_id: Money.from_cents(total) for category_id, total in rows}
+
+    def get_daily_totals(self, start_date: date, end_date: date) -> dict[date, Money]:
+        """
+        Returns the sum of amounts per day within a date range (inclusive).
+        Days without expenses are not included.
+        """
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT date, SUM(amount_cents) FROM expenses
+                WHERE date BETWEEN ? AND ?
+                GROUP BY date
+                """,
+                (start_date.isoformat(), end_date.isoformat()),
+            )
+            rows = cursor.fetchall()
+
+        return {date.fromisoformat(day): Money.from_cents(total) for day, total in rows}
+
+    def get_daily_totals_for_category(
+        self, start_date: date, end_date: date, category_id: int
+    ) -> dict[date, Money]:
+        """
+        Returns the sum of amounts per day for a single category
+        within a date range (inclusive).
+        Days without expenses are not included.
+        """
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT date, SUM(amount_cents) FROM expenses
+                WHERE category_id = ? AND date BETWEEN ? AND ?
+                GROUP BY date
+                """,
+                (category_id, start_date.isoformat(), end_date.isoformat()),
+            )
+            rows = cursor.fetchall()
+
+        return {date.fromisoformat(day): Money.from_cents(total) for day, total in rows}
+
+    def get_daily_category_totals(self) -> dict[tuple[date, int], Money]:
+        """
+        Returns the sum of amounts per day and category, for all expenses.
+        """
+        with self._db.reader() as connection:
+            return _daily_category_totals(connection)
+
+    def get_daily_category_totals_at_version(
+        self,
+    ) -> tuple[dict[tuple[date, int], Money], int]:
+        """
+        Returns the sum of amounts per day and category, for all expenses,
+        and the data version they were read at. Writes wait for the query.
+        """
+        with self._db.snapshot() as (connection, version):
+            return _daily_category_totals(connection), version
+
+    def get_max_amount(self, start_date: date, end_date: date) -> Money | None:
+        """
+        Returns the largest single amount within a date range (inclusive),
+        or None if there are no expenses in the period.
+        """
+        months = _whole_months(start_date, end_date)
+
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            if months is not None:
+                cursor.execute(
+                    """
+                    SELECT MAX(max_amount) FROM monthly_category_totals
+                    WHERE (year, month) BETWEEN (?, ?) AND (?, ?)
+                    """,
+                    months,
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT MAX(amount_cents) FROM expenses
+                    WHERE date BETWEEN ? AND ?
+                    """,
+                    (start_date.isoformat(), end_date.isoformat()),
+                )
+            row = cursor.fetchone()
+
+        return Money.from_cents(row[0]) if row[0] is not None else None
+
+    def get_monthly_category_totals(self, year: int) -> list[MonthlyCategoryTotal]:
+        """
+        Returns the monthly rollups of a year, one per month and category
+        with expenses, ordered by month and category.
+        """
+        with self._db.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT year, month, category_id, total, count, max_amount
+                FROM monthly_category_totals
+                WHERE year = ?
+                ORDER BY month, category_id
+                """,
+                (year,),
+            )
+            rows = cursor.fetchall()
+
+        return [
+            MonthlyCategoryTotal(
+                year=row[0],
+                month=row[1],
+                category_id=row[2],
+                total_amount=Money.from_cents(row[3]),
+                count=row[4],
+                max_amount=Money.from_cents(row[5]),
+            )
+            for row in rows
+        ]
+
     def _map_row_to_expense(self, row: sqlite3.Row) -> Expense:
         """
         Maps a database row to an Expense domain object.
@@ -154,7 +814,7 @@ class ExpenseRepository:
         return Expense(
             id=row[0],
             date=date.fromisoformat(row[1]),
-            amount=row[2],
+            amount=Money.from_cents(row[2]),
             category_id=row[3],
             description=row[4],
             is_recurring=bool(row[5]),
@@ -166,26 +826,212 @@ class ExpenseRepository:
             recurring_expense_id=row[11],
         )
 
+    def _map_expense_to_row(self, expense: Expense) -> tuple:
+        """
+        Maps an Expense to the parameters of INSERT_EXPENSE_QUERY.
+        """
+        return (
+            expense.date.isoformat(),
+            float(expense.amount),  # legacy REAL column
+            expense.amount.cents,
+            expense.category_id,
+            expense.description,
+            int(expense.is_recurring),
+            expense.attachment_path,
+            expense.attachment_type,
+            expense.analysis_data,
+            expense.analysis_summary,
+            expense.created_at.isoformat(),
+            expense.recurring_expense_id,
+        )
+
+    def _map_row_to_list_row(self, row: sqlite3.Row) -> ExpenseListRow:
+        """
+        Maps a row of LIST_ROWS_QUERY to an ExpenseListRow.
+        """
+        return ExpenseListRow(
+            id=row[0],
+            date=date.fromisoformat(row[1]),
+            amount=Money.from_cents(row[2]),
+            category_id=row[3],
+            category_name=row[4],
+            description=row[5],
+            recurring_expense_id=row[6],
+            frequency=RecurrenceFrequency(row[7]) if row[7] else None,
+        )
+
     def delete(self, expense_id: int) -> None:
         """
         Delete an expense by its ID.
 
         :param expense_id: ID of the expense to delete
         """
-        with self.conn as conn:
+        with self._db.writer() as conn:
             conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
             conn.commit()
 
+    def get_list_row(self, expense_id: int) -> ExpenseListRow | None:
+        """
+        Retrieve the expense list row of an expense by its ID.
+        """
+        with self._db.reader() as connection:
+            cursor = connection.execute(
+                LIST_ROWS_QUERY + "WHERE e.id = ?", (expense_id,)
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        return self._map_row_to_list_row(row)
+
     def get_by_id(self, expense_id: int) -> Expense | None:
         """
         Retrieve an expense by its ID.
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
-            cursor.execute("SELECT * FROM expenses WHERE id = ?", (expense_id,))
+            cursor.execute(
+                f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE id = ?", (expense_id,)
+            )
             row = cursor.fetchone()
 
         if row is None:
             return None
 
         return self._map_row_to_expense(row)
+
+
+def _daily_category_totals(
+    connection: sqlite3.Connection,
+) -> dict[tuple[date, int], Money]:
+    """
+    Sum of amounts per day and category, for all expenses.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT date, category_id, SUM(amount_cents) FROM expenses
+        GROUP BY date, category_id
+        """
+    )
+
+    return {
+        (date.fromisoformat(day), category_id): Money.from_cents(total)
+        for day, category_id, total in cursor.fetchall()
+    }
+
+
+def _whole_months(
+    start_date: date, end_date: date
+) -> tuple[int, int, int, int] | None:
+    """
+    Returns (start year, start month, end year, end month) when a date range
+    is made of whole months, so that it can be read from the monthly
+    rollup, otherwise None.
+    """
+    if start_date.day != 1 or start_date > end_date:
+        return None
+
+    if end_date.day != calendar.monthrange(end_date.year, end_date.month)[1]:
+        return None
+
+    return start_date.year, start_date.month, end_date.year, end_date.month
+
+
+def _order_by(sort_by: str, descending: bool) -> str:
+    """
+    Builds the ORDER BY clause of the sorted queries. Ties are broken by
+    date and then id, in the same direction, so the order is stable and
+    the date and amount sorts can be read straight from an index.
+
+    Raises:
+        ValueError: if sort_by is not one of SORT_EXPRESSIONS.
+    """
+    direction = " DESC" if descending else ""
+
+    return " ORDER BY " + ", ".join(key + direction for key in _sort_keys(sort_by))
+
+
+def _sort_keys(sort_by: str) -> list[str]:
+    """
+    Returns the expressions the sorted queries order by.
+
+    Raises:
+        ValueError: if sort_by is not one of SORT_EXPRESSIONS.
+    """
+    if sort_by not in SORT_EXPRESSIONS:
+        raise ValueError(f"Cannot sort expenses by {sort_by!r}")
+
+    keys = [SORT_EXPRESSIONS[sort_by]]
+    if sort_by != "date":
+        keys.append("e.date")
+    keys.append("e.id")
+
+    return keys
+
+
+def _sort_key_values(row: ExpenseListRow, sort_by: str) -> tuple:
+    """
+    Returns the values of _sort_keys(sort_by) for a list row,
+    i.e. its position in the sorted list, used as keyset.
+    """
+    if sort_by == "date":
+        return (row.date.isoformat(), row.id)
+
+    value = {
+        "amount": lambda: row.amount.cents,
+        "category": lambda: row.category_name or "",
+        "frequency": lambda: FREQUENCY_MONTH_STEPS.get(row.frequency, 0),
+    }[sort_by]()
+
+    return (value, row.date.isoformat(), row.id)
+
+
+def list_row_sort_key(row: ExpenseListRow, sort_by: str) -> tuple:
+    """
+    Returns a key ordering list rows in Python the way the sorted queries
+    order them in SQLite (ascending), e.g. to place a new row in a list
+    already loaded.
+
+    Raises:
+        ValueError: if sort_by is not one of SORT_EXPRESSIONS.
+    """
+    if sort_by not in SORT_EXPRESSIONS:
+        raise ValueError(f"Cannot sort expenses by {sort_by!r}")
+
+    values = _sort_key_values(row, sort_by)
+
+    if sort_by == "category":
+        return (values[0].translate(_NOCASE), *values[1:])
+
+    return values
+
+
+def _page_filter(
+    after: PageKey | None,
+    start_date: date | None,
+    end_date: date | None,
+    prefix: str,
+) -> tuple[str, tuple]:
+    """
+    Builds the WHERE clause of a keyset page query.
+    prefix is the alias of the expenses table, e.g. "e.".
+    """
+    conditions: list[str] = []
+    parameters: list = []
+
+    if after is not None:
+        conditions.append(f"({prefix}date, {prefix}id) > (?, ?)")
+        parameters += [after[0].isoformat(), after[1]]
+    if start_date is not None:
+        conditions.append(f"{prefix}date >= ?")
+        parameters.append(start_date.isoformat())
+    if end_date is not None:
+        conditions.append(f"{prefix}date <= ?")
+        parameters.append(end_date.isoformat())
+
+    if not conditions:
+        return "", ()
+
+    return "WHERE " + " AND ".join(conditions), tuple(parameters)
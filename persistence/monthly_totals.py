@@ -0,0 +1,108 @@
+"""
+Verifies and rebuilds the monthly_category_totals rollup.
+
+The rollup is kept exact by the triggers on expenses (see persistence.db).
+This command recomputes it from scratch and reports the months and
+categories where the stored figures drifted, e.g. after the database was
+edited with a tool that bypassed the triggers.
+
+Run from the project root:
+    python -m persistence.monthly_totals [--rebuild] [--db data/expenses.db]
+"""
+
+import argparse
+import sqlite3
+from dataclasses import dataclass
+
+from persistence.db import (
+    PRODUCTION_DB_STRING_PATH,
+    MONTHLY_CATEGORY_TOTALS_QUERY,
+    get_connection,
+    init_db,
+    rebuild_monthly_category_totals,
+)
+
+# (total, count, max_amount), amounts in cents
+RollupFigures = tuple[int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class RollupDrift:
+    """
+    A month and category whose stored rollup differs from the expenses.
+    None means the row is missing.
+    """
+
+    year: int
+    month: int
+    category_id: int
+    stored: RollupFigures | None
+    expected: RollupFigures | None
+
+
+def find_monthly_totals_drift(connection: sqlite3.Connection) -> list[RollupDrift]:
+    """
+    Compares the stored rollup with the one recomputed from expenses.
+    """
+    stored = _load(
+        connection,
+        """
+        SELECT year, month, category_id, total, count, max_amount
+        FROM monthly_category_totals
+        """,
+    )
+    expected = _load(connection, MONTHLY_CATEGORY_TOTALS_QUERY)
+
+    return [
+        RollupDrift(*key, stored=stored.get(key), expected=expected.get(key))
+        for key in sorted(stored.keys() | expected.keys())
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+def _load(
+    connection: sqlite3.Connection, query: str
+) -> dict[tuple[int, int, int], RollupFigures]:
+    """
+    Runs a query returning rollup rows and indexes them by month and category.
+    """
+    return {
+        (year, month, category_id): (total, count, max_amount)
+        for year, month, category_id, total, count, max_amount in connection.execute(
+            query
+        )
+    }
+
+
+def main() -> None:
+    """
+    Reports the drift of the rollup and optionally rebuilds it.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=PRODUCTION_DB_STRING_PATH)
+    parser.add_argument(
+        "--rebuild", action="store_true", help="recompute the rollup from scratch"
+    )
+    args = parser.parse_args()
+
+    connection = get_connection(args.db)
+    init_db(connection)
+
+    drift = find_monthly_totals_drift(connection)
+
+    for row in drift:
+        print(
+            f"{row.year}-{row.month:02d} category {row.category_id}: "
+            f"stored {row.stored}, expected {row.expected}"
+        )
+    print(f"{len(drift)} rollup rows out of date.")
+
+    if args.rebuild:
+        rebuild_monthly_category_totals(connection)
+        print("Rollup rebuilt.")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,26 @@ Repository responsible for persistence of RecurringExpense entities.
 """
 
 from datetime import date, datetime
-import sqlite3
 from typing import List, Optional
 
-from domain.models import RecurringExpense, RecurrenceFrequency
+from domain.models import Money, RecurringExpense, RecurrenceFrequency
+from persistence.db import ConnectionManager
+
+# Columns read into a RecurringExpense, in the order used by _map_row_to_entity
+RECURRING_EXPENSE_COLUMNS = """
+    id,
+    name,
+    amount_cents,
+    category_id,
+    frequency,
+    start_date,
+    end_date,
+    description,
+    attachment_path,
+    attachment_type,
+    last_generated_date,
+    created_at
+"""
 
 
 class RecurringExpenseRepository:
@@ -14,14 +30,14 @@ class RecurringExpenseRepository:
     Repository responsible for persistence of RecurringExpense entities.
     """
 
-    def __init__(self, connection: sqlite3.Connection):
-        self.conn = connection
+    def __init__(self, database: ConnectionManager):
+        self._db = database
 
     def add(self, recurring_expense: RecurringExpense) -> RecurringExpense:
         """
         Persists a new RecurringExpense into the database.
         """
-        with self.conn as connection:
+        with self._db.writer() as connection:
             cursor = connection.cursor()
 
             cursor.execute(
@@ -29,6 +45,7 @@ class RecurringExpenseRepository:
                 INSERT INTO recurring_expenses (
                     name,
                     amount,
+                    amount_cents,
                     category_id,
                     frequency,
                     start_date,
@@ -39,11 +56,12 @@ class RecurringExpenseRepository:
                     last_generated_date,
                     created_at
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     recurring_expense.name,
-                    recurring_expense.amount,
+                    float(recurring_expense.amount),  # legacy REAL column
+                    recurring_expense.amount.cents,
                     recurring_expense.category_id,
                     recurring_expense.frequency.value,
                     recurring_expense.start_date.isoformat(),
@@ -71,9 +89,9 @@ class RecurringExpenseRepository:
         """
         Returns all recurring expenses.
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
-            cursor.execute("SELECT * FROM recurring_expenses")
+            cursor.execute(f"SELECT {RECURRING_EXPENSE_COLUMNS} FROM recurring_expenses")
             rows = cursor.fetchall()
 
             return [self._map_row_to_entity(row) for row in rows]
@@ -82,10 +100,10 @@ class RecurringExpenseRepository:
         """
         Returns a recurring expense by its ID, if found.
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                "SELECT * FROM recurring_expenses WHERE id = ?",
+                f"SELECT {RECURRING_EXPENSE_COLUMNS} FROM recurring_expenses WHERE id = ?",
                 (recurring_expense_id,),
             )
             row = cursor.fetchone()
@@ -99,10 +117,11 @@ class RecurringExpenseRepository:
         """
         Returns a recurring expense by its name, if found.
         """
-        with self.conn as connection:
+        with self._db.reader() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                "SELECT * FROM recurring_expenses WHERE name = ?",
+                f"SELECT {RECURRING_EXPENSE_COLUMNS} FROM recurring_expenses "
+                "WHERE name = ?",
                 (name,),
             )
             row = cursor.fetchone()
@@ -118,7 +137,7 @@ class RecurringExpenseRepository:
         """
         Updates the last_generated_date field for a recurring expense.
         """
-        with self.conn as connection:
+        with self._db.writer() as connection:
             cursor = connection.cursor()
             cursor.execute(
                 """
@@ -129,6 +148,30 @@ class RecurringExpenseRepository:
                 (generated_date.isoformat(), recurring_expense_id),
             )
 
+    def update_last_generated_dates(self, generated_dates: dict[int, date]) -> None:
+        """
+        Updates the last_generated_date field of several recurring expenses
+        with a single executemany call.
+
+        Args:
+            generated_dates (dict[int, date]): recurring expense ID -> last date
+        """
+        if not generated_dates:
+            return
+
+        with self._db.writer() as connection:
+            connection.executemany(
+                """
+                UPDATE recurring_expenses
+                SET last_generated_date = ?
+                WHERE id = ?
+                """,
+                [
+                    (generated_date.isoformat(), recurring_expense_id)
+                    for recurring_expense_id, generated_date in generated_dates.items()
+                ],
+            )
+
     def stop(
         self,
         recurring_id: int,
@@ -144,7 +187,7 @@ class RecurringExpenseRepository:
         """
         effective_end_date = end_date
 
-        with self.conn as conn:
+        with self._db.writer() as conn:
             conn.execute(
                 """
                 UPDATE recurring_expenses
@@ -162,7 +205,7 @@ class RecurringExpenseRepository:
         return RecurringExpense(
             id=row[0],
             name=row[1],
-            amount=row[2],
+            amount=Money.from_cents(row[2]),
             category_id=row[3],
             frequency=RecurrenceFrequency(row[4]),
             start_date=date.fromisoformat(row[5]),
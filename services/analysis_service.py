@@ -5,16 +5,23 @@ Docstring for services.analysis_service
 # from collections import defaultdict
 from datetime import date, timedelta
 from decimal import Decimal
+from typing import Callable, Hashable, TypeVar
 
 from domain.models import (
     CategorySummary,
     Expense,
     ExpenseAnalysisResult,
+    Money,
     OverallSummary,
     PeriodComparison,
+    PeriodTotals,
     DateRange,
 )
+from services.daily_totals_index import DailyTotalsIndex
 from services.expense_service import ExpenseService
+from services.result_cache import VersionedLRUCache
+
+T = TypeVar("T")
 
 
 class AnalysisService:
@@ -29,12 +36,49 @@ class AnalysisService:
     :vartype compare_previous_period: bool
     """
 
-    def __init__(self, expense_service: ExpenseService):
+    def __init__(
+        self,
+        expense_service: ExpenseService,
+        totals_index: DailyTotalsIndex | None = None,
+        cache: VersionedLRUCache | None = None,
+    ):
         self._expense_service = expense_service
+        # When given, range totals are answered from memory
+        self._totals_index = totals_index
+        # When given, summaries and daily totals are reused until a write
+        self._cache = cache
+
+    def get_data_version(self) -> Hashable:
+        """
+        Returns a value that changes every time the analysed data is written,
+        see ExpenseService.get_data_version(), and, with a totals index, once
+        the index has applied the write too.
+
+        The database version alone is bumped at commit, before the listeners
+        of ExpenseService update the index: a summary computed in between
+        would otherwise be cached with the totals from before the write.
+        """
+        if self._totals_index is None:
+            return self._expense_service.get_data_version()
+
+        return (
+            self._expense_service.get_data_version(),
+            self._totals_index.generation,
+        )
+
+    def _cached(self, key: tuple, compute: Callable[[], T]) -> T:
+        """
+        Returns the cached result for key, computing it on a miss
+        or when the data changed since it was cached.
+        """
+        if self._cache is None:
+            return compute()
+
+        return self._cache.get_or_compute(key, self.get_data_version(), compute)
 
     def get_total_by_category(
         self, start_date: date, end_date: date
-    ) -> dict[int, Decimal]:
+    ) -> dict[int, Money]:
         """
         Docstring for get_total_by_category
 
@@ -44,30 +88,16 @@ class AnalysisService:
         :param end_date: Description
         :type end_date: date
         :return: Description
-        :rtype: dict[int, Decimal]
+        :rtype: dict[int, Money]
         """
-        expenses = self._expense_service.get_expenses_for_period(
+        if self._totals_index is not None:
+            return self._totals_index.totals_by_category(start_date, end_date)
+
+        totals = self._expense_service.get_totals_by_category(
             start_date=start_date, end_date=end_date
         )
 
-        # totals: dict[int, Decimal] = defaultdict(Decimal)
-
-        # for expense in expenses:
-        #     totals[expense.category_id] += expense.amount
-
-        # return dict(totals)
-
-        totals: dict[int, Decimal] = {}
-
-        for expense in expenses:
-            category_id = expense.category_id
-
-            if category_id not in totals:
-                totals[category_id] = Decimal("0")
-
-            totals[category_id] += Decimal(expense.amount)
-
-        return totals
+        return {category_id: Money(total) for category_id, total in totals.items()}
 
     def get_daily_average_for_period(self, start_date: date, end_date: date) -> Decimal:
         """
@@ -75,6 +105,14 @@ class AnalysisService:
         """
         total = self.get_total_for_period(start_date, end_date)
 
+        return self._get_daily_average(total, start_date, end_date)
+
+    def _get_daily_average(
+        self, total: Decimal, start_date: date, end_date: date
+    ) -> Decimal:
+        """
+        Divides an already computed total by the number of days in the period.
+        """
         days = (end_date - start_date).days + 1  # inclusive
 
         if days == 0:
@@ -108,7 +146,7 @@ class AnalysisService:
 
         return max_expense
 
-    def get_total_for_period(self, start_date: date, end_date: date) -> Decimal:
+    def get_total_for_period(self, start_date: date, end_date: date) -> Money:
         """
         Docstring for get_total_for_period
 
@@ -117,18 +155,16 @@ class AnalysisService:
         :param end_date: Description
         :type end_date: date
         :return: Description
-        :rtype: Decimal
+        :rtype: Money
         """
-        expenses = self._expense_service.get_expenses_for_period(
+        if self._totals_index is not None:
+            return self._totals_index.total(start_date, end_date)
+
+        total = self._expense_service.get_total_for_period(
             start_date=start_date, end_date=end_date
         )
 
-        total = Decimal("0")
-
-        for expense in expenses:
-            total += Decimal(expense.amount)
-
-        return total
+        return Money(total)
 
     def compare_total_for_periods(
         self,
@@ -148,20 +184,7 @@ class AnalysisService:
             start_date=previous_start_date, end_date=previous_end_date
         )
 
-        delta_absolute = current_total - previous_total
-
-        return PeriodComparison(
-            current=current_total,
-            previous=previous_total,
-            delta_absolute=delta_absolute,
-            delta_percentage=(
-                (
-                    (delta_absolute / previous_total * 100)
-                    if previous_total != Decimal("0")
-                    else None
-                )
-            ),
-        )
+        return self._compare(current_total, previous_total)
 
     def compare_totals_by_category_for_periods(
         self,
@@ -180,30 +203,45 @@ class AnalysisService:
             previous_start_date, previous_end_date
         )
 
+        return self._compare_category_totals(current_totals, previous_totals)
+
+    def _compare_category_totals(
+        self,
+        current_totals: dict[int, Decimal],
+        previous_totals: dict[int, Decimal],
+    ) -> dict[int, PeriodComparison]:
+        """
+        Compares per-category totals of two periods.
+        Categories present in only one of the periods are compared against zero.
+        """
         all_category_ids = set(current_totals.keys()).union(previous_totals.keys())
 
         comparisons: dict[int, PeriodComparison] = {}
 
         for category_id in all_category_ids:
-            current_total = current_totals.get(category_id, Decimal("0"))
-            previous_total = previous_totals.get(category_id, Decimal("0"))
-            delta_absolute = current_total - previous_total
-
-            comparisons[category_id] = PeriodComparison(
-                current=current_total,
-                previous=previous_total,
-                delta_absolute=delta_absolute,
-                delta_percentage=(
-                    (
-                        (delta_absolute / previous_total * 100)
-                        if previous_total != Decimal("0")
-                        else None
-                    )
-                ),
+            comparisons[category_id] = self._compare(
+                current_totals.get(category_id, Decimal("0")),
+                previous_totals.get(category_id, Decimal("0")),
             )
 
         return comparisons
 
+    def _compare(self, current: Decimal, previous: Decimal) -> PeriodComparison:
+        """
+        Builds a PeriodComparison between two amounts.
+        The percentage is None when the previous amount is zero.
+        """
+        delta_absolute = current - previous
+
+        return PeriodComparison(
+            current=current,
+            previous=previous,
+            delta_absolute=delta_absolute,
+            delta_percentage=(
+                (delta_absolute / previous * 100) if previous != Decimal("0") else None
+            ),
+        )
+
     def compare_daily_average_for_periods(
         self,
         current_start_date: date,
@@ -221,20 +259,7 @@ class AnalysisService:
             start_date=previous_start_date, end_date=previous_end_date
         )
 
-        delta_absolute = current_average - previous_average
-
-        return PeriodComparison(
-            current=current_average,
-            previous=previous_average,
-            delta_absolute=delta_absolute,
-            delta_percentage=(
-                (
-                    (delta_absolute / previous_average * 100)
-                    if previous_average != Decimal("0")
-                    else None
-                )
-            ),
-        )
+        return self._compare(current_average, previous_average)
 
     def _get_previous_period(
         self, start_date: date, end_date: date
@@ -267,8 +292,31 @@ class AnalysisService:
         """
         Return a summary of expenses for the given period.
 
-        This is a stub implementation.
+        The current and the previous period are fetched once each and every
+        figure of the summary is derived from those two aggregates.
+        """
+        return self._cached(
+            (
+                "summary",
+                start_date,
+                end_date,
+                tuple(sorted(category_map.items())),
+                compare_previous_period,
+            ),
+            lambda: self._build_expense_summary(
+                start_date, end_date, category_map, compare_previous_period
+            ),
+        )
 
+    def _build_expense_summary(
+        self,
+        start_date: date,
+        end_date: date,
+        category_map: dict[int, str],
+        compare_previous_period: bool,
+    ) -> ExpenseAnalysisResult:
+        """
+        Computes the summary returned by get_expense_summary.
         """
         current_period_start_date = start_date
         current_period_end_date = end_date
@@ -279,28 +327,31 @@ class AnalysisService:
             )
         )
 
-        overall_comparison = self.compare_total_for_periods(
-            current_start_date=current_period_start_date,
-            current_end_date=current_period_end_date,
-            previous_start_date=previous_period_start_date,
-            previous_end_date=previous_period_end_date,
+        current = self._aggregate_period(
+            current_period_start_date, current_period_end_date
         )
-
-        average_comparison = self.compare_daily_average_for_periods(
-            current_start_date=current_period_start_date,
-            current_end_date=current_period_end_date,
-            previous_start_date=previous_period_start_date,
-            previous_end_date=previous_period_end_date,
+        # Only the current period's max single expense is shown
+        previous = self._aggregate_period(
+            previous_period_start_date, previous_period_end_date, with_max=False
         )
 
-        max_single_expense = self.get_max_expense_for_period(
-            start_date=current_period_start_date, end_date=current_period_end_date
+        overall_comparison = self._compare(current.total_amount, previous.total_amount)
+
+        average_comparison = self._compare(
+            self._get_daily_average(
+                current.total_amount, current_period_start_date, current_period_end_date
+            ),
+            self._get_daily_average(
+                previous.total_amount,
+                previous_period_start_date,
+                previous_period_end_date,
+            ),
         )
 
-        if max_single_expense:
-            max_single_expense_amount = max_single_expense.amount
+        if current.max_single_expense is not None:
+            max_single_expense_amount = current.max_single_expense
         else:
-            max_single_expense_amount = 0
+            max_single_expense_amount = Money(0)
 
         overall = OverallSummary(
             total_amount=overall_comparison.current,
@@ -321,11 +372,8 @@ class AnalysisService:
             max_single_expense=max_single_expense_amount,
         )
 
-        totals = self.compare_totals_by_category_for_periods(
-            current_start_date=current_period_start_date,
-            current_end_date=current_period_end_date,
-            previous_start_date=previous_period_start_date,
-            previous_end_date=previous_period_end_date,
+        totals = self._compare_category_totals(
+            current.by_category, previous.by_category
         )
 
         by_category: list[CategorySummary] = [
@@ -352,59 +400,140 @@ class AnalysisService:
             by_category=tuple(by_category),
         )
 
+    def _aggregate_period(
+        self, start_date: date, end_date: date, with_max: bool = True
+    ) -> PeriodTotals:
+        """
+        Computes total, max single expense and per-category totals
+        from the aggregate queries, without loading single expenses.
+        The max single expense is None when with_max is False.
+        """
+        by_category = self.get_total_by_category(start_date, end_date)
+
+        # Sum in integer cents: exact and independent of the Decimal context
+        total = Money.from_cents(sum(amount.cents for amount in by_category.values()))
+        max_amount = (
+            self._expense_service.get_max_amount(
+                start_date=start_date, end_date=end_date
+            )
+            if with_max
+            else None
+        )
+
+        return PeriodTotals(
+            total_amount=total,
+            max_single_expense=Money(max_amount) if max_amount is not None else None,
+            by_category=by_category,
+        )
+
     def get_daily_totals_for_period(
         self, start_date: date, end_date: date
-    ) -> dict[date, Decimal]:
+    ) -> dict[date, Money]:
         """
         Docstring for get_daily_totals_for_period
         """
-        expenses = self._expense_service.get_expenses_for_period(
-            start_date=start_date, end_date=end_date
+        daily_totals = self._cached(
+            ("daily", start_date, end_date, None),
+            lambda: self._fill_missing_days(
+                self._expense_service.get_daily_totals(
+                    start_date=start_date, end_date=end_date
+                ),
+                start_date,
+                end_date,
+            ),
         )
 
-        daily_totals: dict[date, Decimal] = {}
+        return dict(daily_totals)  # the cached dict stays untouched
 
-        for expense in expenses:
-            expense_date = expense.date
+    def get_daily_totals_for_period_and_category(
+        self, start_date: date, end_date: date, category_id: int
+    ) -> dict[date, Money]:
+        """
+        Docstring for get_daily_totals_for_period_and_category
+        """
+        daily_totals = self._cached(
+            ("daily", start_date, end_date, category_id),
+            lambda: self._fill_missing_days(
+                self._expense_service.get_daily_totals_for_category(
+                    start_date=start_date, end_date=end_date, category_id=category_id
+                ),
+                start_date,
+                end_date,
+            ),
+        )
 
-            if expense_date not in daily_totals:
-                daily_totals[expense_date] = Decimal("0")
+        return dict(daily_totals)  # the cached dict stays untouched
 
-            daily_totals[expense_date] += Decimal(expense.amount)
+    def _fill_missing_days(
+        self, daily_totals: dict[date, Money], start_date: date, end_date: date
+    ) -> dict[date, Money]:
+        """
+        Converts daily totals to Money and adds a zero entry
+        for every day of the period without expenses.
+        """
+        filled: dict[date, Money] = {
+            day: Money(total) for day, total in daily_totals.items()
+        }
 
         current = start_date
         while current <= end_date:
-            if current not in daily_totals:
-                daily_totals[current] = Decimal("0")
+            if current not in filled:
+                filled[current] = Money(0)
             current += timedelta(days=1)
 
-        return daily_totals
+        return filled
 
-    def get_daily_totals_for_period_and_category(
-        self, start_date: date, end_date: date, category_id: int
-    ) -> dict[date, Decimal]:
+    def get_monthly_totals_for_year(self, year: int) -> dict[int, Money]:
         """
-        Docstring for get_daily_totals_for_period_and_category
+        Returns the total of every month (1-12) of a year,
+        read from the monthly rollup.
         """
-        expenses = self._expense_service.get_expenses_for_period(
-            start_date=start_date, end_date=end_date
-        )
+        totals = {month: Money(0) for month in range(1, 13)}
+
+        for row in self._expense_service.get_monthly_category_totals(year):
+            totals[row.month] += row.total_amount
+
+        return totals
 
-        daily_totals: dict[date, Decimal] = {}
+    def get_monthly_totals_by_category_for_year(
+        self, year: int
+    ) -> dict[int, dict[int, Money]]:
+        """
+        Returns, for every category with expenses in a year,
+        the total of every month (1-12), read from the monthly rollup.
+        """
+        totals: dict[int, dict[int, Money]] = {}
 
-        for expense in expenses:
-            if expense.category_id == category_id:
-                expense_date = expense.date
+        for row in self._expense_service.get_monthly_category_totals(year):
+            months = totals.setdefault(
+                row.category_id, {month: Money(0) for month in range(1, 13)}
+            )
+            months[row.month] = row.total_amount
 
-                if expense_date not in daily_totals:
-                    daily_totals[expense_date] = Decimal("0")
+        return totals
 
-                daily_totals[expense_date] += Decimal(expense.amount)
+    def get_monthly_average_for_year(
+        self, year: int, category_id: int | None = None, today: date | None = None
+    ) -> Decimal:
+        """
+        Returns the average monthly spending of a year, overall or for a
+        single category. For the current year only the months up to today
+        are counted.
+        """
+        today = today or date.today()
 
-        current = start_date
-        while current <= end_date:
-            if current not in daily_totals:
-                daily_totals[current] = Decimal("0")
-            current += timedelta(days=1)
+        if year > today.year:
+            return Decimal("0")
+
+        months = 12 if year < today.year else today.month
+
+        total = sum(
+            (
+                row.total_amount
+                for row in self._expense_service.get_monthly_category_totals(year)
+                if category_id is None or row.category_id == category_id
+            ),
+            start=Money(0),
+        )
 
-        return daily_totals
+        return total / Decimal(months)
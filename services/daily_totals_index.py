@@ -0,0 +1,278 @@
+"""
+services/daily_totals_index.py
+
+In-memory prefix sums over the daily totals, overall and per category.
+
+Every figure of the analysis that is a "sum of amounts between two dates"
+(period totals, comparisons with the previous period, daily averages,
+per-category totals) is answered with two lookups instead of a query.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import date
+from itertools import accumulate
+from typing import Iterator
+
+from domain.models import ExpenseChangeSet, Money
+from services.expense_service import ExpenseService
+
+
+class DailyTotalsIndex:
+    """
+    Daily totals in cents, stored as dense per-day lists from the first to
+    the last day with expenses, plus their cumulative sums.
+
+    The index is loaded from the database by the first query, so that the
+    full history is read by the worker threads running the analysis and
+    never on the Tk thread, and is then kept up to date by listening to the
+    changes made through ExpenseService. Changes update the daily lists in
+    place; the cumulative sums of the touched lists are recomputed on the
+    next query, so a range total costs O(1) and a burst of changes costs a
+    single O(days) pass.
+
+    The totals are read together with their data version: changes
+    committed before it are skipped, changes arriving during the load are
+    applied once it is done. A reload only drops the totals.
+
+    Safe to use from several threads.
+
+    generation is bumped every time a change has been applied, after the
+    data version of the database: cached results depending on the index
+    must be keyed on both, see AnalysisService.get_data_version().
+    """
+
+    def __init__(self, expense_service: ExpenseService):
+        self._expense_service = expense_service
+        self._lock = threading.Lock()
+        # held while reading the totals, so that they are read only once
+        self._load_lock = threading.Lock()
+
+        self._loaded = False
+        self._version = 0  # data version of the loaded totals
+        # changes received while loading, None when not loading
+        self._pending: list[ExpenseChangeSet] | None = None
+
+        self._first_day = 0  # ordinal of index 0
+        self._daily: list[int] = []
+        self._daily_by_category: dict[int, list[int]] = {}
+
+        # prefix[i] is the sum of the first i days, None when stale
+        self._prefix: list[int] | None = None
+        self._prefix_by_category: dict[int, list[int]] = {}
+
+        self.generation = 0
+
+        expense_service.add_change_listener(self.apply)
+
+    def load(self) -> None:
+        """
+        Reads the daily totals from the database, unless already loaded.
+        Blocks until they are, e.g. while another thread loads them.
+        """
+        with self._load_lock:
+            while True:
+                with self._lock:
+                    if self._loaded:
+                        return
+                    pending = self._pending = []
+
+                totals, version = (
+                    self._expense_service.get_daily_category_totals_at_version()
+                )
+
+                with self._lock:
+                    if self._pending is not pending:
+                        continue  # reloaded meanwhile, the totals may be stale
+
+                    self._clear()
+                    self._version = version
+
+                    # in date order, so that the lists only grow at the end
+                    for (day, category_id), amount in sorted(totals.items()):
+                        self._add(day, category_id, amount.cents)
+                    for change in pending:
+                        self._apply(change)
+
+                    self._pending = None
+                    self._loaded = True
+                    self.generation += 1
+
+    def rebuild(self) -> None:
+        """
+        Reloads all the daily totals from the database now.
+        """
+        self.invalidate()
+        self.load()
+
+    def invalidate(self) -> None:
+        """
+        Drops the daily totals, read again by the next query.
+        """
+        with self._lock:
+            self._loaded = False
+            self._pending = None
+            self._clear()
+            self.generation += 1
+
+    def apply(self, change: ExpenseChangeSet) -> None:
+        """
+        Updates the index with a change made through ExpenseService.
+        """
+        if change.reload:
+            self.invalidate()
+            return
+
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            elif self._loaded:
+                self._apply(change)
+            # otherwise the change is read with the totals
+
+            self.generation += 1
+
+    def total(self, start_date: date, end_date: date) -> Money:
+        """
+        Returns the sum of all amounts within a date range (inclusive).
+        """
+        with self._loaded_and_locked():
+            if self._prefix is None:
+                self._prefix = list(accumulate(self._daily, initial=0))
+
+            return Money.from_cents(self._range_sum(self._prefix, start_date, end_date))
+
+    def total_for_category(
+        self, start_date: date, end_date: date, category_id: int
+    ) -> Money:
+        """
+        Returns the sum of the amounts of a category within a date range
+        (inclusive).
+        """
+        with self._loaded_and_locked():
+            return Money.from_cents(
+                self._range_sum(
+                    self._category_prefix(category_id), start_date, end_date
+                )
+            )
+
+    def totals_by_category(
+        self, start_date: date, end_date: date
+    ) -> dict[int, Money]:
+        """
+        Returns the sum of amounts per category within a date range
+        (inclusive). Categories without expenses in the period are not
+        included.
+        """
+        totals: dict[int, Money] = {}
+
+        with self._loaded_and_locked():
+            for category_id in self._daily_by_category:
+                total = self._range_sum(
+                    self._category_prefix(category_id), start_date, end_date
+                )
+                if total:
+                    totals[category_id] = Money.from_cents(total)
+
+        return totals
+
+    @contextmanager
+    def _loaded_and_locked(self) -> Iterator[None]:
+        """
+        Holds the lock over loaded totals, loading them first if needed.
+        """
+        while True:
+            self.load()
+            self._lock.acquire()
+            if self._loaded:
+                break
+            self._lock.release()  # reloaded in the meantime
+
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _apply(self, change: ExpenseChangeSet) -> None:
+        """
+        Applies a change to the loaded totals, unless they include it
+        already. Must be called with the lock held.
+        """
+        if change.version is not None and change.version <= self._version:
+            return
+
+        for expense in change.removed:
+            self._add(expense.date, expense.category_id, -expense.amount.cents)
+        for expense in change.added:
+            self._add(expense.date, expense.category_id, expense.amount.cents)
+
+    def _clear(self) -> None:
+        """
+        Empties the daily lists. Must be called with the lock held.
+        """
+        self._daily = []
+        self._daily_by_category = {}
+        self._prefix = None
+        self._prefix_by_category = {}
+
+    def _category_prefix(self, category_id: int) -> list[int]:
+        """
+        Returns the cumulative sums of a category, recomputing them if stale.
+        Must be called with the lock held.
+        """
+        prefix = self._prefix_by_category.get(category_id)
+
+        if prefix is None:
+            daily = self._daily_by_category.get(category_id, [])
+            prefix = list(accumulate(daily, initial=0))
+            self._prefix_by_category[category_id] = prefix
+
+        return prefix
+
+    def _range_sum(self, prefix: list[int], start_date: date, end_date: date) -> int:
+        """
+        Sum of the days between two dates (inclusive) from cumulative sums.
+        Days outside of the index count as zero.
+        """
+        if start_date > end_date:
+            raise ValueError("start_date cannot be after end_date")
+
+        last = len(prefix) - 1
+        start = min(max(start_date.toordinal() - self._first_day, 0), last)
+        end = min(max(end_date.toordinal() - self._first_day + 1, 0), last)
+
+        return prefix[end] - prefix[start] if end > start else 0
+
+    def _add(self, day: date, category_id: int, cents: int) -> None:
+        """
+        Adds an amount to a day, growing the daily lists if needed.
+        Must be called with the lock held.
+        """
+        ordinal = day.toordinal()
+
+        if not self._daily:
+            self._first_day = ordinal
+
+        if ordinal < self._first_day:
+            padding = [0] * (self._first_day - ordinal)
+            self._daily[:0] = padding
+            for daily in self._daily_by_category.values():
+                daily[:0] = padding
+            self._first_day = ordinal
+            self._prefix_by_category = {}
+
+        position = ordinal - self._first_day
+        length = max(position + 1, len(self._daily))
+
+        if len(self._daily) < length:
+            self._daily.extend([0] * (length - len(self._daily)))
+
+        daily = self._daily_by_category.setdefault(category_id, [])
+        if len(daily) < length:
+            daily.extend([0] * (length - len(daily)))
+
+        self._daily[position] += cents
+        daily[position] += cents
+
+        self._prefix = None
+        self._prefix_by_category.pop(category_id, None)
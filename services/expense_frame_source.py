@@ -0,0 +1,135 @@
+"""
+services/expense_frame_source.py
+
+Serves the aggregates used by AnalysisService from an ExpenseFrame,
+so that analyses over many years are NumPy reductions on data loaded once
+instead of a query (or a loop over Expense objects) per figure.
+
+Usage:
+    frame = expense_service.get_expense_frame()
+    analysis = AnalysisService(ExpenseFrameSource(frame, expense_service))
+"""
+
+from datetime import date
+
+from domain.expense_frame import ExpenseFrame
+from domain.models import Expense, MonthlyCategoryTotal, Money
+from services.expense_service import ExpenseService
+
+
+class ExpenseFrameSource:
+    """
+    Drop-in replacement of ExpenseService for AnalysisService,
+    computing every aggregate on an in-memory ExpenseFrame.
+    """
+
+    def __init__(self, frame: ExpenseFrame, expense_service: ExpenseService):
+        """
+        Args:
+            frame (ExpenseFrame): The expenses to analyse
+            expense_service (ExpenseService): Used for the few methods that
+                need complete Expense objects
+        """
+        self._frame = frame
+        self._expense_service = expense_service
+        # The frame does not change: results computed on it stay valid
+        self._data_version = expense_service.get_data_version()
+
+    @property
+    def frame(self) -> ExpenseFrame:
+        return self._frame
+
+    def get_data_version(self) -> int:
+        """
+        Returns the data version of the database when the source was
+        created, which the frame is a snapshot of: unlike
+        ExpenseService.get_data_version() it never changes.
+        """
+        return self._data_version
+
+    def get_expenses_for_period(self, start_date: date, end_date: date) -> list[Expense]:
+        """
+        Retrieves the complete expenses within a period from the database.
+        """
+        return self._expense_service.get_expenses_for_period(start_date, end_date)
+
+    def get_total_for_period(self, start_date: date, end_date: date) -> Money:
+        """
+        Returns the total amount spent within a specific time period.
+        """
+        return Money.from_cents(self._slice(start_date, end_date).total_cents())
+
+    def get_totals_by_category(
+        self, start_date: date, end_date: date
+    ) -> dict[int, Money]:
+        """
+        Returns the total amount per category within a specific time period.
+        """
+        totals = self._slice(start_date, end_date).totals_by_category()
+
+        return {
+            category_id: Money.from_cents(total)
+            for category_id, total in totals.items()
+        }
+
+    def get_daily_totals(self, start_date: date, end_date: date) -> dict[date, Money]:
+        """
+        Returns the total amount per day within a specific time period.
+        Days without expenses are not included.
+        """
+        totals = self._slice(start_date, end_date).totals_by_day()
+
+        return {day: Money.from_cents(total) for day, total in totals.items()}
+
+    def get_daily_totals_for_category(
+        self, start_date: date, end_date: date, category_id: int
+    ) -> dict[date, Money]:
+        """
+        Returns the total amount per day for a single category
+        within a specific time period.
+        Days without expenses are not included.
+        """
+        totals = (
+            self._slice(start_date, end_date).for_category(category_id).totals_by_day()
+        )
+
+        return {day: Money.from_cents(total) for day, total in totals.items()}
+
+    def get_max_amount(self, start_date: date, end_date: date) -> Money | None:
+        """
+        Returns the largest single amount within a specific time period.
+        """
+        max_cents = self._slice(start_date, end_date).max_cents()
+
+        return Money.from_cents(max_cents) if max_cents is not None else None
+
+    def get_monthly_category_totals(self, year: int) -> list[MonthlyCategoryTotal]:
+        """
+        Returns the totals per month and category of a year, ordered by
+        month and category. Months and categories without expenses are not
+        included.
+        """
+        rows = self._slice(
+            date(year, 1, 1), date(year, 12, 31)
+        ).totals_by_month_and_category()
+
+        return [
+            MonthlyCategoryTotal(
+                year=row_year,
+                month=month,
+                category_id=category_id,
+                total_amount=Money.from_cents(total),
+                count=count,
+                max_amount=Money.from_cents(largest),
+            )
+            for row_year, month, category_id, total, count, largest in rows
+        ]
+
+    def _slice(self, start_date: date, end_date: date) -> ExpenseFrame:
+        """
+        Validates the period and returns the part of the frame within it.
+        """
+        if start_date > end_date:
+            raise ValueError("start_date cannot be after end_date")
+
+        return self._frame.slice(start_date, end_date)
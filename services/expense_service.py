@@ -7,10 +7,23 @@ Contains business logic and coordinates repositories.
 
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional
 
-from domain.models import Expense
-from persistence.expense_repository import ExpenseRepository
+from domain.models import (
+    Expense,
+    ExpenseChangeSet,
+    ExpenseListRow,
+    Money,
+    MonthlyCategoryTotal,
+)
+from persistence.expense_repository import (
+    ExpenseRepository,
+    PageKey,
+    list_row_sort_key,
+)
+
+if TYPE_CHECKING:
+    from domain.expense_frame import ExpenseFrame
 
 
 class ExpenseSortField(Enum):
@@ -27,7 +40,8 @@ class ExpenseSortField(Enum):
 
     DATE = "date"
     AMOUNT = "amount"
-    CATEGORY = "category"
+    CATEGORY = "category"  # by category name
+    FREQUENCY = "frequency"  # single expenses first, then monthly ... yearly
 
 
 class SortDirection(Enum):
@@ -56,6 +70,51 @@ class ExpenseService:
         Initializes the service with a repository dependency.
         """
         self._repository = repository
+        self._change_listeners: list[Callable[[ExpenseChangeSet], None]] = []
+
+    def add_change_listener(
+        self, listener: Callable[[ExpenseChangeSet], None]
+    ) -> None:
+        """
+        Registers a callback invoked after every expense created, updated
+        or deleted through this service, on the thread that made the change.
+        """
+        self._change_listeners.append(listener)
+
+    def get_data_version(self) -> int:
+        """
+        Returns a number that changes every time expenses (or any other data)
+        are written, through this service or not.
+        """
+        return self._repository.data_version
+
+    def get_last_commit_version(self) -> int | None:
+        """
+        Returns the data version right after the last write committed by
+        the calling thread, see ExpenseChangeSet.version.
+        """
+        return self._repository.last_commit_version
+
+    def notify_added(
+        self, expenses: Iterable[Expense], version: int | None = None
+    ) -> None:
+        """
+        Tells the change listeners that expenses were added without going
+        through this service (e.g. recurring generation), committed at the
+        given data version (see get_last_commit_version()).
+        """
+        self._notify(ExpenseChangeSet(added=tuple(expenses), version=version))
+
+    def notify_reload(self) -> None:
+        """
+        Tells the change listeners that expenses were written without going
+        through this service (e.g. recurring generation) and must be reloaded.
+        """
+        self._notify(ExpenseChangeSet(reload=True))
+
+    def _notify(self, change: ExpenseChangeSet) -> None:
+        for listener in self._change_listeners:
+            listener(change)
 
     def create_expense(
         self,
@@ -93,7 +152,15 @@ class ExpenseService:
             recurring_expense_id=None,
         )
 
-        return self._repository.add(expense)
+        expense = self._repository.add(expense)
+
+        self._notify(
+            ExpenseChangeSet(
+                added=(expense,), version=self._repository.last_commit_version
+            )
+        )
+
+        return expense
 
     def update_expense(
         self,
@@ -135,6 +202,14 @@ class ExpenseService:
 
         self._repository.update(updated)
 
+        self._notify(
+            ExpenseChangeSet(
+                added=(updated,),
+                removed=(existing,),
+                version=self._repository.last_commit_version,
+            )
+        )
+
     def get_expenses_for_period(
         self,
         start_date: date,
@@ -143,22 +218,207 @@ class ExpenseService:
         """
         Retrieves expenses within a specific time period.
         """
-        if start_date > end_date:
-            raise ValueError("start_date cannot be after end_date")
+        self._validate_period(start_date, end_date)
 
         return self._repository.get_by_period(start_date, end_date)
 
+    def get_total_for_period(self, start_date: date, end_date: date) -> Money:
+        """
+        Returns the total amount spent within a specific time period.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_total_for_period(start_date, end_date)
+
+    def get_totals_by_category(
+        self, start_date: date, end_date: date
+    ) -> dict[int, Money]:
+        """
+        Returns the total amount per category within a specific time period.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_totals_by_category(start_date, end_date)
+
+    def get_daily_totals(self, start_date: date, end_date: date) -> dict[date, Money]:
+        """
+        Returns the total amount per day within a specific time period.
+        Days without expenses are not included.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_daily_totals(start_date, end_date)
+
+    def get_daily_totals_for_category(
+        self, start_date: date, end_date: date, category_id: int
+    ) -> dict[date, Money]:
+        """
+        Returns the total amount per day for a single category
+        within a specific time period.
+        Days without expenses are not included.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_daily_totals_for_category(
+            start_date, end_date, category_id
+        )
+
+    def get_daily_category_totals(self) -> dict[tuple[date, int], Money]:
+        """
+        Returns the total amount per day and category, for all expenses.
+        """
+        return self._repository.get_daily_category_totals()
+
+    def get_daily_category_totals_at_version(
+        self,
+    ) -> tuple[dict[tuple[date, int], Money], int]:
+        """
+        Returns the total amount per day and category, for all expenses,
+        with the data version they were read at (see ExpenseChangeSet.version).
+        """
+        return self._repository.get_daily_category_totals_at_version()
+
+    def get_monthly_category_totals(self, year: int) -> list[MonthlyCategoryTotal]:
+        """
+        Returns the totals per month and category of a year.
+        Months and categories without expenses are not included.
+        """
+        return self._repository.get_monthly_category_totals(year)
+
+    def get_max_amount(self, start_date: date, end_date: date) -> Money | None:
+        """
+        Returns the largest single amount within a specific time period.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_max_amount(start_date, end_date)
+
+    def get_expense_frame(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> "ExpenseFrame":
+        """
+        Returns the expenses of a period (all of them by default) as an
+        ExpenseFrame for vectorized analysis.
+        """
+        if start_date is not None and end_date is not None:
+            self._validate_period(start_date, end_date)
+
+        return self._repository.get_frame(start_date, end_date)
+
     def get_all_expenses(self) -> list[Expense]:
         """
         Retrieves all expenses.
         """
         return self._repository.get_all()
 
+    def iter_all_expenses(self) -> Iterator[Expense]:
+        """
+        Streams all expenses in date order, without loading them all
+        in memory (e.g. for exports).
+        """
+        return self._repository.iter_all()
+
+    def iter_expenses_for_period(
+        self, start_date: date, end_date: date
+    ) -> Iterator[Expense]:
+        """
+        Streams the expenses within a specific time period in date order.
+        """
+        self._validate_period(start_date, end_date)
+
+        return self._repository.iter_by_period(start_date, end_date)
+
+    def get_expenses_page(
+        self,
+        after: PageKey | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[Expense]:
+        """
+        Returns the next page of expenses in (date, id) order, starting
+        after the key (date, id) of the last expense of the previous page.
+        """
+        return self._repository.get_page(after, limit, start_date, end_date)
+
+    def get_list_rows_page(
+        self,
+        after: PageKey | None,
+        limit: int,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[ExpenseListRow]:
+        """
+        Returns the next page of expense list rows in (date, id) order,
+        see get_expenses_page().
+        """
+        return self._repository.get_list_rows_page(after, limit, start_date, end_date)
+
+    def get_list_rows_window(
+        self,
+        start_date: date | None,
+        end_date: date | None,
+        limit: int,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+        after: ExpenseListRow | None = None,
+        offset: int = 0,
+    ) -> list[ExpenseListRow]:
+        """
+        Returns up to limit rows of the sorted expense list of a period
+        (all expenses when the dates are None), starting right after the
+        row after when given, otherwise at offset.
+        """
+        if start_date is not None and end_date is not None:
+            self._validate_period(start_date, end_date)
+
+        return self._repository.get_list_rows_window(
+            start_date,
+            end_date,
+            limit,
+            sort_by=sort_by.value,
+            descending=direction == SortDirection.DESC,
+            after=after,
+            offset=offset,
+        )
+
+    def get_list_row(self, expense_id: int) -> ExpenseListRow | None:
+        """
+        Returns the expense list row of an expense, None if it does not exist.
+        """
+        return self._repository.get_list_row(expense_id)
+
+    def get_list_row_sort_key(
+        self, sort_by: ExpenseSortField
+    ) -> Callable[[ExpenseListRow], tuple]:
+        """
+        Returns a function giving the position of a row in the list sorted
+        by sort_by, in ascending order, as compared by get_list_rows_window().
+        """
+        return lambda row: list_row_sort_key(row, sort_by.value)
+
+    def get_count_and_total(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> tuple[int, Money]:
+        """
+        Returns the number of expenses of a period (all expenses when the
+        dates are None) and their total amount.
+        """
+        return self._repository.get_count_and_total(start_date, end_date)
+
+    def _validate_period(self, start_date: date, end_date: date) -> None:
+        """
+        Validates that the period is not reversed.
+        """
+        if start_date > end_date:
+            raise ValueError("start_date cannot be after end_date")
+
     def _validate_amount(self, amount: float) -> None:
         """
-        Validates that the expense amount is positive.
+        Validates that the expense amount is positive once rounded to
+        cents, as stored: e.g. 0.004 would be saved as zero.
         """
-        if amount <= 0:
+        if Money(amount) <= 0:
             raise ValueError("Expense amount must be greater than zero")
 
     def delete_expense(self, expense_id: int) -> None:
@@ -169,8 +429,18 @@ class ExpenseService:
             expense_id (int): ID of the expense to delete
         """
         # Qui potresti aggiungere future logiche, es. soft delete o validazioni
+        existing = self._repository.get_by_id(expense_id)
+
         self._repository.delete(expense_id)
 
+        if existing is not None:
+            self._notify(
+                ExpenseChangeSet(
+                    removed=(existing,),
+                    version=self._repository.last_commit_version,
+                )
+            )
+
     def get_by_id(self, expense_id: int) -> Expense:
         """
         Retrieve an expense by its ID.
@@ -190,11 +460,9 @@ class ExpenseService:
         """
         Return all expenses sorted by the given field and direction.
         """
-        expenses = self.get_all_expenses()
-
-        reverse = direction == SortDirection.DESC
-
-        return sorted(expenses, key=self.get_sorting_function(sort_by), reverse=reverse)
+        return self._repository.get_all_sorted(
+            sort_by=sort_by.value, descending=direction == SortDirection.DESC
+        )
 
     def get_expenses_for_month_sorted(
         self,
@@ -206,29 +474,42 @@ class ExpenseService:
         """
         Return expenses for a given month sorted by the given field and direction.
         """
-        expenses = self.get_expenses_for_period(
-            start_date=start_date, end_date=end_date
+        self._validate_period(start_date, end_date)
+
+        return self._repository.get_by_period_sorted(
+            start_date,
+            end_date,
+            sort_by=sort_by.value,
+            descending=direction == SortDirection.DESC,
         )
 
-        reverse = direction == SortDirection.DESC
+    def get_list_rows_for_period_sorted(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+    ) -> List[ExpenseListRow]:
+        """
+        Return the expense list rows for a period, with category names and
+        frequencies resolved, sorted by the given field and direction.
+        """
+        self._validate_period(start_date, end_date)
 
-        return sorted(expenses, key=self.get_sorting_function(sort_by), reverse=reverse)
+        return self._repository.get_list_rows_for_period(
+            start_date,
+            end_date,
+            sort_by=sort_by.value,
+            descending=direction == SortDirection.DESC,
+        )
 
-    def get_sorting_function(self, sort_by: ExpenseSortField):
+    def get_all_list_rows_sorted(
+        self, sort_by: ExpenseSortField, direction: SortDirection
+    ) -> List[ExpenseListRow]:
         """
-        Docstring for get_sorting_function
-
-        :param self: Description
-        :param sort_by: Description
-        :type sort_by: ExpenseSortField
+        Return the expense list rows for all expenses, sorted by the given
+        field and direction.
         """
-        functions = {
-            ExpenseSortField.DATE: lambda e: e.date,
-            ExpenseSortField.AMOUNT: lambda e: e.amount,
-            ExpenseSortField.CATEGORY: lambda e: e.category_id,
-        }
-        return (
-            functions.get(sort_by, lambda e: e.date)
-            if sort_by in functions
-            else lambda e: e.date
+        return self._repository.get_all_list_rows(
+            sort_by=sort_by.value, descending=direction == SortDirection.DESC
         )
@@ -0,0 +1,158 @@
+"""
+services/period_prefetcher.py
+
+Loads the months next to the one displayed in the background, so that
+moving to them month by month is answered from memory.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+
+from domain.models import ExpenseListHead
+from services.analysis_service import AnalysisService
+from services.expense_service import ExpenseService, ExpenseSortField, SortDirection
+from services.result_cache import VersionedLRUCache, uncounted
+from utils.dates import add_months, month_date_range
+
+# Rows of the list head, i.e. the first page of the expense list
+LIST_HEAD_ROWS = 200
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodPrefetcher:
+    """
+    Caches the head of the expense list (count, total and first rows) per
+    period and sort order, and preloads the month before and after the
+    displayed one in a worker thread.
+
+    The list heads are kept in a VersionedLRUCache of at most max_entries
+    heads of head_rows rows each, dropped on every write. The analysis of
+    the adjacent months is preloaded through AnalysisService, whose own
+    cache keeps it.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        expense_service: ExpenseService,
+        analysis_service: AnalysisService,
+        category_name_map: dict[int, str],
+        head_rows: int = LIST_HEAD_ROWS,
+        max_entries: int = 8,
+    ):
+        self._expense_service = expense_service
+        self._analysis_service = analysis_service
+        self._category_name_map = category_name_map
+        self._head_rows = head_rows
+
+        self.cache = VersionedLRUCache(max_entries=max_entries)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="prefetch"
+        )
+        self._pending: list[Future] = []
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Share of the list heads asked for (not prefetched) that were
+        answered from the cache.
+        """
+        return self.cache.hit_rate
+
+    def get_list_head(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+    ) -> ExpenseListHead:
+        """
+        Returns the count, the total and the first rows of the sorted
+        expense list of a period.
+        """
+        return self.cache.get_or_compute(
+            ("list", start_date, end_date, sort_by, direction),
+            self._expense_service.get_data_version(),
+            lambda: self._load_list_head(start_date, end_date, sort_by, direction),
+        )
+
+    def _load_list_head(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+    ) -> ExpenseListHead:
+        count, total = self._expense_service.get_count_and_total(start_date, end_date)
+        rows = self._expense_service.get_list_rows_window(
+            start_date, end_date, self._head_rows, sort_by=sort_by, direction=direction
+        )
+        return ExpenseListHead(count=count, total=total, rows=tuple(rows))
+
+    def prefetch_around(
+        self,
+        year: int,
+        month: int,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+        analysis: bool = False,
+    ) -> list[Future]:
+        """
+        Preloads the list heads of the months before and after a month,
+        and their analysis when analysis is set. Prefetches still queued
+        for a previous month are cancelled.
+
+        Returns the futures of the prefetches, which need not be waited on.
+        """
+        for future in self._pending:
+            future.cancel()
+
+        self._pending = [
+            self._executor.submit(
+                self._prefetch,
+                *month_date_range(*add_months(year, month, months)),
+                sort_by,
+                direction,
+                analysis,
+            )
+            for months in (1, -1)
+        ]
+
+        return self._pending
+
+    def _prefetch(
+        self,
+        start_date: date,
+        end_date: date,
+        sort_by: ExpenseSortField,
+        direction: SortDirection,
+        analysis: bool,
+    ) -> None:
+        """
+        Runs in the worker thread, storing the results in the caches
+        without counting in their hit rates.
+        """
+        try:
+            with uncounted():
+                self.get_list_head(start_date, end_date, sort_by, direction)
+
+                if analysis:
+                    # Same calls as AnalysisTab, so that it hits the cache
+                    self._analysis_service.get_expense_summary(
+                        start_date, end_date, self._category_name_map
+                    )
+                    self._analysis_service.get_daily_totals_for_period(
+                        start_date=start_date, end_date=end_date
+                    )
+        except Exception as e:  # a prefetch failing must not break anything
+            logger.warning("Prefetch of %s failed: %s", f"{start_date:%Y-%m}", e)
+
+    def shutdown(self) -> None:
+        """
+        Cancels the queued prefetches and stops the worker thread.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
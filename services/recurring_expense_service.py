@@ -3,12 +3,12 @@ Service for managing recurring expenses."""
 
 from datetime import date, datetime
 from typing import List
-from dateutil.relativedelta import relativedelta
 
 from domain.models import RecurringExpense, RecurrenceFrequency
 from domain.models import Expense
 from persistence.recurring_expense_repository import RecurringExpenseRepository
 from persistence.expense_repository import ExpenseRepository
+from utils.recurrence import next_index_after_period_of, nth_occurrence
 
 
 class RecurringExpenseService:
@@ -78,26 +78,56 @@ class RecurringExpenseService:
 
         This method is deterministic and idempotent:
         calling it multiple times with the same date will not create duplicates.
+
+        All the occurrences of all the templates are inserted in bulk and
+        each template's last_generated_date is updated once, within a
+        single transaction. Occurrences already stored (unique recurring
+        expense and date) are skipped by the database, so regenerating
+        from a stale last_generated_date never creates duplicates.
+
+        Returns only the expenses actually inserted, with their IDs.
         """
         generated_expenses: List[Expense] = []
+        last_generated_dates: dict[int, date] = {}
 
         recurring_expenses = self._recurring_repository.get_all()
 
         for recurring in recurring_expenses:
             expenses = self._generate_for_recurring(recurring, up_to)
-            generated_expenses.extend(expenses)
 
-        return generated_expenses
+            if expenses:
+                generated_expenses.extend(expenses)
+                last_generated_dates[recurring.id] = recurring.last_generated_date
+
+        if not generated_expenses:
+            return generated_expenses
+
+        with self._expense_repository.transaction():
+            inserted = self._expense_repository.add_many(
+                generated_expenses, ignore_duplicates=True
+            )
+            self._recurring_repository.update_last_generated_dates(
+                last_generated_dates
+            )
+
+        if inserted == len(generated_expenses):
+            return generated_expenses
+
+        # Occurrences already stored were skipped and got no ID
+        return [expense for expense in generated_expenses if expense.id is not None]
 
     def _generate_for_recurring(
         self, recurring: RecurringExpense, up_to: date
     ) -> List[Expense]:
         """
-        Generates missing Expense instances for a single RecurringExpense.
+        Builds the missing Expense instances for a single RecurringExpense
+        and advances its last_generated_date in memory.
+        Nothing is persisted here.
         """
         generated: List[Expense] = []
 
-        current_date = self._get_generation_start_date(recurring)
+        n = self._get_generation_start_index(recurring)
+        current_date = nth_occurrence(recurring.start_date, recurring.frequency, n)
 
         while current_date <= up_to:
             if recurring.end_date and current_date > recurring.end_date:
@@ -118,16 +148,12 @@ class RecurringExpenseService:
                 created_at=datetime.now(),
             )
 
-            self._expense_repository.add(expense)
-
             generated.append(expense)
 
             recurring.last_generated_date = current_date
-            self._recurring_repository.update_last_generated_date(
-                recurring.id, current_date
-            )
 
-            current_date = self._get_next_date(current_date, recurring.frequency)
+            n += 1
+            current_date = nth_occurrence(recurring.start_date, recurring.frequency, n)
 
         return generated
 
@@ -160,39 +186,15 @@ class RecurringExpenseService:
         # Aggiorna il DB
         self._recurring_repository.stop(recurring_id, end_date=effective_end_date)
 
-    def _get_generation_start_date(self, recurring: RecurringExpense) -> date:
+    def _get_generation_start_index(self, recurring: RecurringExpense) -> int:
         """
-        Determines the first date for which an expense should be generated.
+        Determines the index of the first occurrence to generate.
         """
         if recurring.last_generated_date:
-            return self._get_next_date(
-                recurring.last_generated_date, recurring.frequency
+            return next_index_after_period_of(
+                recurring.start_date,
+                recurring.frequency,
+                recurring.last_generated_date,
             )
 
-        return recurring.start_date
-
-    def _get_next_date(
-        self, current_date: date, frequency: RecurrenceFrequency
-    ) -> date:
-        """
-        Calculates the next occurrence date based on the recurrence frequency.
-        """
-        if frequency == RecurrenceFrequency.MONTHLY:
-            return current_date + relativedelta(months=1)
-
-        if frequency == RecurrenceFrequency.EVERY_2_MONTHS:
-            return current_date + relativedelta(months=2)
-
-        if frequency == RecurrenceFrequency.EVERY_3_MONTHS:
-            return current_date + relativedelta(months=3)
-
-        if frequency == RecurrenceFrequency.EVERY_4_MONTHS:
-            return current_date + relativedelta(months=4)
-
-        if frequency == RecurrenceFrequency.EVERY_6_MONTHS:
-            return current_date + relativedelta(months=6)
-
-        if frequency == RecurrenceFrequency.YEARLY:
-            return current_date + relativedelta(years=1)
-
-        raise ValueError(f"Unsupported frequency: {frequency}")
+        return 0
@@ -0,0 +1,113 @@
+"""
+services/result_cache.py
+
+Bounded LRU cache for computed results, invalidated by a data version.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_uncounted = threading.local()
+
+
+@contextmanager
+def uncounted() -> Iterator[None]:
+    """
+    Leaves the lookups made by the calling thread within the block out of
+    the hits and misses of every VersionedLRUCache, e.g. prefetches: the
+    hit rate then tells how often what the user asked for was ready.
+    """
+    previous = getattr(_uncounted, "active", False)
+    _uncounted.active = True
+    try:
+        yield
+    finally:
+        _uncounted.active = previous
+
+
+class VersionedLRUCache:
+    """
+    Keeps the results of the last max_entries computations.
+
+    Every lookup carries the current data version (see
+    ExpenseService.get_data_version()): when it is newer than the version
+    the cached results were computed at, they are all dropped, so a result
+    is reused only while nothing was written in the meantime. A lookup
+    with an older version, e.g. from a worker that read it before a write,
+    is computed without touching the cache.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+        self._version: Hashable | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Share of the lookups answered from the cache, 0 before any lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_or_compute(
+        self, key: Hashable, version: Hashable, compute: Callable[[], T]
+    ) -> T:
+        """
+        Returns the result cached for key at the given data version,
+        computing and storing it on a miss.
+
+        The version must be read before computing, so that a write made
+        while computing invalidates the stored result. Versions must be
+        comparable and only grow, e.g. ints or tuples of them.
+        """
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._entries.clear()
+                self._version = version
+
+            counted = not getattr(_uncounted, "active", False)
+
+            if version == self._version and key in self._entries:
+                self._entries.move_to_end(key)
+                if counted:
+                    self.hits += 1
+                return self._entries[key]
+
+            if counted:
+                self.misses += 1
+
+        # Computed without holding the lock: other keys stay available
+        result = compute()
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+
+        return result
+
+    def clear(self) -> None:
+        """
+        Drops every cached result.
+        """
+        with self._lock:
+            self._entries.clear()
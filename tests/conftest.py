@@ -9,8 +9,12 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PROJECT_ROOT))
 
 import sqlite3
+from datetime import date, datetime
+
 import pytest
-from persistence.db import init_db
+from domain.models import Expense
+from persistence.db import Connection, ConnectionManager, init_db
+from persistence.expense_repository import ExpenseRepository
 from persistence.recurring_expense_repository import RecurringExpenseRepository
 from services.recurring_expense_service import RecurringExpenseService
 
@@ -20,26 +24,86 @@ def db_connection_test():
     """
     Provides a temporary in-memory database connection for testing.
     """
-    conn = sqlite3.connect(":memory:")
+    conn = sqlite3.connect(":memory:", factory=Connection)
     init_db(conn)
     yield conn
     conn.close()
 
 
 @pytest.fixture
-def recurring_repository(db_connection_test):
+def database(db_connection_test):
+    """
+    Provides a ConnectionManager serving the test DB connection.
+    """
+    return ConnectionManager.for_connection(db_connection_test)
+
+
+@pytest.fixture
+def recurring_repository(database):
     """
     Provides a RecurringExpenseRepository using the test DB connection.
     """
-    return RecurringExpenseRepository(connection=db_connection_test)
+    return RecurringExpenseRepository(database)
 
 
 @pytest.fixture
-def recurring_service(recurring_repository):
+def expense_repository(database):
     """
-    Provides a RecurringExpenseService with only the recurring repository.
+    Provides an ExpenseRepository using the test DB connection.
+    """
+    return ExpenseRepository(database)
+
+
+@pytest.fixture
+def recurring_service(recurring_repository, expense_repository):
+    """
+    Provides a RecurringExpenseService using the test DB repositories.
     """
     return RecurringExpenseService(
         recurring_repository=recurring_repository,
-        expense_repository=None,  # possiamo aggiungere una fixture expense_repository più avanti
+        expense_repository=expense_repository,
+    )
+
+
+def _make_expense(day: date, amount: float, category_id: int) -> Expense:
+    return Expense(
+        id=None,
+        date=day,
+        amount=amount,
+        category_id=category_id,
+        description=None,
+        is_recurring=False,
+        recurring_expense_id=None,
+        attachment_path=None,
+        attachment_type=None,
+        analysis_data=None,
+        analysis_summary=None,
+        created_at=datetime.now(),
     )
+
+
+def _add_sample_expenses(expense_repository) -> None:
+    expense_repository.add(_make_expense(date(2024, 1, 10), 10.0, 1))
+    expense_repository.add(_make_expense(date(2024, 1, 10), 2.5, 2))
+    expense_repository.add(_make_expense(date(2024, 1, 15), 20.0, 1))
+    expense_repository.add(_make_expense(date(2024, 1, 20), 5.0, 2))
+    # outside of January
+    expense_repository.add(_make_expense(date(2024, 2, 1), 99.0, 1))
+
+
+@pytest.fixture
+def make_expense():
+    """
+    Provides a factory of plain, non-recurring expenses to be added:
+    make_expense(day, amount, category_id).
+    """
+    return _make_expense
+
+
+@pytest.fixture
+def add_sample_expenses():
+    """
+    Provides a function adding five sample expenses, four in January 2024
+    and one in February, to an ExpenseRepository.
+    """
+    return _add_sample_expenses
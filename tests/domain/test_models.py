@@ -0,0 +1,52 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from domain.models import Expense, Money
+
+
+def test_money_rounds_floats_to_the_nearest_cent():
+    assert Money(0.1) + Money(0.2) == Money("0.30")
+    assert Money(2.675) == Decimal("2.68")  # float 2.675 is 2.67499...
+    assert Money(7.99).cents == 799
+
+
+def test_money_from_cents_round_trips():
+    assert Money.from_cents(123456) == Decimal("1234.56")
+    assert Money.from_cents(-5).cents == -5
+
+
+def test_money_sums_stay_exact():
+    total = sum((Money(0.1) for _ in range(10)), start=Money(0))
+
+    assert total == Decimal("1.00")
+    assert total + 0.5 == Decimal("1.50")
+
+
+def test_expense_is_slotted_and_keeps_money_amounts():
+    amount = Money("12.50")
+    expense = Expense(
+        id=None,
+        date=date(2024, 1, 1),
+        amount=amount,
+        category_id=1,
+        description=None,
+        is_recurring=False,
+        recurring_expense_id=None,
+        attachment_path=None,
+        attachment_type=None,
+        analysis_data=None,
+        analysis_summary=None,
+        created_at=datetime(2024, 1, 1),
+    )
+
+    assert not hasattr(expense, "__dict__")
+    assert expense.amount is amount
+
+
+def test_money_compares_with_floats_rounded_to_cents():
+    assert Money("0.1") == 0.1
+    assert Money("0.30") == 0.1 + 0.2
+    assert Money("0.1") != 0.11
+    assert Money("0.1") < 0.11
+    assert not Money("0.1") > 0.1
+    assert Money("1.00") >= 1.0
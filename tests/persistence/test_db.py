@@ -0,0 +1,119 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from persistence.db import (
+    RECURRING_DUPLICATES_TABLE,
+    TUNED_PROFILE,
+    Connection,
+    ConnectionManager,
+    ConnectionProfile,
+    apply_profile,
+    get_connection,
+    init_db,
+)
+
+
+def test_init_db_moves_duplicated_recurring_occurrences_aside(
+    db_connection_test, caplog
+):
+    db_connection_test.execute("DROP INDEX idx_expenses_recurring_date")
+    for _ in range(3):
+        db_connection_test.execute(
+            """
+            INSERT INTO expenses (date, amount, category_id, created_at,
+                                  recurring_expense_id)
+            VALUES ('2024-01-15', 9.99, 1, '2024-01-15T00:00:00', 1)
+            """
+        )
+
+    init_db(db_connection_test)
+
+    rows = db_connection_test.execute("SELECT id FROM expenses").fetchall()
+    assert rows == [(1,)]
+
+    moved = db_connection_test.execute(
+        f"SELECT id, date FROM {RECURRING_DUPLICATES_TABLE} ORDER BY id"
+    ).fetchall()
+    assert moved == [(2, "2024-01-15"), (3, "2024-01-15")]
+    assert "Moved 2 duplicated recurring expenses" in caplog.text
+
+
+def test_get_connection_applies_tuned_profile(tmp_path):
+    connection = get_connection(str(tmp_path / "expenses.db"), profile=TUNED_PROFILE)
+
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert connection.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert connection.execute("PRAGMA cache_size").fetchone()[0] == -16 * 1024
+    assert connection.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    connection.close()
+
+
+def test_apply_profile_rejects_invalid_values(db_connection_test):
+    with pytest.raises(ValueError):
+        apply_profile(db_connection_test, ConnectionProfile(synchronous="FAST"))
+
+
+def test_connection_manager_serves_readers_from_other_threads(tmp_path):
+    database = ConnectionManager(str(tmp_path / "expenses.db"), max_readers=2)
+    with database.writer() as connection:
+        init_db(connection)
+
+    # nested writer blocks are committed together by the outermost one
+    with database.writer():
+        with database.writer() as connection:
+            connection.execute(
+                "INSERT INTO categories (name, is_custom) VALUES ('Casa', 0)"
+            )
+        with database.reader() as connection:
+            assert connection.execute("SELECT COUNT(*) FROM categories").fetchone() == (
+                0,
+            )
+
+    def count_categories(_):
+        with database.reader() as connection:
+            return connection.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(count_categories, range(8))) == [1] * 8
+
+    database.close()
+
+
+def test_init_db_backfills_amount_cents_from_legacy_amount():
+    connection = sqlite3.connect(":memory:", factory=Connection)
+    connection.execute(
+        """
+        CREATE TABLE expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category_id INTEGER NOT NULL,
+            description TEXT,
+            is_recurring INTEGER DEFAULT 0,
+            attachment_path TEXT,
+            attachment_type TEXT,
+            analysis_data TEXT,
+            analysis_summary TEXT,
+            created_at TEXT NOT NULL,
+            recurring_expense_id INTEGER
+        )
+        """
+    )
+    connection.execute(
+        """
+        INSERT INTO expenses (date, amount, category_id, created_at)
+        VALUES ('2024-01-15', 0.29, 1, '2024-01-15T00:00:00'),
+               ('2024-01-16', 19.99, 1, '2024-01-16T00:00:00'),
+               ('2024-01-17', 0.285, 1, '2024-01-17T00:00:00')
+        """
+    )
+
+    init_db(connection)
+
+    rows = connection.execute("SELECT amount_cents FROM expenses ORDER BY id")
+    # rounded like Money, where SQLite's ROUND(0.285 * 100) gives 28
+    assert [cents for (cents,) in rows] == [29, 1999, 29]
+    connection.close()
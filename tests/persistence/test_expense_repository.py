@@ -0,0 +1,247 @@
+from datetime import date
+
+import pytest
+
+from domain.models import Category, RecurrenceFrequency, RecurringExpense
+from persistence.category_repository import CategoryRepository
+from persistence.expense_repository import list_row_sort_key
+
+
+def test_aggregates_for_period(expense_repository, add_sample_expenses):
+    add_sample_expenses(expense_repository)
+
+    start, end = date(2024, 1, 1), date(2024, 1, 31)
+
+    assert expense_repository.get_total_for_period(start, end) == 37.5
+    assert expense_repository.get_totals_by_category(start, end) == {1: 30.0, 2: 7.5}
+    assert expense_repository.get_daily_totals(start, end) == {
+        date(2024, 1, 10): 12.5,
+        date(2024, 1, 15): 20.0,
+        date(2024, 1, 20): 5.0,
+    }
+    assert expense_repository.get_daily_totals_for_category(start, end, 2) == {
+        date(2024, 1, 10): 2.5,
+        date(2024, 1, 20): 5.0,
+    }
+    assert expense_repository.get_max_amount(start, end) == 20.0
+
+
+def test_aggregates_for_empty_period(expense_repository, add_sample_expenses):
+    add_sample_expenses(expense_repository)
+
+    start, end = date(2023, 1, 1), date(2023, 1, 31)
+
+    assert expense_repository.get_total_for_period(start, end) == 0
+    assert expense_repository.get_totals_by_category(start, end) == {}
+    assert expense_repository.get_daily_totals(start, end) == {}
+    assert expense_repository.get_max_amount(start, end) is None
+
+
+def test_list_rows_resolve_category_and_frequency(
+    database, expense_repository, recurring_repository, make_expense
+):
+    CategoryRepository(database).add(
+        Category(id=None, name="Telefono", is_custom=False)
+    )
+    recurring = recurring_repository.add(
+        RecurringExpense(
+            id=None,
+            name="Iliad",
+            amount=7.99,
+            category_id=1,
+            frequency=RecurrenceFrequency.MONTHLY,
+            start_date=date(2024, 1, 5),
+            end_date=None,
+            description=None,
+            attachment_path=None,
+            attachment_type=None,
+            last_generated_date=None,
+        )
+    )
+    single = expense_repository.add(make_expense(date(2024, 1, 10), 10.0, 1))
+    generated = make_expense(date(2024, 1, 5), 7.99, 1)
+    generated.is_recurring = True
+    generated.recurring_expense_id = recurring.id
+    generated = expense_repository.add(generated)
+
+    rows = {
+        row.id: row
+        for row in expense_repository.get_list_rows_for_period(
+            date(2024, 1, 1), date(2024, 1, 31)
+        )
+    }
+
+    assert rows[single.id].category_name == "Telefono"
+    assert rows[single.id].frequency is None
+    assert rows[generated.id].category_name == "Telefono"
+    assert rows[generated.id].frequency == RecurrenceFrequency.MONTHLY
+    assert rows[generated.id].recurring_expense_id == recurring.id
+
+
+def test_iter_streams_expenses_in_date_order(expense_repository, add_sample_expenses):
+    add_sample_expenses(expense_repository)
+
+    streamed = list(expense_repository.iter_all(batch_size=2))
+    assert [expense.date for expense in streamed] == sorted(
+        expense.date for expense in expense_repository.get_all()
+    )
+
+    january = expense_repository.iter_by_period(
+        date(2024, 1, 1), date(2024, 1, 31), batch_size=3
+    )
+    assert sum(expense.amount for expense in january) == 37.5
+
+
+def test_keyset_pages_cover_every_expense_once(expense_repository, add_sample_expenses):
+    add_sample_expenses(expense_repository)
+
+    seen, after = [], None
+    while page := expense_repository.get_page(after, 2):
+        seen += [expense.id for expense in page]
+        after = (page[-1].date, page[-1].id)
+
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+    # expenses 1 and 2 share the same date
+    assert seen == [1, 2, 3, 4, 5]
+
+    rows = expense_repository.get_list_rows_page(
+        (date(2024, 1, 10), 1), 10, date(2024, 1, 1), date(2024, 1, 31)
+    )
+    assert [row.id for row in rows] == [2, 3, 4]
+
+
+def test_sorting_is_done_by_the_database(
+    expense_repository, database, add_sample_expenses
+):
+    category_repository = CategoryRepository(database)
+    category_repository.add(Category(id=None, name="zaino", is_custom=True))
+    category_repository.add(Category(id=None, name="Affitto", is_custom=True))
+    add_sample_expenses(expense_repository)
+
+    def ids(sort_by: str, descending: bool = False) -> list[int]:
+        rows = expense_repository.get_all_list_rows(sort_by, descending)
+        return [row.id for row in rows]
+
+    assert ids("date") == [1, 2, 3, 4, 5]
+    assert ids("date", descending=True) == [5, 4, 3, 2, 1]
+    assert ids("amount") == [2, 4, 1, 3, 5]
+    # "Affitto" (2) before "zaino" (1), then by date and id
+    assert ids("category") == [2, 4, 1, 3, 5]
+
+    with pytest.raises(ValueError):
+        ids("description")
+
+
+def test_sorting_by_frequency_puts_single_expenses_first(
+    expense_repository, recurring_repository, database, make_expense
+):
+    CategoryRepository(database).add(
+        Category(id=None, name="Casa", is_custom=True)
+    )
+    yearly = recurring_repository.add(
+        RecurringExpense(
+            id=None,
+            name="Assicurazione",
+            amount=300.0,
+            category_id=1,
+            frequency=RecurrenceFrequency.YEARLY,
+            start_date=date(2024, 1, 1),
+            end_date=None,
+            description=None,
+            attachment_path=None,
+            attachment_type=None,
+            last_generated_date=None,
+        )
+    )
+    monthly = recurring_repository.add(
+        RecurringExpense(
+            id=None,
+            name="Affitto",
+            amount=800.0,
+            category_id=1,
+            frequency=RecurrenceFrequency.MONTHLY,
+            start_date=date(2024, 1, 1),
+            end_date=None,
+            description=None,
+            attachment_path=None,
+            attachment_type=None,
+            last_generated_date=None,
+        )
+    )
+    for recurring in (yearly, monthly, None):
+        expense = make_expense(date(2024, 1, 1), 1.0, 1)
+        expense.recurring_expense_id = recurring.id if recurring else None
+        expense_repository.add(expense)
+
+    rows = expense_repository.get_list_rows_for_period(
+        date(2024, 1, 1), date(2024, 1, 31), sort_by="frequency"
+    )
+
+    assert [row.frequency for row in rows] == [
+        None,
+        RecurrenceFrequency.MONTHLY,
+        RecurrenceFrequency.YEARLY,
+    ]
+
+
+@pytest.mark.parametrize("sort_by", ["date", "amount", "category", "frequency"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_list_row_windows_follow_the_sorted_list(
+    expense_repository,
+    database,
+    sort_by,
+    descending,
+    make_expense,
+    add_sample_expenses,
+):
+    CategoryRepository(database).add(Category(id=None, name="Casa", is_custom=True))
+    add_sample_expenses(expense_repository)
+    expense_repository.add(make_expense(date(2024, 1, 10), 10.0, 1))
+
+    expected = [
+        row.id for row in expense_repository.get_all_list_rows(sort_by, descending)
+    ]
+
+    seen, after = [], None
+    while page := expense_repository.get_list_rows_window(
+        None, None, 2, sort_by, descending, after=after
+    ):
+        seen += [row.id for row in page]
+        after = page[-1]
+
+    assert seen == expected
+
+    by_offset = expense_repository.get_list_rows_window(
+        None, None, 2, sort_by, descending, offset=3
+    )
+    assert [row.id for row in by_offset] == expected[3:5]
+
+
+@pytest.mark.parametrize("sort_by", ["date", "amount", "category", "frequency"])
+def test_list_row_sort_key_orders_like_the_database(
+    expense_repository, database, sort_by, make_expense, add_sample_expenses
+):
+    category_repository = CategoryRepository(database)
+    for name in ("zaino", "Affitto", "Éxtra", "affitti"):
+        category_repository.add(Category(id=None, name=name, is_custom=True))
+    for category_id in (1, 2, 3, 4):
+        expense_repository.add(make_expense(date(2024, 1, 5), 3.0, category_id))
+    add_sample_expenses(expense_repository)
+
+    rows = expense_repository.get_all_list_rows(sort_by, descending=False)
+
+    assert sorted(rows, key=lambda row: list_row_sort_key(row, sort_by)) == rows
+    assert expense_repository.get_list_row(rows[0].id) == rows[0]
+    assert expense_repository.get_list_row(999) is None
+
+
+def test_count_and_total(expense_repository, add_sample_expenses):
+    add_sample_expenses(expense_repository)
+
+    assert expense_repository.get_count_and_total() == (5, 136.5)
+    assert expense_repository.get_count_and_total(
+        date(2024, 1, 1), date(2024, 1, 31)
+    ) == (4, 37.5)
+    assert expense_repository.get_count_and_total(
+        date(2024, 1, 11), date(2024, 2, 1)
+    ) == (3, 124)
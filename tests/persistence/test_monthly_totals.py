@@ -0,0 +1,82 @@
+from datetime import date
+
+from domain.models import Money
+from persistence.monthly_totals import RollupDrift, find_monthly_totals_drift
+from persistence.db import rebuild_monthly_category_totals
+from services.analysis_service import AnalysisService
+from services.expense_service import ExpenseService
+
+
+def rollup(connection) -> list[tuple]:
+    return connection.execute(
+        """
+        SELECT year, month, category_id, total, count, max_amount
+        FROM monthly_category_totals ORDER BY 1, 2, 3
+        """
+    ).fetchall()
+
+
+def test_triggers_keep_the_rollup_exact(
+    db_connection_test, expense_repository, make_expense
+):
+    big = expense_repository.add(make_expense(date(2024, 1, 10), 30.0, 1))
+    small = expense_repository.add(make_expense(date(2024, 1, 20), 5.5, 1))
+    expense_repository.add(make_expense(date(2024, 2, 1), 2.0, 2))
+
+    assert rollup(db_connection_test) == [
+        (2024, 1, 1, 3550, 2, 3000),
+        (2024, 2, 2, 200, 1, 200),
+    ]
+
+    # moving the largest expense to another month and category
+    big.date, big.category_id = date(2024, 2, 3), 2
+    expense_repository.update(big)
+    assert rollup(db_connection_test) == [
+        (2024, 1, 1, 550, 1, 550),
+        (2024, 2, 2, 3200, 2, 3000),
+    ]
+
+    expense_repository.delete(small.id)
+    expense_repository.delete(big.id)
+    assert rollup(db_connection_test) == [(2024, 2, 2, 200, 1, 200)]
+
+    assert find_monthly_totals_drift(db_connection_test) == []
+
+
+def test_drift_is_reported_and_rebuilt(
+    db_connection_test, expense_repository, make_expense
+):
+    expense_repository.add(make_expense(date(2024, 1, 10), 30.0, 1))
+    db_connection_test.execute("UPDATE monthly_category_totals SET total = 1")
+    db_connection_test.execute(
+        "INSERT INTO monthly_category_totals VALUES (2023, 5, 1, 100, 1, 100)"
+    )
+
+    assert find_monthly_totals_drift(db_connection_test) == [
+        RollupDrift(2023, 5, 1, stored=(100, 1, 100), expected=None),
+        RollupDrift(2024, 1, 1, stored=(1, 1, 3000), expected=(3000, 1, 3000)),
+    ]
+
+    rebuild_monthly_category_totals(db_connection_test)
+
+    assert find_monthly_totals_drift(db_connection_test) == []
+
+
+def test_year_analysis_reads_the_rollup(expense_repository, make_expense):
+    expense_repository.add(make_expense(date(2024, 1, 10), 30.0, 1))
+    expense_repository.add(make_expense(date(2024, 3, 5), 10.0, 1))
+    expense_repository.add(make_expense(date(2024, 3, 6), 2.0, 2))
+    analysis = AnalysisService(ExpenseService(expense_repository))
+
+    by_month = analysis.get_monthly_totals_for_year(2024)
+    assert by_month[1] == 30 and by_month[2] == 0 and by_month[3] == 12
+
+    by_category = analysis.get_monthly_totals_by_category_for_year(2024)
+    assert by_category[2][3] == 2 and by_category[2][1] == 0
+
+    assert analysis.get_monthly_average_for_year(
+        2024, today=date(2024, 3, 31)
+    ) == Money("14.00")
+    assert analysis.get_monthly_average_for_year(
+        2024, category_id=1, today=date(2025, 1, 1)
+    ) == Money(40) / 12
@@ -0,0 +1,86 @@
+"""
+Guards the hot period queries against falling back to full table scans.
+"""
+
+from datetime import date
+
+import pytest
+
+
+def query_plan(connection, sql: str) -> list[str]:
+    rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def traced_queries(connection, call) -> list[str]:
+    statements: list[str] = []
+    connection.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        connection.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+START, END = date(2024, 1, 1), date(2024, 1, 31)
+# Whole months are read from the monthly rollup, other periods from expenses
+MID_MONTH = date(2024, 1, 15)
+
+HOT_QUERIES = {
+    "get_by_period": lambda repo: repo.get_by_period(START, END),
+    "get_total_for_period": lambda repo: repo.get_total_for_period(START, END),
+    "get_totals_by_category": lambda repo: repo.get_totals_by_category(START, END),
+    "get_daily_totals": lambda repo: repo.get_daily_totals(START, END),
+    "get_daily_totals_for_category": lambda repo: (
+        repo.get_daily_totals_for_category(START, END, 1)
+    ),
+    "get_max_amount": lambda repo: repo.get_max_amount(START, END),
+    "get_total_for_partial_month": lambda repo: (
+        repo.get_total_for_period(START, MID_MONTH)
+    ),
+    "get_totals_by_category_for_partial_month": lambda repo: (
+        repo.get_totals_by_category(START, MID_MONTH)
+    ),
+    "get_max_amount_for_partial_month": lambda repo: (
+        repo.get_max_amount(START, MID_MONTH)
+    ),
+    "get_page": lambda repo: repo.get_page((START, 10), 50),
+    "get_list_rows_page": lambda repo: (
+        repo.get_list_rows_page((START, 10), 50, START, END)
+    ),
+    "iter_by_period": lambda repo: list(repo.iter_by_period(START, END)),
+    "get_monthly_category_totals": lambda repo: (
+        repo.get_monthly_category_totals(2024)
+    ),
+    "get_list_rows_for_period": lambda repo: repo.get_list_rows_for_period(START, END),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(name, db_connection_test, expense_repository):
+    statements = traced_queries(
+        db_connection_test, lambda: HOT_QUERIES[name](expense_repository)
+    )
+
+    assert statements, f"{name} did not run any SELECT"
+
+    for sql in statements:
+        plan = query_plan(db_connection_test, sql)
+        scans = [step for step in plan if step.startswith("SCAN")]
+        assert not scans, f"{name} scans instead of searching an index: {plan}"
+
+
+@pytest.mark.parametrize("sort_by", ["date", "amount"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_expense_list_sort_is_read_from_an_index(
+    sort_by, descending, db_connection_test, expense_repository
+):
+    statements = traced_queries(
+        db_connection_test,
+        lambda: expense_repository.get_all_list_rows(sort_by, descending),
+    )
+
+    for sql in statements:
+        plan = query_plan(db_connection_test, sql)
+        sorts = [step for step in plan if "TEMP B-TREE" in step]
+        assert not sorts, f"sorting by {sort_by} needs a temporary b-tree: {plan}"
@@ -87,8 +87,42 @@ class FakeExpenseService:
         self._expenses = expenses
 
     def get_expenses_for_period(self, start_date: date, end_date: date):
+        return self._in_period(start_date, end_date)
+
+    def _in_period(self, start_date: date, end_date: date):
         return [e for e in self._expenses if start_date <= e.date <= end_date]
 
+    def get_total_for_period(self, start_date: date, end_date: date):
+        return sum(
+            (e.amount for e in self._in_period(start_date, end_date)),
+            start=Decimal("0"),
+        )
+
+    def get_totals_by_category(self, start_date: date, end_date: date):
+        totals = {}
+        for e in self._in_period(start_date, end_date):
+            totals[e.category_id] = totals.get(e.category_id, Decimal("0")) + e.amount
+        return totals
+
+    def get_daily_totals(self, start_date: date, end_date: date):
+        totals = {}
+        for e in self._in_period(start_date, end_date):
+            totals[e.date] = totals.get(e.date, Decimal("0")) + e.amount
+        return totals
+
+    def get_daily_totals_for_category(
+        self, start_date: date, end_date: date, category_id: int
+    ):
+        totals = {}
+        for e in self._in_period(start_date, end_date):
+            if e.category_id == category_id:
+                totals[e.date] = totals.get(e.date, Decimal("0")) + e.amount
+        return totals
+
+    def get_max_amount(self, start_date: date, end_date: date):
+        amounts = [e.amount for e in self._in_period(start_date, end_date)]
+        return max(amounts) if amounts else None
+
 
 def test_get_expense_summary_returns_valid_structure() -> None:
     service = AnalysisService(
@@ -352,3 +386,65 @@ def test_get_daily_totals_for_period_and_category():
     # Category 1 expenses should not appear
     assert result_category_2[date(2024, 1, 10)] == Decimal("0")
     assert result_category_2[date(2024, 1, 15)] == Decimal("0")
+
+
+class CountingExpenseService(FakeExpenseService):
+    def __init__(self, expenses: list[Expense]):
+        super().__init__(expenses)
+        self.calls: list[tuple[str, date, date]] = []
+
+    def get_expenses_for_period(self, start_date: date, end_date: date):
+        self.calls.append(("expenses", start_date, end_date))
+        return super().get_expenses_for_period(start_date, end_date)
+
+    def get_totals_by_category(self, start_date: date, end_date: date):
+        self.calls.append(("by_category", start_date, end_date))
+        return super().get_totals_by_category(start_date, end_date)
+
+    def get_max_amount(self, start_date: date, end_date: date):
+        self.calls.append(("max", start_date, end_date))
+        return super().get_max_amount(start_date, end_date)
+
+
+def test_get_expense_summary_fetches_each_period_once() -> None:
+    expense_service = CountingExpenseService(
+        expenses=[expense1, expense2, expense3, expense4, expense5]
+    )
+    service = AnalysisService(expense_service=expense_service)
+
+    result = service.get_expense_summary(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 29),
+        category_map={1: "Food", 2: "Transport"},
+    )
+
+    # Only aggregate queries, once per period; the max of the current one only
+    assert expense_service.calls == [
+        ("by_category", date(2024, 2, 1), date(2024, 2, 29)),
+        ("max", date(2024, 2, 1), date(2024, 2, 29)),
+        ("by_category", date(2024, 1, 3), date(2024, 1, 31)),
+    ]
+
+    # Same figures as the per-metric methods
+    totals = service.compare_total_for_periods(
+        date(2024, 2, 1), date(2024, 2, 29), date(2024, 1, 3), date(2024, 1, 31)
+    )
+    averages = service.compare_daily_average_for_periods(
+        date(2024, 2, 1), date(2024, 2, 29), date(2024, 1, 3), date(2024, 1, 31)
+    )
+    by_category = service.compare_totals_by_category_for_periods(
+        date(2024, 2, 1), date(2024, 2, 29), date(2024, 1, 3), date(2024, 1, 31)
+    )
+
+    assert result.overall == OverallSummary(
+        total_amount=totals.current,
+        previous_total_amount=totals.previous,
+        delta_percent=totals.delta_percentage,
+        daily_average=averages.current,
+        previous_daily_average=averages.previous,
+        max_single_expense=Decimal("5.00"),
+    )
+    assert {c.category_id: c.total_amount for c in result.by_category} == {
+        category_id: comparison.current
+        for category_id, comparison in by_category.items()
+    }
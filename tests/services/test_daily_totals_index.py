@@ -0,0 +1,143 @@
+from datetime import date
+
+import pytest
+
+from domain.models import ExpenseChangeSet, Money
+
+from services.analysis_service import AnalysisService
+from services.daily_totals_index import DailyTotalsIndex
+from services.expense_service import ExpenseService
+from services.result_cache import VersionedLRUCache
+
+
+@pytest.fixture
+def expense_service(expense_repository):
+    return ExpenseService(expense_repository)
+
+
+def create(expense_service, day: date, amount: float, category_id: int):
+    return expense_service.create_expense(
+        date_=day, amount=amount, category_id=category_id
+    )
+
+
+def test_index_answers_range_totals(expense_service):
+    create(expense_service, date(2024, 1, 10), 10.1, 1)
+    create(expense_service, date(2024, 1, 10), 2.2, 2)
+    create(expense_service, date(2024, 2, 1), 99.99, 1)
+
+    index = DailyTotalsIndex(expense_service)
+
+    assert index.total(date(2024, 1, 1), date(2024, 1, 31)) == Money("12.30")
+    assert index.total(date(2023, 1, 1), date(2025, 1, 1)) == Money("112.29")
+    assert index.total(date(2024, 1, 11), date(2024, 1, 31)) == 0
+    assert index.total_for_category(date(2024, 1, 1), date(2024, 2, 29), 1) == Money("110.09")
+    assert index.totals_by_category(date(2024, 1, 1), date(2024, 1, 31)) == {
+        1: Money("10.10"),
+        2: Money("2.20"),
+    }
+
+    with pytest.raises(ValueError):
+        index.total(date(2024, 2, 1), date(2024, 1, 1))
+
+
+def test_index_follows_changes_made_through_the_service(expense_service):
+    index = DailyTotalsIndex(expense_service)
+    january = (date(2024, 1, 1), date(2024, 1, 31))
+
+    expense = create(expense_service, date(2024, 1, 10), 10.0, 1)
+    # before the first day of the index
+    create(expense_service, date(2023, 12, 31), 5.0, 2)
+    assert index.total(*january) == 10
+    assert index.total(date(2023, 12, 1), date(2024, 1, 31)) == 15
+
+    expense_service.update_expense(
+        expense.id, date=date(2024, 1, 20), amount=7.5, category_id=2
+    )
+    assert index.totals_by_category(*january) == {2: 7.5}
+
+    expense_service.delete_expense(expense.id)
+    assert index.total(*january) == 0
+    assert index.total(date(2023, 12, 31), date(2023, 12, 31)) == 5
+
+
+def test_analysis_uses_the_index(expense_service):
+    create(expense_service, date(2024, 1, 10), 10.0, 1)
+    create(expense_service, date(2023, 12, 10), 4.0, 1)
+
+    with_index = AnalysisService(
+        expense_service, totals_index=DailyTotalsIndex(expense_service)
+    )
+    without_index = AnalysisService(expense_service)
+    args = (date(2024, 1, 1), date(2024, 1, 31), {1: "Casa"})
+
+    assert with_index.get_expense_summary(*args) == without_index.get_expense_summary(
+        *args
+    )
+
+
+def test_summaries_computed_before_the_index_caught_up_are_not_reused(
+    expense_service,
+):
+    january = (date(2024, 1, 1), date(2024, 1, 31), {1: "Casa"})
+    summaries = []
+    create(expense_service, date(2024, 1, 5), 5.0, 1)
+
+    # Runs after the commit but before the index applied the change,
+    # like an analysis worker would
+    expense_service.add_change_listener(
+        lambda change: summaries.append(analysis.get_expense_summary(*january))
+    )
+    index = DailyTotalsIndex(expense_service)
+    index.load()
+    analysis = AnalysisService(
+        expense_service, totals_index=index, cache=VersionedLRUCache()
+    )
+
+    create(expense_service, date(2024, 1, 10), 10.0, 1)
+
+    assert summaries[0].overall.total_amount == 5
+    assert analysis.get_expense_summary(*january).overall.total_amount == 15
+
+
+def test_index_is_loaded_by_the_first_query_without_counting_changes_twice(
+    expense_service,
+):
+    index = DailyTotalsIndex(expense_service)
+    january = (date(2024, 1, 1), date(2024, 1, 31))
+    committed = create(expense_service, date(2024, 1, 10), 10.0, 1)
+
+    assert index.generation == 1  # nothing read yet
+    assert index.total(*january) == 10
+
+    # A change committed before the load, notified after it (e.g. from
+    # the Tk thread while a worker loaded the index)
+    index.apply(
+        ExpenseChangeSet(
+            added=(committed,), version=expense_service.get_data_version()
+        )
+    )
+    assert index.total(*january) == 10
+
+    expense_service.notify_reload()
+    create(expense_service, date(2024, 1, 20), 2.5, 2)
+    assert index.total(*january) == Money("12.50")
+
+
+def test_changes_received_while_loading_are_applied_after(
+    expense_service, monkeypatch
+):
+    index = DailyTotalsIndex(expense_service)
+    create(expense_service, date(2024, 1, 10), 10.0, 1)
+    read_totals = expense_service.get_daily_category_totals_at_version
+
+    def read_then_write():
+        totals = read_totals()
+        create(expense_service, date(2024, 1, 11), 1.0, 1)
+        return totals
+
+    monkeypatch.setattr(
+        expense_service, "get_daily_category_totals_at_version", read_then_write
+    )
+
+    assert index.total(date(2024, 1, 1), date(2024, 1, 31)) == 11
@@ -0,0 +1,119 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from domain.expense_frame import ExpenseFrame
+from services.analysis_service import AnalysisService
+from services.expense_frame_source import ExpenseFrameSource
+from services.expense_service import ExpenseService
+from services.result_cache import VersionedLRUCache
+
+
+@pytest.fixture
+def expense_service(expense_repository, make_expense):
+    expense_repository.add_many(
+        [
+            make_expense(date(2023, 12, 31), 4.0, 2),
+            make_expense(date(2024, 1, 10), 10.1, 1),
+            make_expense(date(2024, 1, 10), 2.2, 2),
+            make_expense(date(2024, 1, 15), 20.0, 1),
+            make_expense(date(2024, 2, 1), 99.99, 1),
+        ]
+    )
+    return ExpenseService(expense_repository)
+
+
+def test_frame_is_built_from_cursor_rows(expense_service):
+    frame = expense_service.get_expense_frame()
+
+    assert len(frame) == 5
+    assert frame.days[0] == date(2023, 12, 31).toordinal()
+    assert frame.amount_cents.tolist() == [400, 1010, 220, 2000, 9999]
+    assert frame.category_ids.tolist() == [2, 1, 2, 1, 1]
+
+
+def test_frame_reductions():
+    frame = ExpenseFrame.from_rows(
+        [
+            (date(2024, 1, 3).toordinal(), 300, 1),
+            (date(2024, 1, 1).toordinal(), 100, 2),
+            (date(2024, 1, 3).toordinal(), 50, 2),
+        ]
+    )
+
+    assert frame.totals_by_category() == {1: 300, 2: 150}
+    assert frame.totals_by_day() == {date(2024, 1, 1): 100, date(2024, 1, 3): 350}
+    assert frame.max_cents() == 300
+    assert frame.daily_totals_array(date(2024, 1, 1), date(2024, 1, 4)).tolist() == [
+        100,
+        0,
+        350,
+        0,
+    ]
+    assert frame.window_sums(date(2024, 1, 2), date(2024, 1, 4), 2).tolist() == [
+        100,
+        350,
+        350,
+    ]
+
+
+def test_analysis_on_frame_matches_database(expense_service):
+    on_database = AnalysisService(expense_service)
+    on_frame = AnalysisService(
+        ExpenseFrameSource(expense_service.get_expense_frame(), expense_service)
+    )
+    start, end = date(2024, 1, 1), date(2024, 1, 31)
+    categories = {1: "Casa", 2: "Spesa"}
+
+    assert on_frame.get_expense_summary(
+        start, end, categories
+    ) == on_database.get_expense_summary(start, end, categories)
+    assert on_frame.get_daily_totals_for_period(
+        start, end
+    ) == on_database.get_daily_totals_for_period(start, end)
+    assert on_frame.get_daily_totals_for_period_and_category(
+        start, end, 2
+    ) == on_database.get_daily_totals_for_period_and_category(start, end, 2)
+    assert on_frame.get_max_expense_for_period(start, end).amount == 20
+
+
+def test_year_analysis_on_frame_matches_database(expense_service):
+    on_database = AnalysisService(expense_service)
+    source = ExpenseFrameSource(expense_service.get_expense_frame(), expense_service)
+    on_frame = AnalysisService(source)
+    today = date(2024, 6, 15)
+
+    assert source.get_monthly_category_totals(
+        2024
+    ) == expense_service.get_monthly_category_totals(2024)
+
+    for year in (2023, 2024, 2025):
+        assert on_frame.get_monthly_totals_for_year(
+            year
+        ) == on_database.get_monthly_totals_for_year(year)
+        assert on_frame.get_monthly_totals_by_category_for_year(
+            year
+        ) == on_database.get_monthly_totals_by_category_for_year(year)
+        for category_id in (None, 1, 2):
+            assert on_frame.get_monthly_average_for_year(
+                year, category_id, today=today
+            ) == on_database.get_monthly_average_for_year(
+                year, category_id, today=today
+            )
+
+
+def test_cached_analysis_on_frame(expense_service):
+    cache = VersionedLRUCache()
+    on_frame = AnalysisService(
+        ExpenseFrameSource(expense_service.get_expense_frame(), expense_service),
+        cache=cache,
+    )
+    args = (date(2024, 1, 1), date(2024, 1, 31), {1: "Casa", 2: "Spesa"})
+
+    summary = on_frame.get_expense_summary(*args)
+
+    assert on_frame.get_expense_summary(*args) is summary
+    assert on_frame.get_data_version() == expense_service.get_data_version()
+    assert cache.hits == 1
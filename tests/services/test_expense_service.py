@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from domain.models import ExpenseChangeSet
+from services.expense_service import ExpenseService
+
+
+@pytest.fixture
+def expense_service(expense_repository):
+    return ExpenseService(expense_repository)
+
+
+def test_amounts_rounding_to_zero_cents_are_rejected(expense_service):
+    with pytest.raises(ValueError):
+        expense_service.create_expense(
+            date_=date(2024, 1, 15), amount=0.004, category_id=1
+        )
+
+    expense = expense_service.create_expense(
+        date_=date(2024, 1, 15), amount=0.005, category_id=1
+    )
+    assert expense.amount == 0.01
+
+
+def test_expenses_written_elsewhere_are_notified_with_their_version(
+    expense_service, expense_repository, make_expense
+):
+    changes = []
+    expense_service.add_change_listener(changes.append)
+
+    # e.g. by the recurring generation
+    expense = expense_repository.add(make_expense(date(2024, 1, 15), 9.99, 1))
+    version = expense_service.get_last_commit_version()
+    expense_service.notify_added([expense], version)
+
+    assert version == expense_service.get_data_version()
+    assert changes == [ExpenseChangeSet(added=(expense,), version=version)]
@@ -0,0 +1,79 @@
+from concurrent.futures import wait
+from datetime import date
+
+import pytest
+
+from domain.models import Money
+from persistence.db import ConnectionManager, init_db
+from persistence.expense_repository import ExpenseRepository
+from services.analysis_service import AnalysisService
+from services.expense_service import ExpenseService, ExpenseSortField, SortDirection
+from services.period_prefetcher import PeriodPrefetcher
+from services.result_cache import VersionedLRUCache
+from utils.dates import month_date_range
+
+SORT = (ExpenseSortField.DATE, SortDirection.ASC)
+
+
+@pytest.fixture
+def database(tmp_path):
+    # a file database: the prefetches run in another thread
+    database = ConnectionManager(str(tmp_path / "expenses.db"), max_readers=2)
+    with database.writer() as connection:
+        init_db(connection)
+        connection.execute(
+            "INSERT INTO categories (name, is_custom) VALUES ('Casa', 0)"
+        )
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def expense_service(database):
+    expense_service = ExpenseService(ExpenseRepository(database))
+    for day, amount in ((date(2024, 1, 31), 10.0), (date(2024, 2, 1), 5.5)):
+        expense_service.create_expense(date_=day, amount=amount, category_id=1)
+    return expense_service
+
+
+def test_list_heads_are_cached_until_a_write(expense_service):
+    prefetcher = PeriodPrefetcher(
+        expense_service, AnalysisService(expense_service), {1: "Casa"}, head_rows=1
+    )
+    january = month_date_range(2024, 1)
+
+    head = prefetcher.get_list_head(*january, *SORT)
+    assert (head.count, head.total) == (1, Money("10.00"))
+    assert [row.date for row in head.rows] == [date(2024, 1, 31)]
+
+    assert prefetcher.get_list_head(*january, *SORT) is head
+    assert prefetcher.hit_rate == 0.5
+
+    expense_service.create_expense(date_=date(2024, 1, 2), amount=1.0, category_id=1)
+
+    head = prefetcher.get_list_head(*january, *SORT)
+    assert (head.count, head.total) == (2, Money("11.00"))
+    assert [row.date for row in head.rows] == [date(2024, 1, 2)]
+
+    prefetcher.shutdown()
+
+
+def test_adjacent_months_are_prefetched(expense_service):
+    analysis_cache = VersionedLRUCache()
+    analysis_service = AnalysisService(expense_service, cache=analysis_cache)
+    prefetcher = PeriodPrefetcher(expense_service, analysis_service, {1: "Casa"})
+
+    wait(prefetcher.prefetch_around(2024, 2, *SORT, analysis=True))
+    # January and March 2024, both the list and the analysis
+    assert len(prefetcher.cache) == 2
+    assert len(analysis_cache) == 4
+    # prefetches are not lookups of the user
+    assert prefetcher.cache.misses == analysis_cache.misses == 0
+
+    head = prefetcher.get_list_head(*month_date_range(2024, 1), *SORT)
+    analysis_service.get_expense_summary(*month_date_range(2024, 1), {1: "Casa"})
+
+    assert head.count == 1
+    assert prefetcher.hit_rate == analysis_cache.hit_rate == 1.0
+
+    prefetcher.shutdown()
@@ -122,3 +122,99 @@ def test_stop_recurring_nonexistent_raises(recurring_service):
     # ci aspettiamo un ValueError chiaro
     with pytest.raises(ValueError):
         recurring_service.stop_recurring_expense(non_existent_id)
+
+
+def make_recurring(start_date: date, frequency=RecurrenceFrequency.MONTHLY):
+    return RecurringExpense(
+        id=None,
+        name="Netflix",
+        amount=9.99,
+        category_id=1,
+        frequency=frequency,
+        start_date=start_date,
+        end_date=None,
+        description=None,
+        attachment_path=None,
+        attachment_type=None,
+        last_generated_date=None,
+        created_at=date.today(),
+    )
+
+
+def test_generate_missing_expenses_is_idempotent(
+    recurring_repository, expense_repository, recurring_service
+):
+    recurring = recurring_repository.add(make_recurring(date(2024, 1, 15)))
+
+    generated = recurring_service.generate_missing_expenses(up_to=date(2024, 6, 20))
+
+    assert [e.date for e in generated] == [
+        date(2024, 1, 15),
+        date(2024, 2, 15),
+        date(2024, 3, 15),
+        date(2024, 4, 15),
+        date(2024, 5, 15),
+        date(2024, 6, 15),
+    ]
+    assert len(expense_repository.get_all()) == 6
+    assert recurring_repository.get_by_id(recurring.id).last_generated_date == date(
+        2024, 6, 15
+    )
+
+    # --- second run: nothing left to generate ---
+    assert recurring_service.generate_missing_expenses(up_to=date(2024, 6, 20)) == []
+    assert len(expense_repository.get_all()) == 6
+
+
+def test_generate_missing_expenses_commits_once(
+    db_connection_test, recurring_repository, recurring_service
+):
+    recurring_repository.add(make_recurring(date(2022, 1, 1)))
+    recurring_repository.add(
+        make_recurring(date(2022, 1, 1), RecurrenceFrequency.EVERY_3_MONTHS)
+    )
+
+    statements: list[str] = []
+    db_connection_test.set_trace_callback(statements.append)
+    generated = recurring_service.generate_missing_expenses(up_to=date(2024, 12, 31))
+    db_connection_test.set_trace_callback(None)
+
+    assert len(generated) == 36 + 12
+    assert statements.count("COMMIT") == 1
+
+
+def test_regenerating_from_stale_last_generated_date_skips_duplicates(
+    db_connection_test, recurring_repository, expense_repository, recurring_service
+):
+    recurring = recurring_repository.add(make_recurring(date(2024, 1, 15)))
+    recurring_service.generate_missing_expenses(up_to=date(2024, 6, 20))
+
+    # --- simulate a crash that lost the bookkeeping ---
+    db_connection_test.execute(
+        "UPDATE recurring_expenses SET last_generated_date = NULL WHERE id = ?",
+        (recurring.id,),
+    )
+
+    recurring_service.generate_missing_expenses(up_to=date(2024, 7, 20))
+
+    dates = sorted(e.date for e in expense_repository.get_all())
+    assert len(dates) == 7
+    assert dates[-1] == date(2024, 7, 15)
+
+
+def test_generation_returns_only_the_inserted_expenses(
+    db_connection_test, recurring_repository, recurring_service
+):
+    recurring = recurring_repository.add(make_recurring(date(2024, 1, 15)))
+    recurring_service.generate_missing_expenses(up_to=date(2024, 3, 20))
+
+    # --- lost bookkeeping: January to March are generated again ---
+    db_connection_test.execute(
+        "UPDATE recurring_expenses SET last_generated_date = NULL WHERE id = ?",
+        (recurring.id,),
+    )
+
+    generated = recurring_service.generate_missing_expenses(up_to=date(2024, 4, 20))
+
+    assert [e.date for e in generated] == [date(2024, 4, 15)]
+    assert generated[0].id is not None
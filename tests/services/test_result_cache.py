@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+from services.analysis_service import AnalysisService
+from services.expense_service import ExpenseService
+from services.result_cache import VersionedLRUCache, uncounted
+
+
+def test_cache_evicts_least_recently_used():
+    cache = VersionedLRUCache(max_entries=2)
+
+    cache.get_or_compute("a", 0, lambda: 1)
+    cache.get_or_compute("b", 0, lambda: 2)
+    cache.get_or_compute("a", 0, lambda: pytest.fail("a is cached"))
+    cache.get_or_compute("c", 0, lambda: 3)  # evicts b
+
+    assert cache.get_or_compute("b", 0, lambda: 20) == 20
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert len(cache) == 2
+
+
+def test_cache_drops_results_of_older_versions():
+    cache = VersionedLRUCache()
+
+    assert cache.get_or_compute("a", 0, lambda: 1) == 1
+    assert cache.get_or_compute("a", 1, lambda: 2) == 2
+    assert cache.get_or_compute("a", 1, lambda: 3) == 2
+
+
+def test_analysis_results_are_reused_until_a_write(expense_repository):
+    expense_service = ExpenseService(expense_repository)
+    cache = VersionedLRUCache()
+    analysis = AnalysisService(expense_service, cache=cache)
+    args = (date(2024, 1, 1), date(2024, 1, 31), {1: "Casa"})
+
+    expense_service.create_expense(date_=date(2024, 1, 5), amount=10, category_id=1)
+    first = analysis.get_expense_summary(*args)
+    analysis.get_daily_totals_for_period(args[0], args[1])
+
+    assert analysis.get_expense_summary(*args) is first
+    analysis.get_daily_totals_for_period(args[0], args[1])[date(2024, 1, 5)] = 0
+    assert analysis.get_daily_totals_for_period(args[0], args[1])[
+        date(2024, 1, 5)
+    ] == 10
+    assert cache.hits == 3
+
+    expense_service.create_expense(date_=date(2024, 1, 6), amount=5, category_id=1)
+
+    assert analysis.get_expense_summary(*args).overall.total_amount == 15
+
+
+def test_uncounted_lookups_are_left_out_of_the_hit_rate():
+    cache = VersionedLRUCache()
+
+    with uncounted():
+        cache.get_or_compute("key", 1, lambda: "value")
+
+    assert cache.get_or_compute("key", 1, lambda: "other") == "value"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_lookups_with_an_older_version_leave_the_cache_alone():
+    cache = VersionedLRUCache()
+    cache.get_or_compute("key", 2, lambda: "new")
+
+    # e.g. a prefetch that read the version before the last write
+    assert cache.get_or_compute("key", 1, lambda: "old") == "old"
+    assert cache.get_or_compute("other", 1, lambda: "old") == "old"
+
+    assert cache.get_or_compute("key", 2, lambda: "recomputed") == "new"
+    assert len(cache) == 1
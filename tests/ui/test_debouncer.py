@@ -0,0 +1,53 @@
+from ui.debouncer import Debouncer
+
+
+class FakeWidget:
+    """Runs the after() callbacks when the test advances the clock."""
+
+    def __init__(self):
+        self.now = 0
+        self.pending: dict[int, tuple] = {}
+        self._next_id = 0
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.pending[self._next_id] = (self.now + delay_ms, callback)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def advance(self, ms):
+        self.now += ms
+        for after_id, (due, callback) in sorted(self.pending.items()):
+            if due <= self.now:
+                del self.pending[after_id]
+                callback()
+
+
+def test_a_burst_of_triggers_makes_one_call_with_the_last_value():
+    widget, calls = FakeWidget(), []
+    debouncer = Debouncer(widget, 200, calls.append, initial=(2024, 1))
+
+    for month in range(2, 8):  # arrow held down
+        debouncer.trigger((2024, month))
+        widget.advance(100)
+    assert calls == []
+
+    widget.advance(100)
+    assert calls == [(2024, 7)]
+
+
+def test_unchanged_values_are_not_notified():
+    widget, calls = FakeWidget(), []
+    debouncer = Debouncer(widget, 200, calls.append, initial=(2024, 1))
+
+    debouncer.trigger((2024, 2))
+    debouncer.trigger((2024, 1))  # back before the delay
+    widget.advance(200)
+
+    debouncer.trigger((2024, 3))
+    debouncer.flush()
+
+    assert calls == [(2024, 3)]
+    assert widget.pending == {}
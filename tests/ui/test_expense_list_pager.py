@@ -0,0 +1,134 @@
+from typing import NamedTuple
+
+import pytest
+
+from ui.expense_list_pager import ExpenseListPager
+
+
+class FakeSource:
+    def __init__(self, size: int):
+        self.rows = list(range(size))
+        self.calls: list[tuple] = []
+
+    def fetch_page(self, after, offset, limit):
+        self.calls.append(("after", after) if after is not None else ("offset", offset))
+        start = self.rows.index(after) + 1 if after is not None else offset
+        return self.rows[start : start + limit]
+
+
+def test_pager_serves_windows_across_pages():
+    source = FakeSource(25)
+    pager = ExpenseListPager(source.fetch_page, count=25, page_size=10)
+
+    assert pager.get(0, 5) == [0, 1, 2, 3, 4]
+    assert pager.get(8, 5) == [8, 9, 10, 11, 12]
+    assert pager.get(22, 10) == [22, 23, 24]
+    assert pager.get(30, 5) == []
+
+    # the next pages are keyset queries after the last row of the previous one
+    assert source.calls == [("offset", 0), ("after", 9), ("after", 19)]
+
+
+def test_pager_keeps_a_bounded_number_of_pages():
+    source = FakeSource(100)
+    pager = ExpenseListPager(source.fetch_page, count=100, page_size=10, max_pages=2)
+
+    pager.get(0, 1)
+    pager.get(50, 1)  # jump: fetched by offset
+    pager.get(60, 1)
+    pager.get(0, 1)  # evicted, fetched again
+
+    assert source.calls == [
+        ("offset", 0),
+        ("offset", 50),
+        ("after", 59),
+        ("offset", 0),
+    ]
+
+
+class Row(NamedTuple):
+    id: int
+    value: int
+
+
+def make_patchable(size: int, descending: bool = False):
+    source = FakeSource(0)
+    source.rows = sorted(
+        (Row(id=i, value=i * 10) for i in range(size)), reverse=descending
+    )
+    pager = ExpenseListPager(
+        source.fetch_page,
+        count=size,
+        page_size=10,
+        sort_key=lambda row: (row.value, row.id),
+        descending=descending,
+    )
+    return source, pager
+
+
+def write(source, descending, added=(), removed=()):
+    source.rows = sorted(
+        [row for row in source.rows if row.id not in removed] + list(added),
+        key=lambda row: (row.value, row.id),
+        reverse=descending,
+    )
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_pager_patches_inserts_and_removes_without_fetching(descending):
+    source, pager = make_patchable(50, descending)
+    pager.get(0, 50)
+    source.calls.clear()
+
+    changes = [
+        dict(added=[Row(id=100, value=125)]),  # inside a page
+        dict(added=[Row(id=101, value=-5)]),  # before every row
+        dict(added=[Row(id=102, value=999)]),  # after every row
+        dict(removed=[7]),
+        dict(removed=[3], added=[Row(id=3, value=455)]),  # edit: moves
+    ]
+    for change in changes:
+        for row_id in change.get("removed", ()):
+            assert pager.remove(row_id)
+        for row in change.get("added", ()):
+            pager.insert(row)
+        write(source, descending, **change)
+
+    assert pager.count == len(source.rows)
+    assert pager.get(0, 100) == source.rows
+    assert source.calls == []
+
+
+def test_pager_insert_between_cached_pages_is_fetched_when_shown():
+    source, pager = make_patchable(100)
+    pager.get(0, 5)
+    pager.get(50, 5)
+
+    row = Row(id=100, value=305)  # in the gap between the two pages
+    pager.insert(row)
+    write(source, False, added=[row])
+
+    assert pager.get(0, 101) == source.rows
+
+
+def test_pager_remove_of_an_uncached_row_drops_the_cache():
+    source, pager = make_patchable(100)
+    pager.get(0, 5)
+
+    assert not pager.remove(80)
+    write(source, False, removed=[80])
+    source.calls.clear()
+
+    assert pager.count == 99
+    assert pager.get(0, 100) == source.rows
+    assert source.calls[0] == ("offset", 0)
+
+
+def test_pager_starts_from_the_prefetched_first_rows():
+    source = FakeSource(25)
+    pager = ExpenseListPager(
+        source.fetch_page, count=25, page_size=10, first_rows=source.rows[:10]
+    )
+
+    assert pager.get(5, 10) == list(range(5, 15))
+    assert source.calls == [("after", 9)]
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from ui.latest_result_loader import LatestResultLoader
+
+
+def wait_for(loader):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        future = loader.poll()
+        if future is not None:
+            return future
+        time.sleep(0.001)
+    raise AssertionError("load did not finish")
+
+
+def test_only_the_latest_result_is_returned():
+    loader = LatestResultLoader()
+    started, release = threading.Event(), threading.Event()
+    loaded = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        loaded.append("slow")
+        return "slow"
+
+    def load(name):
+        loaded.append(name)
+        return name
+
+    loader.submit(slow)
+    started.wait(5)
+    loader.submit(lambda: load("queued"))  # cancelled before running
+    generation = loader.submit(lambda: load("latest"))
+    release.set()
+
+    assert wait_for(loader).result() == "latest"
+    assert generation == loader.generation == 3
+    assert loaded == ["slow", "latest"]
+    assert not loader.pending
+    assert loader.poll() is None
+
+    loader.shutdown()
+
+
+def test_errors_are_raised_by_the_result():
+    loader = LatestResultLoader()
+
+    def fail():
+        raise ValueError("boom")
+
+    loader.submit(fail)
+    future = wait_for(loader)
+
+    assert isinstance(future.exception(), ValueError)
+
+    loader.shutdown()
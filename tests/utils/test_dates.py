@@ -0,0 +1,8 @@
+from utils.dates import add_months
+
+
+def test_add_months_rolls_over_years():
+    assert add_months(2024, 1, -1) == (2023, 12)
+    assert add_months(2024, 12, 1) == (2025, 1)
+    assert add_months(2024, 5, 0) == (2024, 5)
+    assert add_months(2024, 3, -27) == (2021, 12)
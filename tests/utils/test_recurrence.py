@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from domain.models import RecurrenceFrequency, RecurringExpense
+from utils.recurrence import (
+    next_index_after_period_of,
+    nth_occurrence,
+    occurrences_between,
+    occurrences_in_range,
+)
+
+
+def test_nth_occurrence_does_not_drift_after_short_months():
+    start = date(2024, 1, 31)
+
+    assert [nth_occurrence(start, RecurrenceFrequency.MONTHLY, n) for n in range(4)] == [
+        date(2024, 1, 31),
+        date(2024, 2, 29),
+        date(2024, 3, 31),
+        date(2024, 4, 30),
+    ]
+
+
+@pytest.mark.parametrize(
+    "frequency, expected",
+    [
+        (RecurrenceFrequency.EVERY_2_MONTHS, date(2024, 11, 15)),
+        (RecurrenceFrequency.EVERY_3_MONTHS, date(2025, 2, 15)),
+        (RecurrenceFrequency.EVERY_4_MONTHS, date(2025, 5, 15)),
+        (RecurrenceFrequency.EVERY_6_MONTHS, date(2025, 11, 15)),
+        (RecurrenceFrequency.YEARLY, date(2027, 5, 15)),
+    ],
+)
+def test_nth_occurrence_steps(frequency, expected):
+    assert nth_occurrence(date(2024, 5, 15), frequency, 3) == expected
+
+
+def test_occurrences_between_starts_from_first_occurrence_in_range():
+    occurrences = occurrences_between(
+        date(2020, 1, 10),
+        RecurrenceFrequency.EVERY_3_MONTHS,
+        from_date=date(2024, 2, 1),
+        to_date=date(2024, 12, 31),
+        end_date=date(2024, 10, 9),
+    )
+
+    assert occurrences == [date(2024, 4, 10), date(2024, 7, 10)]
+
+
+def test_next_index_after_period_of_ignores_drifted_day():
+    # A last date generated by the old day-drifting algorithm (28 instead of 31)
+    start = date(2024, 1, 31)
+    n = next_index_after_period_of(
+        start, RecurrenceFrequency.MONTHLY, date(2024, 3, 28)
+    )
+
+    assert nth_occurrence(start, RecurrenceFrequency.MONTHLY, n) == date(2024, 4, 30)
+
+
+def test_occurrences_in_range_for_many_templates():
+    templates = [
+        RecurringExpense(
+            id=i,
+            name=f"Template {i}",
+            amount=1.0,
+            category_id=1,
+            frequency=RecurrenceFrequency.MONTHLY,
+            start_date=date(2000, 1, 1 + i % 28),
+            end_date=None,
+            description=None,
+            attachment_path=None,
+            attachment_type=None,
+            last_generated_date=None,
+        )
+        for i in range(1000)
+    ]
+
+    result = occurrences_in_range(templates, date(2024, 1, 1), date(2024, 3, 31))
+
+    assert len(result) == 1000
+    assert result[0] == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+    assert all(len(dates) == 3 for dates in result.values())
@@ -24,7 +24,7 @@ class AddExpenseModal(tk.Toplevel):
         expense_service: ExpenseService,
         category_service: CategoryService,
         recurring_expense_service: RecurringExpenseService,
-        on_expense_added,
+        on_expense_added=None,
         on_update_requested=None,
         expense_id=None,
     ):
@@ -36,7 +36,7 @@ class AddExpenseModal(tk.Toplevel):
             expense_service: Service for managing expenses
             category_service: Service for managing categories
             recurring_expense_service: Service for managing recurring expenses
-            on_expense_added: Callback function invoked when expense is successfully added
+            on_expense_added: Optional callback invoked when expense is successfully added
         """
         super().__init__(parent)
 
@@ -129,5 +129,6 @@ class AddExpenseModal(tk.Toplevel):
         ).pack(side=tk.RIGHT)
 
     def add_expense_handler(self):
-        self.on_expense_added()
+        if self.on_expense_added:
+            self.on_expense_added()
         self.destroy()
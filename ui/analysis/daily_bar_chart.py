@@ -1,3 +1,4 @@
+import math
 import tkinter as tk
 from tkinter import ttk
 from datetime import date
@@ -23,47 +24,158 @@ class DailyBarChart(ttk.Frame):
         self.ax.set_ylabel("€")
         self.ax.grid(axis="y", linestyle="--", linewidth=0.5, alpha=0.5)
 
-        self.figure.tight_layout()
+        # Artists reused by every update, see update_chart(). The bars and
+        # the average line are animated: full draws leave them out of the
+        # background cached in _on_draw(), over which they are blitted.
+        self._bars = None
+        self._labels: list[int] | None = None
+        self._average_line = self.ax.axhline(
+            0, linestyle=":", linewidth=1, alpha=0.7, visible=False, animated=True
+        )
+        self._empty_text = self.ax.text(
+            0.5,
+            0.5,
+            "Nessuna spesa nel periodo selezionato",
+            ha="center",
+            va="center",
+            transform=self.ax.transAxes,
+            fontsize=9,
+            color="#777777",
+            visible=False,
+        )
 
-    def update_chart(self, daily_totals: dict[date, float]) -> None:
+        self._background = None
+        self._background_bounds = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
 
-        self.ax.cla()  # clears only data
+        self.figure.tight_layout()
 
+    def update_chart(self, daily_totals: dict[date, float]) -> None:
+        """
+        Shows the totals of each day, updating the existing artists:
+        the bars are only recreated when the number of days changes, and
+        the title, labels and grid configured once are kept.
+
+        When the days and the y scale are unchanged, e.g. between months
+        of similar spending, only the bars and the average line are drawn
+        again, over the rest of the figure cached at the last full draw.
+        """
         if not daily_totals:
             self._draw_empty_state()
-            self.canvas.draw_idle()
+            self._redraw()
             return
 
         dates = sorted(daily_totals.keys())
-        totals = [daily_totals[d] for d in dates]
+        totals = [float(daily_totals[d]) for d in dates]
         labels = [d.day for d in dates]
 
-        x = range(len(totals))
+        avg = sum(totals) / len(totals)
+        top = _nice_limit(max(max(totals), avg) * 1.05)
 
-        bars = self.ax.bar(x, totals)
+        layout_changed = (
+            self._bars is None
+            or len(self._bars) != len(totals)
+            or labels != self._labels
+            or self.ax.get_ylim()[1] != top
+        )
 
-        avg = sum(totals) / len(totals)
+        if self._bars is None or len(self._bars) != len(totals):
+            self._remove_bars()
+            self._bars = self.ax.bar(range(len(totals)), totals)
+            for bar in self._bars:
+                bar.set_animated(True)
+        else:
+            for bar, value in zip(self._bars, totals):
+                bar.set_height(value)
 
-        for bar, value in zip(bars, totals):
+        for bar, value in zip(self._bars, totals):
             bar.set_alpha(0.9 if value > avg else 0.6)
 
-        self.ax.axhline(avg, linestyle=":", linewidth=1, alpha=0.7)
+        self._average_line.set_ydata([avg, avg])
+        self._average_line.set_visible(True)
+
+        if not layout_changed:
+            self._blit()
+            return
+
+        if labels != self._labels:
+            self._labels = labels
+            self.ax.set_xticks(range(len(labels)))
+            self.ax.set_xticklabels(labels, fontsize=8)
+
+        self.ax.set_xlim(-0.5, len(totals) - 0.5)
+        self.ax.set_ylim(0, top)
+
+        self._empty_text.set_visible(False)
+        self.ax.yaxis.set_visible(True)
 
-        self.ax.set_xticks(x)
-        self.ax.set_xticklabels(labels, fontsize=8)
+        self._redraw()
 
+    def _redraw(self) -> None:
+        """
+        Schedules a full draw, which caches the new background.
+        """
+        self._background = None
         self.canvas.draw_idle()
 
+    def _blit(self) -> None:
+        """
+        Draws the animated artists over the cached background.
+        """
+        if self._background is None or (
+            self._background_bounds != self.figure.bbox.bounds  # resized
+        ):
+            self._redraw()
+            return
+
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, event) -> None:
+        """
+        After a full draw: caches the figure without the animated artists,
+        then draws them.
+        """
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._background_bounds = self.figure.bbox.bounds
+        self._draw_animated()
+
+    def _draw_animated(self) -> None:
+        if self._bars is not None:
+            for bar in self._bars:
+                self.ax.draw_artist(bar)
+
+        if self._average_line.get_visible():
+            self.ax.draw_artist(self._average_line)
+
+    def _remove_bars(self) -> None:
+        if self._bars is not None:
+            self._bars.remove()
+            self._bars = None
+
     def _draw_empty_state(self) -> None:
-        self.ax.text(
-            0.5,
-            0.5,
-            "Nessuna spesa nel periodo selezionato",
-            ha="center",
-            va="center",
-            transform=self.ax.transAxes,
-            fontsize=9,
-            color="#777777",
-        )
+        self._remove_bars()
+        self._average_line.set_visible(False)
+        self._empty_text.set_visible(True)
+
+        self._labels = None
         self.ax.set_xticks([])
-        self.ax.set_yticks([])
+        self.ax.yaxis.set_visible(False)
+
+
+def _nice_limit(value: float) -> float:
+    """
+    Rounds an axis limit up to 1, 2, 2.5 or 5 times a power of ten, so
+    that the scale stays the same for similar totals.
+    """
+    if value <= 0:
+        return 1.0
+
+    magnitude = 10 ** math.floor(math.log10(value))
+
+    for step in (1, 2, 2.5, 5):
+        if value <= step * magnitude:
+            return step * magnitude
+
+    return 10 * magnitude
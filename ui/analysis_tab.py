@@ -1,4 +1,5 @@
 from datetime import date
+import logging
 import tkinter as tk
 from tkinter import ttk
 from decimal import Decimal
@@ -7,6 +8,12 @@ from services.analysis_service import AnalysisService, ExpenseAnalysisResult
 from domain.models import CategoryAmount
 from ui.analysis.category_pie_chart import CategoryPieChart
 from ui.analysis.daily_bar_chart import DailyBarChart
+from ui.latest_result_loader import LatestResultLoader
+
+# How often the Tk thread checks whether the analysis data is loaded
+LOADING_POLL_MS = 30
+
+logger = logging.getLogger(__name__)
 
 
 class AnalysisTab(ttk.Frame):
@@ -30,6 +37,16 @@ class AnalysisTab(ttk.Frame):
         self.tree = None
         self.filter_label = None
 
+        # The data is loaded in a worker thread, only the latest is shown
+        self._loader: LatestResultLoader[tuple] = LatestResultLoader("analysis")
+        self._poll_id = None
+        self._charts_only = True
+
+        # (start, end, data version) of the analysis loaded last: the tab is
+        # only loaded when shown, and again only if one of them changed
+        self._loaded_key: tuple | None = None
+        self.bind("<Map>", self._on_shown)
+
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -87,6 +104,9 @@ class AnalysisTab(ttk.Frame):
         self.filter_label = ttk.Label(toolbar, text="", foreground="#666666")
         self.filter_label.pack(side=tk.LEFT, padx=(20, 0))
 
+        self.loading_label = ttk.Label(toolbar, text="", foreground="#666666")
+        self.loading_label.pack(side=tk.LEFT, padx=(20, 0))
+
         # Pie chart
         self.chart_container = ttk.Frame(self.content_frame)
         self.chart_container.grid(row=2, column=1, sticky="nsew", padx=(0, 10))
@@ -116,7 +136,7 @@ class AnalysisTab(ttk.Frame):
         self._update_filter_label()
 
         if self.current_start_date and self.current_end_date:
-            self.refresh(self.current_start_date, self.current_end_date)
+            self._load(charts_only=False)
 
     def refresh_charts(self, daily_totals, result):
         if not result.overall:
@@ -140,21 +160,113 @@ class AnalysisTab(ttk.Frame):
         else:
             self.bar_chart.update_chart(daily_totals)
 
-    def get_analysis_data(self, start_date: date, end_date: date):
+    def get_analysis_data(
+        self, start_date: date, end_date: date, category_id: int | None = None
+    ):
+        """
+        Loads the summary and the daily totals of a period, of one category
+        only when category_id is given. Runs in the loader's worker thread:
+        must not touch any widget.
+        """
         result = self.analysis_service.get_expense_summary(
             start_date, end_date, self.category_name_map
         )
-        daily_totals = self.analysis_service.get_daily_totals_for_period(
-            start_date=start_date, end_date=end_date
-        )
+        if category_id is not None:
+            daily_totals = self.analysis_service.get_daily_totals_for_period_and_category(
+                start_date=start_date, end_date=end_date, category_id=category_id
+            )
+        else:
+            daily_totals = self.analysis_service.get_daily_totals_for_period(
+                start_date=start_date, end_date=end_date
+            )
         return result, daily_totals
 
     def refresh(self, start_date: date, end_date: date):
+        """
+        Loads the analysis of a period in the background and shows it when
+        ready; a refresh requested meanwhile supersedes this one.
+
+        While the tab is hidden only the period is recorded, and it is
+        loaded when the tab is shown.
+        """
         self.current_start_date = start_date
         self.current_end_date = end_date
-        result, daily_totals = self.get_analysis_data(
-            start_date=start_date, end_date=end_date
+
+        if self.winfo_ismapped():
+            self._load_if_stale()
+
+    def _on_shown(self, _event) -> None:
+        self._load_if_stale()
+
+    def _load_if_stale(self) -> None:
+        """
+        Loads the current period unless it is already shown and nothing
+        was written since.
+        """
+        if not (self.current_start_date and self.current_end_date):
+            return
+
+        key = (
+            self.current_start_date,
+            self.current_end_date,
+            self.analysis_service.get_data_version(),
+        )
+        if key == self._loaded_key:
+            return
+
+        self._loaded_key = key
+        self._load(charts_only=False)
+
+    def _load(self, charts_only: bool) -> None:
+        """
+        Starts loading the data of the current period. charts_only keeps
+        the summary and the category list as they are, e.g. when a
+        category is selected in it.
+        """
+        start_date, end_date = self.current_start_date, self.current_end_date
+        category_id = (
+            self._selected_category_id if self.chart_type.get() == "daily" else None
+        )
+
+        # A full refresh still pending is not downgraded by a charts one
+        self._charts_only = charts_only and (
+            self._charts_only or not self._loader.pending
         )
+        self._loader.submit(
+            lambda: self.get_analysis_data(start_date, end_date, category_id)
+        )
+
+        self.loading_label.config(text="Caricamento…")
+        if self._poll_id is None:
+            self._poll_id = self.after(LOADING_POLL_MS, self._poll_loader)
+
+    def _poll_loader(self) -> None:
+        future = self._loader.poll()
+
+        if future is None:
+            # Still loading, or superseded by a newer request
+            if self._loader.pending:
+                self._poll_id = self.after(LOADING_POLL_MS, self._poll_loader)
+            else:
+                self._poll_id = None
+            return
+
+        self._poll_id = None
+        self.loading_label.config(text="")
+
+        try:
+            result, daily_totals = future.result()
+        except Exception:
+            logger.exception("Analysis loading failed")
+            self._loaded_key = None
+            return
+
+        if self._charts_only:
+            self.refresh_charts(daily_totals, result)
+            self._update_filter_label()
+            return
+
+        self._charts_only = True
 
         if not result.overall:
             self._show_empty_state()
@@ -166,6 +278,10 @@ class AnalysisTab(ttk.Frame):
         self._render_by_category(result)
         self.refresh_charts(daily_totals, result)
 
+    def destroy(self) -> None:
+        self._loader.shutdown()
+        super().destroy()
+
     def _render_overall(self, result: ExpenseAnalysisResult) -> None:
         if self.overall_frame is None:
             return
@@ -330,19 +446,6 @@ class AnalysisTab(ttk.Frame):
             self._selected_category_id = int(values[0])  # assumo prima colonna = id
 
         if self.current_start_date and self.current_end_date:
-            result, daily_totals = self.get_analysis_data(
-                start_date=self.current_start_date, end_date=self.current_end_date
-            )
-
-            # If showing daily chart and category is selected, get category-specific daily totals
-            if self.chart_type.get() == "daily" and self._selected_category_id:
-                daily_totals = (
-                    self.analysis_service.get_daily_totals_for_period_and_category(
-                        start_date=self.current_start_date,
-                        end_date=self.current_end_date,
-                        category_id=self._selected_category_id,
-                    )
-                )
-
-            self.refresh_charts(result=result, daily_totals=daily_totals)
-            self._update_filter_label()
+            # If showing daily chart and category is selected, the daily
+            # totals are category-specific
+            self._load(charts_only=True)
@@ -4,24 +4,37 @@ Defines the main application window for the Expense Tracker desktop app.
 """
 
 from datetime import date
+import logging
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
 
 
 from persistence.expense_repository import ExpenseRepository
 from persistence.category_repository import CategoryRepository
-from persistence.db import get_connection
+from persistence.db import ConnectionManager
 from persistence.recurring_expense_repository import RecurringExpenseRepository
 from services.category_service import CategoryService
 from services.expense_service import ExpenseService, SortDirection, ExpenseSortField
 from services.recurring_expense_service import RecurringExpenseService
 from services.analysis_service import AnalysisService
+from services.daily_totals_index import DailyTotalsIndex
+from services.period_prefetcher import PeriodPrefetcher
+from services.result_cache import VersionedLRUCache
 from ui.expense_list import ExpenseListFrame
+from ui.expense_list_pager import PAGE_SIZE
 from ui.period_selector import PeriodSelector
 from ui.analysis_tab import AnalysisTab
 
 from utils.dates import month_date_range
 
+# How often the Tk thread checks whether background generation has finished
+GENERATION_POLL_MS = 100
+
+logger = logging.getLogger(__name__)
+
 
 class ExpenseTrackerApp(tk.Tk):
     """
@@ -29,35 +42,134 @@ class ExpenseTrackerApp(tk.Tk):
     """
 
     def __init__(self):
+        self._startup_started_at = time.perf_counter()
+
         super().__init__()
 
         self.title("Expense Tracker")
         self.geometry("900x500")
 
-        db_connection = get_connection()
+        # Shared by the Tk thread and the background workers
+        self.database = ConnectionManager()
 
-        expense_repository = ExpenseRepository(connection=db_connection)
+        expense_repository = ExpenseRepository(self.database)
 
         # Repositories
         self.expense_service = ExpenseService(expense_repository)
-        self.category_service = CategoryService(
-            CategoryRepository(connection=db_connection)
-        )
-        self.recurring_expense_repo = RecurringExpenseRepository(
-            connection=db_connection
-        )
+        self.category_service = CategoryService(CategoryRepository(self.database))
+        self.recurring_expense_repo = RecurringExpenseRepository(self.database)
         self.recurring_expense_service = RecurringExpenseService(
             self.recurring_expense_repo, expense_repository
         )
-        self.analysis_service = AnalysisService(expense_service=self.expense_service)
-
-        self.recurring_expense_service.generate_missing_expenses(date.today())
+        # Range totals of the analysis, kept up to date by expense_service;
+        # read from the database off the Tk thread, see the generation worker
+        self.totals_index = DailyTotalsIndex(self.expense_service)
+        # Summaries are reused when switching tabs until something is written
+        self.analysis_cache = VersionedLRUCache(max_entries=64)
+        self.analysis_service = AnalysisService(
+            expense_service=self.expense_service,
+            totals_index=self.totals_index,
+            cache=self.analysis_cache,
+        )
 
         self._sort_field = ExpenseSortField.DATE
         self._sort_direction = SortDirection.ASC
         self._init_styles()
 
+        # Show the window with the expenses already stored,
+        # missing recurring expenses are generated in the background
         self._build_ui()
+        self.after_idle(self._on_first_paint)
+
+        self._generation_results: queue.Queue = queue.Queue()
+        self._start_recurring_generation()
+
+    def _on_first_paint(self) -> None:
+        elapsed_ms = (time.perf_counter() - self._startup_started_at) * 1000
+        logger.info("Startup: window ready in %.0f ms", elapsed_ms)
+
+    def _start_recurring_generation(self) -> None:
+        """
+        Generates missing recurring expenses in a worker thread.
+        The worker posts its result on a queue polled from the Tk thread.
+        """
+        worker = threading.Thread(
+            target=self._generate_recurring_expenses_worker,
+            args=(date.today(),),
+            name="recurring-generation",
+            daemon=True,
+        )
+        worker.start()
+
+        self.after(GENERATION_POLL_MS, self._poll_recurring_generation)
+
+    def _generate_recurring_expenses_worker(self, up_to: date) -> None:
+        """
+        Runs in the worker thread. The repositories get their connections
+        from the shared ConnectionManager, which is thread-safe.
+        Must not touch any Tk widget.
+        """
+        started_at = time.perf_counter()
+
+        try:
+            generated = self.recurring_expense_service.generate_missing_expenses(up_to)
+            # version of the generation's commit, made by this thread
+            version = self.expense_service.get_last_commit_version()
+            error = None
+        except Exception as e:  # reported on the Tk thread
+            generated, version, error = [], None, e
+
+        self._generation_results.put(
+            (generated, version, error, (time.perf_counter() - started_at) * 1000)
+        )
+
+        # Loads the totals of the analysis while the list is being used,
+        # otherwise the first analysis would wait for them
+        self.totals_index.load()
+
+    def _poll_recurring_generation(self) -> None:
+        try:
+            generated, version, error, elapsed_ms = (
+                self._generation_results.get_nowait()
+            )
+        except queue.Empty:
+            self.after(GENERATION_POLL_MS, self._poll_recurring_generation)
+            return
+
+        if error is not None:
+            logger.error("Recurring expense generation failed: %s", error)
+            return
+
+        logger.info(
+            "Startup: generated %d recurring expenses in %.0f ms (background)",
+            len(generated),
+            elapsed_ms,
+        )
+
+        if not generated:
+            return
+
+        # The expense list and the totals index add them like any new expense
+        self.expense_service.notify_added(generated, version)
+
+        start_date, end_date = month_date_range(
+            self.toolbar.year_var.get(), self.toolbar.get_selected_month_number()
+        )
+
+        # Only the displayed period needs to be refreshed
+        if any(start_date <= expense.date <= end_date for expense in generated):
+            # loaded now if shown, otherwise when the tab is selected
+            self.analysis_tab.refresh(start_date=start_date, end_date=end_date)
+
+    def destroy(self) -> None:
+        logger.info(
+            "Prefetch: %.0f%% of the expense lists and %.0f%% of the analyses "
+            "from memory",
+            self.prefetcher.hit_rate * 100,
+            self.analysis_cache.hit_rate * 100,
+        )
+        self.prefetcher.shutdown()
+        super().destroy()
 
     def _init_styles(self) -> None:
         style = ttk.Style()
@@ -97,6 +209,18 @@ class ExpenseTrackerApp(tk.Tk):
         self.notebook = ttk.Notebook(content_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
+        categories = self.category_service.get_all_categories()
+
+        category_name_map = {category.id: category.name for category in categories}
+
+        # The months around the displayed one are loaded in the background
+        self.prefetcher = PeriodPrefetcher(
+            self.expense_service,
+            self.analysis_service,
+            category_name_map,
+            head_rows=PAGE_SIZE,
+        )
+
         # Left: Expense list
         self.expense_list = ExpenseListFrame(
             self.notebook,
@@ -106,13 +230,10 @@ class ExpenseTrackerApp(tk.Tk):
             category_service=self.category_service,
             on_refresh_requested=self.refresh_expense_list,
             on_sort_requested=self.on_sort_requested,
+            prefetcher=self.prefetcher,
         )
         self.expense_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        categories = self.category_service.get_all_categories()
-
-        category_name_map = {category.id: category.name for category in categories}
-
         self.expenses_tab = self.expense_list
         self.analysis_tab = AnalysisTab(
             self.notebook,
@@ -121,11 +242,9 @@ class ExpenseTrackerApp(tk.Tk):
         )
 
         self.notebook.add(self.expenses_tab, text="Spese")
+        # The analysis tab loads itself when selected
         self.notebook.add(self.analysis_tab, text="Analisi")
 
-        # Bind notebook tab change event to refresh analysis tab
-        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
-
         self._on_month_changed(
             self.toolbar.year_var.get(), self.toolbar.get_selected_month_number()
         )
@@ -173,17 +292,16 @@ class ExpenseTrackerApp(tk.Tk):
         )
         self.expense_list.disable_actions()
 
+        # Only computed when (or once) the analysis tab is visible
         self.analysis_tab.refresh(start_date=start_date, end_date=end_date)
 
-    def _on_tab_changed(self, event):
-        """Callback triggered when a notebook tab is changed."""
-        selected_tab_index = self.notebook.index(self.notebook.select())
-        # If analysis tab is selected, refresh it
-        if selected_tab_index == 1:  # Analysis tab is at index 1
-            start_date, end_date = month_date_range(
-                self.toolbar.year_var.get(), self.toolbar.get_selected_month_number()
-            )
-            self.analysis_tab.refresh(start_date=start_date, end_date=end_date)
+        self.prefetcher.prefetch_around(
+            year,
+            month,
+            self._sort_field,
+            self._sort_direction,
+            analysis=self.notebook.select() == str(self.analysis_tab),
+        )
 
     def _on_expense_selection_changed(self, selected_id: int | None):
         """Callback triggered when expense selection changes."""
@@ -207,9 +325,7 @@ class ExpenseTrackerApp(tk.Tk):
             expense_id,
             **data,
         )
-        # self.refresh_expense_list()
-
-        self.refresh_expense_list()
+        # The list is patched by its change listener
         self.expense_list.disable_actions()
 
     def refresh_expense_list(self):
@@ -0,0 +1,58 @@
+"""
+Docstring for ui.debouncer
+Coalesces bursts of UI events (e.g. a held down button) into a single call.
+"""
+
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Debouncer(Generic[T]):
+    """
+    Calls callback(value) once no trigger(value) came for delay_ms, with
+    the last value only. Nothing is called when that value equals the one
+    of the previous call (e.g. a month forth and back), the first one
+    being initial.
+
+    widget is any Tk widget, whose after() runs the callback on the Tk
+    thread.
+    """
+
+    def __init__(
+        self,
+        widget,
+        delay_ms: int,
+        callback: Callable[[T], None],
+        initial: T | None = None,
+    ):
+        self._widget = widget
+        self._delay_ms = delay_ms
+        self._callback = callback
+        self._last = initial
+        self._value: T | None = None
+        self._after_id = None
+
+    def trigger(self, value: T) -> None:
+        """
+        (Re)starts the delay, replacing the value of a pending call.
+        """
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+
+        self._value = value
+        self._after_id = self._widget.after(self._delay_ms, self.flush)
+
+    def flush(self) -> None:
+        """
+        Makes the pending call right away, if any.
+        """
+        if self._after_id is None:
+            return
+
+        self._widget.after_cancel(self._after_id)
+        self._after_id = None
+
+        if self._value != self._last:
+            self._last = self._value
+            self._callback(self._value)
@@ -203,7 +203,14 @@ class ExpenseFormFrame(ttk.Frame):
 
             # messagebox.showinfo("Success", "Expense added successfully!")
 
-            self.recurring_expense_service.generate_missing_expenses(date.today())
+            generated = self.recurring_expense_service.generate_missing_expenses(
+                date.today()
+            )
+            if generated:
+                # written by the recurring service, not through expense_service
+                self.expense_service.notify_added(
+                    generated, self.expense_service.get_last_commit_version()
+                )
 
             self.on_expense_added()
 
@@ -7,23 +7,35 @@ from datetime import date
 import tkinter as tk
 from tkinter import Menu, ttk
 from tkinter import messagebox
+from domain.models import ExpenseChangeSet, Money
 from services.category_service import CategoryService
-from services.expense_service import ExpenseService, ExpenseSortField
+from services.expense_service import ExpenseService, ExpenseSortField, SortDirection
+from services.period_prefetcher import PeriodPrefetcher
 from services.recurring_expense_service import RecurringExpenseService
 from utils.frequency_constants import FREQUENCY_LABELS
 from ui.expense_actions import ExpenseActions
+from ui.expense_list_pager import ExpenseListPager
 from ui.add_expense_modal import AddExpenseModal
 
 COLUMN_SORT_MAPPING = {
     "date": ExpenseSortField.DATE,
     "amount": ExpenseSortField.AMOUNT,
     "category": ExpenseSortField.CATEGORY,
+    "frequency": ExpenseSortField.FREQUENCY,
 }
 
+# Used until the first rows are drawn and can be measured
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADING_HEIGHT = 25
+
+# Rows moved by one step of the mouse wheel
+WHEEL_SCROLL_ROWS = 3
+
 SORT_FIELD_TO_COLUMN_ID = {
     ExpenseSortField.DATE: "date",
     ExpenseSortField.AMOUNT: "amount",
     ExpenseSortField.CATEGORY: "category",
+    ExpenseSortField.FREQUENCY: "frequency",
 }
 
 
@@ -42,6 +54,7 @@ class ExpenseListFrame(ttk.Frame):
         on_selection_changed=None,
         on_refresh_requested=None,
         on_sort_requested=None,
+        prefetcher: PeriodPrefetcher | None = None,
     ):
         super().__init__(parent)
         self.expense_service = expense_service
@@ -51,16 +64,34 @@ class ExpenseListFrame(ttk.Frame):
         self._selected_recurring_id = None
         self._on_refresh_requested = on_refresh_requested
         self._on_sort_requested = on_sort_requested
+        # When given, the first rows of a period may be already loaded
+        self._prefetcher = prefetcher
+
+        # Virtualized list: the tree only holds one item per visible row
+        # (the "slots"), filled with the rows of the window starting at
+        # _first_row; the pager fetches them one page at a time.
+        self._pager: ExpenseListPager | None = None
+        self._query: tuple | None = None
+        # data version read before loading: changes up to it are loaded
+        self._loaded_version = 0
+        self._first_row = 0
+        self._visible_rows = 20
+        self._slots: list[str] = []
+        self._shown_rows: list = []
+        self._selected_id: int | None = None
+        self._total = Money(0)
 
         self._build_ui()
 
+        # Adds, edits and deletes are patched in instead of reloading the list
+        self.expense_service.add_change_listener(self.apply_change)
+
     def _build_ui(self):
         self.actions = ExpenseActions(
             self,
             expense_service=self.expense_service,
             category_service=self.category_service,
             recurring_expense_service=self.recurring_expense_service,
-            on_expense_added=self._on_refresh_requested,
             on_refresh=self._on_refresh_requested,
             update_expense_requested=self.on_edit_expense_requested,
             create_expense_requested=self.on_add_expense_requested,
@@ -90,6 +121,25 @@ class ExpenseListFrame(ttk.Frame):
 
         self.tree.column("id", width=0, stretch=False)
 
+        # The scrollbar spans the whole list, not only the items in the tree
+        self.scrollbar = ttk.Scrollbar(
+            self.content_frame, orient=tk.VERTICAL, command=self._on_scrollbar
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self._on_tree_configure)
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.tree.bind("<Button-4>", self._on_mouse_wheel)
+        self.tree.bind("<Button-5>", self._on_mouse_wheel)
+        self.tree.bind("<Up>", lambda _event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda _event: self._move_selection(1))
+        self.tree.bind(
+            "<Prior>", lambda _event: self._move_selection(-self._visible_rows)
+        )
+        self.tree.bind(
+            "<Next>", lambda _event: self._move_selection(self._visible_rows)
+        )
+
         self.tree.tag_configure("recurring", background="#F5FAFF")
         # self.tree.tag_configure(
         #     "recurring_stopped", foreground="#888888"  # grigio soft
@@ -179,91 +229,276 @@ class ExpenseListFrame(ttk.Frame):
         # della scrollbar + eventuali margini per allinearsi alla colonna Amount
         self.total_label_footer.pack(side=tk.LEFT, padx=(10, 0))
 
-    def refresh(self, start_date, end_date, sort_field, sort_direction) -> float:
-        """Refreshes the expense list from the repository."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+    def refresh(self, start_date, end_date, sort_field, sort_direction) -> Money:
+        """
+        Refreshes the expense list from the repository.
 
-        total = 0.0
+        Only the count and the total are computed up front (in SQL),
+        with the first page when prefetched; the rows are fetched page
+        by page while scrolling.
+        """
         if not start_date or not end_date:
-            expenses = self.expense_service.get_all_expenses_sorted(
-                sort_by=sort_field, direction=sort_direction
+            start_date, end_date = None, None
+
+        loaded_version = self.expense_service.get_data_version()
+
+        if self._prefetcher is not None and start_date is not None:
+            head = self._prefetcher.get_list_head(
+                start_date, end_date, sort_field, sort_direction
             )
+            count, total, first_rows = head.count, head.total, list(head.rows)
         else:
-            expenses = self.expense_service.get_expenses_for_month_sorted(
+            count, total = self.expense_service.get_count_and_total(
+                start_date, end_date
+            )
+            first_rows = None
+
+        self._pager = ExpenseListPager(
+            lambda after, offset, limit: self.expense_service.get_list_rows_window(
                 start_date,
                 end_date,
+                limit,
                 sort_by=sort_field,
                 direction=sort_direction,
-            )
+                after=after,
+                offset=offset,
+            ),
+            count,
+            sort_key=self.expense_service.get_list_row_sort_key(sort_field),
+            descending=sort_direction == SortDirection.DESC,
+            first_rows=first_rows,
+        )
+
+        # Same list refreshed after a change: keep the scroll position
+        query = (start_date, end_date, sort_field, sort_direction)
+        if query != self._query:
+            self._query = query
+            self._first_row = 0
+        self._selected_id = None
+        self._total = total
+        self._loaded_version = loaded_version
+
+        self._show_rows()
+
+        return total
+
+    def apply_change(self, change: ExpenseChangeSet) -> None:
+        """
+        Updates the list after expenses were written through ExpenseService.
+
+        Only the changed rows are taken out of and placed into the loaded
+        pages (an edit is both), the footer total is adjusted by the
+        difference and the visible rows are redrawn: editing one expense
+        does not reload a long list. Must be called on the Tk thread.
+        """
+        if self._pager is None:
+            return
+
+        if change.reload:
+            self.refresh(*self._query)
+            return
+
+        # e.g. generated in the background before the list was refreshed
+        if change.version is not None and change.version <= self._loaded_version:
+            return
+
+        start_date, end_date = self._query[:2]
+
+        def in_period(expense) -> bool:
+            return start_date is None or start_date <= expense.date <= end_date
+
+        for expense in change.removed:
+            if in_period(expense):
+                self._pager.remove(expense.id)
+                self._total -= expense.amount
+
+        for expense in change.added:
+            if in_period(expense):
+                row = self.expense_service.get_list_row(expense.id)
+                if row is not None:
+                    self._pager.insert(row)
+                    self._total += row.amount
+
+        selection_removed = self._selected_id is not None and self._selected_id in {
+            expense.id for expense in change.removed
+        } - {expense.id for expense in change.added if in_period(expense)}
+
+        if selection_removed:
+            self._selected_id = None
+
+        self._show_rows()
+
+        if selection_removed and self.on_selection_changed:
+            self.on_selection_changed(None)
+
+    def _show_rows(self) -> None:
+        """
+        Updates the footer and draws the rows, or the empty state.
+        """
+        self.total_label_footer.config(text=f"Totale: € {self._total:.2f}")
+
+        self._render()
 
         # Show empty state if no expenses
-        if not expenses:
+        if self._pager.count:
+            self._hide_empty_state()
+        else:
             self._show_empty_state()
-            return total
 
-        self._hide_empty_state()
+    def _render(self) -> None:
+        """
+        Fills the slots with the rows of the current window, creating or
+        deleting slots only when the number of rows shown changes.
+        """
+        count = self._pager.count if self._pager else 0
+        self._first_row = max(0, min(self._first_row, count - self._visible_rows))
 
-        for exp in expenses:
-            total += exp.amount
+        rows = (
+            self._pager.get(self._first_row, self._visible_rows) if self._pager else []
+        )
 
-            # Get frequency if this is a recurring expense
+        while len(self._slots) < len(rows):
+            self._slots.append(self.tree.insert("", tk.END))
+        for slot in self._slots[len(rows) :]:
+            self.tree.delete(slot)
+        del self._slots[len(rows) :]
+
+        selected_slot = None
+        for slot, row in zip(self._slots, rows):
+            # Category name and frequency come already resolved from the query
             frequency_display = "-"
-            if exp.recurring_expense_id:
-
-                # Fetch the recurring expense to get its frequency
-                recurring = self.recurring_expense_service.get_recurring_expense_by_id(
-                    exp.recurring_expense_id
-                )
-                if recurring:
-                    frequency_display = FREQUENCY_LABELS.get(recurring.frequency, "")
-
-            # Get category name
-            category_name = (
-                self.category_service.get_category_by_id(exp.category_id).name
-                if self.category_service
-                else "N/A"
-            )
+            if row.frequency:
+                frequency_display = FREQUENCY_LABELS.get(row.frequency, "")
 
-            self.tree.insert(
-                "",
-                tk.END,
-                iid=str(exp.id),  # ID come iid
+            self.tree.item(
+                slot,
                 values=(
-                    exp.id,
-                    exp.date.isoformat(),
-                    f"{exp.amount:.2f}",
-                    category_name,
-                    exp.description or "",
+                    row.id,
+                    row.date.isoformat(),
+                    f"{row.amount:.2f}",
+                    row.category_name or "N/A",
+                    row.description or "",
                     frequency_display,
                 ),
-                tags=("recurring",) if exp.recurring_expense_id else (),
+                tags=("recurring",) if row.recurring_expense_id else (),
             )
+            if row.id == self._selected_id:
+                selected_slot = slot
 
-        # self.total_label.config(text=f"Totale: € {total:.2f}")
-        self.total_label_footer.config(text=f"Totale: € {total:.2f}")
-        return total
+        self._shown_rows = rows
+
+        # The selection follows the expense, not the slot
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if count:
+            self.scrollbar.set(
+                self._first_row / count, (self._first_row + len(rows)) / count
+            )
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, first_row: int) -> None:
+        if self._pager is None:
+            return
+
+        first_row = max(0, min(first_row, self._pager.count - self._visible_rows))
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render()
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None):
+        if self._pager is None:
+            return
+
+        if action == tk.MOVETO:
+            self._scroll_to(round(float(amount) * self._pager.count))
+        elif action == tk.SCROLL:
+            step = self._visible_rows if unit == tk.PAGES else 1
+            self._scroll_to(self._first_row + int(amount) * step)
+
+    def _on_mouse_wheel(self, event) -> str:
+        # Button-4/5 on Linux, delta on Windows and macOS
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(
+            self._first_row + (-WHEEL_SCROLL_ROWS if up else WHEEL_SCROLL_ROWS)
+        )
+        return "break"
+
+    def _move_selection(self, step: int) -> str:
+        """
+        Moves the selection by step rows, scrolling the window if needed.
+        """
+        if self._pager is None or not self._pager.count:
+            return "break"
+
+        focused = self.tree.focus()
+        if focused in self._slots:
+            position = self._first_row + self._slots.index(focused)
+        else:
+            position = self._first_row - 1 if step > 0 else self._first_row
+
+        position = max(0, min(position + step, self._pager.count - 1))
+
+        if position < self._first_row:
+            self._scroll_to(position)
+        elif position >= self._first_row + self._visible_rows:
+            self._scroll_to(position - self._visible_rows + 1)
+
+        slot = self._slots[position - self._first_row]
+        self.tree.selection_set(slot)
+        self.tree.focus(slot)
+        return "break"
+
+    def _on_tree_configure(self, event) -> None:
+        """
+        Recomputes how many rows fit in the tree when it is resized.
+        """
+        heading_height, row_height = DEFAULT_HEADING_HEIGHT, DEFAULT_ROW_HEIGHT
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                heading_height, row_height = bbox[1], bbox[3]
+
+        visible_rows = max(1, (event.height - heading_height) // row_height)
+
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            if self._pager is not None:
+                self._render()
 
     def _on_selection_changed(self, _event) -> None:
         """Notify parent when selection changes."""
-        has_selection = bool(self.tree.selection())
-        selected_id = self.get_selected_expense_id()
+        selection = self.tree.selection()
+
+        if selection:
+            values = self.tree.item(selection[0], "values")
+            selected_id = int(values[0]) if values else None
+        elif self._selected_id is not None and self._selected_id not in {
+            row.id for row in self._shown_rows
+        }:
+            # The selected expense was scrolled out of the window
+            return
+        else:
+            selected_id = None
+
+        if selected_id == self._selected_id and selection:
+            # Selection restored on the expense's new slot while scrolling
+            return
+
+        self._selected_id = selected_id
         print(f"Expense selection changed: {selected_id}")
         if self.on_selection_changed:
-            self.on_selection_changed(selected_id if has_selection else None)
+            self.on_selection_changed(selected_id)
 
     def get_selected_expense_id(self) -> int | None:
         """
         Return the ID of the currently selected expense, if any.
         """
-        selection = self.tree.selection()
-        if not selection:
-            return None
-
-        # Get the tree item and extract the ID from the first value column
-        item = selection[0]
-        values = self.tree.item(item, "values")
-        return int(values[0]) if values else None
+        # Kept while the selected row is scrolled out of the window
+        return self._selected_id
 
     def _on_right_click(self, event):
         # 🔹 Seleziona esplicitamente la riga
@@ -361,8 +596,6 @@ class ExpenseListFrame(ttk.Frame):
             expense_service=self.expense_service,
             category_service=self.category_service,
             recurring_expense_service=self.recurring_expense_service,
-            on_expense_added=self._on_refresh_requested,
-            on_update_requested=self._on_refresh_requested,
             expense_id=expense_id,
         )
 
@@ -373,8 +606,6 @@ class ExpenseListFrame(ttk.Frame):
             expense_service=self.expense_service,
             category_service=self.category_service,
             recurring_expense_service=self.recurring_expense_service,
-            on_expense_added=self._on_refresh_requested,
-            on_update_requested=None,
         )
 
     def on_delete_expense_requested(self):
@@ -392,7 +623,5 @@ class ExpenseListFrame(ttk.Frame):
         if not confirmed:
             return
 
+        # The row is taken out of the list by apply_change()
         self.expense_service.delete_expense(expense_id)
-
-        # Refresh current month
-        self._on_refresh_requested()
@@ -0,0 +1,216 @@
+"""
+Docstring for ui.expense_list_pager
+Loads the rows of the expense list one page at a time, for the
+virtualized ExpenseListFrame.
+"""
+
+from typing import Callable
+
+from domain.models import ExpenseListRow
+
+# fetch_page(after, offset, limit): the rows following the row after when
+# given, otherwise the rows starting at offset
+FetchPage = Callable[[ExpenseListRow | None, int, int], list[ExpenseListRow]]
+
+# sort_key(row): a value ordering the rows like the list (ascending)
+SortKey = Callable[[ExpenseListRow], tuple]
+
+PAGE_SIZE = 200
+MAX_CACHED_PAGES = 8
+
+
+class _Block:
+    """
+    Consecutive rows of the list, starting at position start.
+    """
+
+    __slots__ = ("start", "rows")
+
+    def __init__(self, start: int, rows: list[ExpenseListRow]):
+        self.start = start
+        self.rows = rows
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.rows)
+
+
+class ExpenseListPager:
+    """
+    Serves any window of a sorted list of `count` rows, keeping at most
+    max_pages blocks of about page_size rows in memory.
+
+    A block following a cached block is fetched with a keyset query after
+    its last row, which is what scrolling does; other blocks (e.g. after
+    dragging the scrollbar) are fetched by offset.
+
+    When sort_key is given, insert() and remove() patch the cached blocks
+    after a single change instead of reloading them: the rows are placed
+    by binary search and the blocks after the change are shifted by one.
+    descending tells that sort_key orders the list backwards.
+
+    first_rows, when already loaded (e.g. prefetched), are the rows at
+    the top of the list.
+    """
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        count: int,
+        page_size: int = PAGE_SIZE,
+        max_pages: int = MAX_CACHED_PAGES,
+        sort_key: SortKey | None = None,
+        descending: bool = False,
+        first_rows: list[ExpenseListRow] | None = None,
+    ):
+        self._fetch_page = fetch_page
+        self.count = count
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._sort_key = sort_key
+        self._descending = descending
+        # least recently used first
+        self._blocks: list[_Block] = [_Block(0, first_rows)] if first_rows else []
+
+    def get(self, first: int, size: int) -> list[ExpenseListRow]:
+        """
+        Returns the rows from position first (0-based), at most size of them.
+        """
+        first = max(0, min(first, self.count))
+        last = min(first + size, self.count)  # exclusive
+
+        rows: list[ExpenseListRow] = []
+        position = first
+
+        while position < last:
+            block = self._block_at(position) or self._load(position)
+            if block is None:
+                break  # fewer rows than count, e.g. written meanwhile
+
+            self._touch(block)
+            rows.extend(block.rows[position - block.start : last - block.start])
+            position = block.end
+
+        return rows
+
+    def insert(self, row: ExpenseListRow) -> None:
+        """
+        Adds a row just written to the list.
+        """
+        key = self._key(row)
+
+        for block in self._blocks:
+            if self._before(key, self._key(block.rows[0])):
+                if block.start == 0:
+                    block.rows.insert(0, row)
+                else:
+                    block.start += 1
+            elif self._before(key, self._key(block.rows[-1])):
+                block.rows.insert(self._insert_position(block.rows, key), row)
+            elif block.end == self.count:
+                block.rows.append(row)
+            # else: after the whole block, whose positions do not change
+
+        self.count += 1
+
+    def remove(self, row_id: int) -> bool:
+        """
+        Takes a row just deleted out of the list.
+
+        Returns False when the row is not cached: its position is then
+        unknown and so are the positions of the cached rows, which are
+        dropped. The count is updated either way.
+        """
+        self.count = max(0, self.count - 1)
+
+        for block in self._blocks:
+            for index, row in enumerate(block.rows):
+                if row.id == row_id:
+                    break
+            else:
+                continue
+
+            key = self._key(block.rows.pop(index))
+            for other in self._blocks:
+                if other is not block and self._before(key, self._key(other.rows[0])):
+                    other.start -= 1
+            self._blocks = [other for other in self._blocks if other.rows]
+            return True
+
+        self.clear()
+        return False
+
+    def clear(self) -> None:
+        """
+        Drops every cached row; they are fetched again when shown.
+        """
+        self._blocks = []
+
+    def _key(self, row: ExpenseListRow) -> tuple:
+        if self._sort_key is None:
+            raise TypeError("ExpenseListPager needs a sort_key to be patched")
+
+        return self._sort_key(row)
+
+    def _before(self, a: tuple, b: tuple) -> bool:
+        """
+        True if a key comes before another one in the list.
+        """
+        return a > b if self._descending else a < b
+
+    def _insert_position(self, rows: list[ExpenseListRow], key: tuple) -> int:
+        """
+        Binary search of the position of key within sorted rows.
+        """
+        low, high = 0, len(rows)
+
+        while low < high:
+            middle = (low + high) // 2
+            if self._before(key, self._key(rows[middle])):
+                high = middle
+            else:
+                low = middle + 1
+
+        return low
+
+    def _block_at(self, position: int) -> _Block | None:
+        for block in self._blocks:
+            if block.start <= position < block.end:
+                return block
+
+        return None
+
+    def _touch(self, block: _Block) -> None:
+        if self._blocks[-1] is not block:
+            self._blocks.remove(block)
+            self._blocks.append(block)
+
+    def _load(self, position: int) -> _Block | None:
+        """
+        Fetches the page holding position, from the end of the cached
+        block before it if any, up to the next cached block.
+        """
+        start = max(
+            [position - position % self._page_size]
+            + [block.end for block in self._blocks if block.end <= position]
+        )
+        previous = next((block for block in self._blocks if block.end == start), None)
+
+        if previous is not None:
+            rows = self._fetch_page(previous.rows[-1], 0, self._page_size)
+        else:
+            rows = self._fetch_page(None, start, self._page_size)
+
+        following = [block.start for block in self._blocks if block.start > start]
+        if following:
+            rows = rows[: min(following) - start]
+
+        if len(rows) <= position - start:
+            return None
+
+        block = _Block(start, rows)
+        self._blocks.append(block)
+        while len(self._blocks) > self._max_pages:
+            self._blocks.pop(0)
+
+        return block
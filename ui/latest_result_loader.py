@@ -0,0 +1,71 @@
+"""
+Docstring for ui.latest_result_loader
+Runs slow loads off the Tk thread, keeping only the result of the latest
+one, e.g. while the user clicks through the months.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LatestResultLoader(Generic[T]):
+    """
+    Runs the loads one at a time in a worker thread.
+
+    Every submit() starts a new generation: the previous load is
+    cancelled if it has not started yet, and its result is discarded
+    otherwise, so only the result of the latest request is ever returned
+    by poll().
+
+    submit() and poll() are meant to be called from the Tk thread only,
+    poll() e.g. from a widget's after() callback.
+    """
+
+    def __init__(self, thread_name_prefix: str = "loader"):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=thread_name_prefix
+        )
+        self._future: Future | None = None
+        self.generation = 0
+
+    @property
+    def pending(self) -> bool:
+        """
+        True while the latest load has not been returned by poll().
+        """
+        return self._future is not None
+
+    def submit(self, load: Callable[[], T]) -> int:
+        """
+        Starts a load, superseding the previous one.
+        Returns its generation.
+        """
+        if self._future is not None:
+            self._future.cancel()
+
+        self.generation += 1
+        self._future = self._executor.submit(load)
+
+        return self.generation
+
+    def poll(self) -> Future | None:
+        """
+        Returns the future of the latest load once it is done, exactly
+        once, otherwise None. Its result() re-raises the load's exception.
+        """
+        future = self._future
+
+        if future is None or not future.done():
+            return None
+
+        self._future = None
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Cancels the pending load and stops the worker thread.
+        """
+        self._future = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -8,6 +8,8 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import date
 
+from ui.debouncer import Debouncer
+
 MONTH_NAMES = [
     "Gennaio",
     "Febbraio",
@@ -23,6 +25,14 @@ MONTH_NAMES = [
     "Dicembre",
 ]
 
+# A period change is notified once the selection stayed still this long,
+# so that several clicks (or a held down arrow) refresh only once
+PERIOD_CHANGE_DELAY_MS = 200
+
+# Held down arrows move by one month every REPEAT_INTERVAL_MS
+REPEAT_DELAY_MS = 400
+REPEAT_INTERVAL_MS = 100
+
 
 class PeriodSelector(ttk.Frame):
     """
@@ -44,6 +54,18 @@ class PeriodSelector(ttk.Frame):
         self.year_var = tk.IntVar(value=today.year)
         self.month_var = tk.StringVar(value=MONTH_NAMES[today.month - 1])
 
+        # One on_month_changed per gesture, whatever variables it wrote
+        self._period_change = Debouncer(
+            self,
+            PERIOD_CHANGE_DELAY_MS,
+            lambda period: self.on_month_changed(*period),
+            initial=(today.year, today.month),
+        )
+
+        # Auto-repeat of the held down arrow (ttk buttons have none)
+        self._repeat_id = None
+        self._repeated = False
+
         self._build_ui()
 
     def _build_ui(self):
@@ -84,7 +106,7 @@ class PeriodSelector(ttk.Frame):
 
         self.month_var.trace_add("write", self._on_month_var_changed)
 
-        ttk.Button(filter_container, text="<", width=3, command=self._prev_month).pack(
+        self._repeating_button(filter_container, "<", self._prev_month).pack(
             side=tk.LEFT, padx=5
         )
 
@@ -92,17 +114,54 @@ class PeriodSelector(ttk.Frame):
             filter_container, text="Mese corrente", command=self._current_month
         ).pack(side=tk.LEFT, padx=5)
 
-        ttk.Button(filter_container, text=">", width=3, command=self._next_month).pack(
+        self._repeating_button(filter_container, ">", self._next_month).pack(
             side=tk.LEFT, padx=5
         )
 
+    def _repeating_button(self, parent, text: str, step) -> ttk.Button:
+        """
+        Arrow button calling step on click, and repeatedly while held down.
+        """
+
+        def on_click():
+            # Not again on the release ending a repetition
+            if self._repeated:
+                self._repeated = False
+            else:
+                step()
+
+        def repeat():
+            step()
+            self._repeated = True
+            self._repeat_id = self.after(REPEAT_INTERVAL_MS, repeat)
+
+        def on_press(_event):
+            self._repeated = False
+            self._repeat_id = self.after(REPEAT_DELAY_MS, repeat)
+
+        def on_release(_event):
+            if self._repeat_id is not None:
+                self.after_cancel(self._repeat_id)
+                self._repeat_id = None
+
+        button = ttk.Button(parent, text=text, width=3, command=on_click)
+        button.bind("<ButtonPress-1>", on_press, add="+")
+        button.bind("<ButtonRelease-1>", on_release, add="+")
+
+        return button
+
     def get_selected_month_number(self) -> int:
         """Returns the currently selected month number."""
         return MONTH_NAMES.index(self.month_var.get()) + 1
 
     def _notify_change(self):
-        """Notify listener with the currently selected year and month."""
-        self.on_month_changed(self.year_var.get(), self.get_selected_month_number())
+        """
+        Notify listener with the currently selected year and month, once
+        the selection stops changing (see PERIOD_CHANGE_DELAY_MS).
+        """
+        self._period_change.trigger(
+            (self.year_var.get(), self.get_selected_month_number())
+        )
 
     def _on_month_var_changed(self, *_):
         """Callback triggered when the month variable changes."""
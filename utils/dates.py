@@ -10,3 +10,12 @@ def month_date_range(year: int, month: int) -> tuple[date, date]:
     last_day = calendar.monthrange(year, month)[1]
     end = date(year, month, last_day)
     return start, end
+
+
+def add_months(year: int, month: int, months: int) -> tuple[int, int]:
+    """
+    Return the year and month a number of months (possibly negative)
+    after a given year and month.
+    """
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
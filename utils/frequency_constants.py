@@ -19,3 +19,13 @@ FREQUENCY_FORM_OPTIONS = {
     "single": "Spesa singola",
     **FREQUENCY_LABELS,
 }
+
+# Number of months between two occurrences of each frequency
+FREQUENCY_MONTH_STEPS = {
+    RecurrenceFrequency.MONTHLY: 1,
+    RecurrenceFrequency.EVERY_2_MONTHS: 2,
+    RecurrenceFrequency.EVERY_3_MONTHS: 3,
+    RecurrenceFrequency.EVERY_4_MONTHS: 4,
+    RecurrenceFrequency.EVERY_6_MONTHS: 6,
+    RecurrenceFrequency.YEARLY: 12,
+}
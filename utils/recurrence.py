@@ -0,0 +1,123 @@
+"""
+Closed-form enumeration of recurring expense occurrences.
+
+The n-th occurrence is always computed from the start date, so a template
+starting on the 31st falls on the last day of shorter months and goes back
+to the 31st afterwards, instead of drifting to the 28th forever.
+"""
+
+import calendar
+from datetime import date
+from typing import Iterable
+
+from domain.models import RecurrenceFrequency, RecurringExpense
+from utils.frequency_constants import FREQUENCY_MONTH_STEPS
+
+
+def get_month_step(frequency: RecurrenceFrequency) -> int:
+    """
+    Return the number of months between two occurrences.
+    """
+    try:
+        return FREQUENCY_MONTH_STEPS[frequency]
+    except KeyError as error:
+        raise ValueError(f"Unsupported frequency: {frequency}") from error
+
+
+def months_between(start_date: date, other_date: date) -> int:
+    """
+    Return the number of calendar months from start_date to other_date,
+    ignoring the day of the month.
+    """
+    return (other_date.year - start_date.year) * 12 + (
+        other_date.month - start_date.month
+    )
+
+
+def nth_occurrence(start_date: date, frequency: RecurrenceFrequency, n: int) -> date:
+    """
+    Return the n-th occurrence (0 = start_date) of a recurrence.
+    The day of the month is clamped to the length of the target month.
+    """
+    months = start_date.month - 1 + n * get_month_step(frequency)
+    year = start_date.year + months // 12
+    month = months % 12 + 1
+    day = min(start_date.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def first_index_on_or_after(
+    start_date: date, frequency: RecurrenceFrequency, day: date
+) -> int:
+    """
+    Return the index of the first occurrence falling on or after day.
+    """
+    if day <= start_date:
+        return 0
+
+    n = months_between(start_date, day) // get_month_step(frequency)
+
+    if nth_occurrence(start_date, frequency, n) < day:
+        n += 1
+
+    return n
+
+
+def next_index_after_period_of(
+    start_date: date, frequency: RecurrenceFrequency, day: date
+) -> int:
+    """
+    Return the index of the first occurrence in a later period than day.
+
+    Every occurrence falls in a different month, so the one in day's month
+    (or before it) is considered done, whatever its exact day.
+    """
+    if day < start_date:
+        return 0
+
+    return months_between(start_date, day) // get_month_step(frequency) + 1
+
+
+def occurrences_between(
+    start_date: date,
+    frequency: RecurrenceFrequency,
+    from_date: date,
+    to_date: date,
+    end_date: date | None = None,
+) -> list[date]:
+    """
+    Return all the occurrences in [from_date, to_date] (inclusive),
+    stopping at end_date if the recurrence has one.
+    """
+    last_date = min(to_date, end_date) if end_date else to_date
+
+    n = first_index_on_or_after(start_date, frequency, from_date)
+    occurrences: list[date] = []
+
+    occurrence = nth_occurrence(start_date, frequency, n)
+    while occurrence <= last_date:
+        occurrences.append(occurrence)
+        n += 1
+        occurrence = nth_occurrence(start_date, frequency, n)
+
+    return occurrences
+
+
+def occurrences_in_range(
+    recurring_expenses: Iterable[RecurringExpense], from_date: date, to_date: date
+) -> dict[int, list[date]]:
+    """
+    Return the occurrences in [from_date, to_date] of many templates at once,
+    keyed by recurring expense ID. Each template jumps straight to its first
+    occurrence in range, so the cost only depends on the occurrences returned.
+    """
+    return {
+        recurring.id: occurrences_between(
+            recurring.start_date,
+            recurring.frequency,
+            from_date,
+            to_date,
+            recurring.end_date,
+        )
+        for recurring in recurring_expenses
+    }